@@ -0,0 +1,59 @@
+"""
+Agregados do painel de RH (quantidade de funcionários por Diretoria, tipo sanguíneo, plano de
+saúde, comorbidade...)
+As contagens são feitas uma vez por versão dos dados e, nas escritas da própria aplicação,
+ajustadas no lugar com as linhas inseridas, alteradas e excluídas, sem recontar a tabela
+"""
+
+import threading
+from collections import Counter
+
+from esquema import valor_texto
+
+# Colunas contadas (todas com poucos valores distintos)
+COLUNAS_AGREGADAS = ['Diretoria', 'tipo_sanguineo', 'plano_saude', 'comorbidade', 'estado_civil', 'possui_filhos']
+
+
+class AgregadosTabela:
+    """Contagem de registros por valor de cada coluna agregada, com a versão dos dados"""
+
+    def __init__(self, df, versao):
+        self.versao = versao
+        self.colunas = [c for c in COLUNAS_AGREGADAS if c in df.columns]
+        self.total = len(df)
+        self._lock = threading.Lock()
+        self._contagens = {}
+        for coluna in self.colunas:
+            # Colunas categóricas: contagem por código, sem converter a coluna inteira em texto
+            contagem = df[coluna].value_counts(dropna=False, sort=False)
+            self._contagens[coluna] = Counter({
+                valor_texto(valor, coluna): int(quantidade)
+                for valor, quantidade in contagem.items() if quantidade
+            })
+
+    def valores_linha(self, df, posicao):
+        """Valores (texto) das colunas agregadas de uma linha da tabela tipada"""
+        return {coluna: valor_texto(df[coluna].iat[posicao], coluna) for coluna in self.colunas}
+
+    def registrar(self, removidos=(), adicionados=()):
+        """Ajusta as contagens: registros (dicionários coluna → valor) que saíram e que entraram"""
+        with self._lock:
+            for registros, sinal in ((removidos, -1), (adicionados, 1)):
+                for registro in registros:
+                    self.total += sinal
+                    for coluna in self.colunas:
+                        contagem = self._contagens[coluna]
+                        valor = str(registro.get(coluna, ""))
+                        contagem[valor] += sinal
+                        if contagem[valor] <= 0:
+                            del contagem[valor]
+
+    def contagem(self, coluna):
+        """Pares (valor, quantidade) da coluna, do mais frequente ao menos frequente"""
+        with self._lock:
+            return self._contagens.get(coluna, Counter()).most_common()
+
+    def proporcao(self, coluna, valor):
+        """Fração dos registros com o valor na coluna (0 com a tabela vazia)"""
+        with self._lock:
+            return self._contagens.get(coluna, Counter())[valor] / self.total if self.total else 0.0
@@ -0,0 +1,674 @@
+"""
+Motores de armazenamento dos funcionários
+A interface usa sempre a mesma API de CRUD (inserir, obter por CPF, atualizar, excluir,
+consultar e exportar) e o motor é escolhido na configuração: Google Sheets ou SQLite local
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from agregados import COLUNAS_AGREGADAS, AgregadosTabela
+from cache_planilha import EntradaCache
+from projecao import ler_registro
+from esquema import (
+    COLUNAS_PLANILHA,
+    coluna_texto,
+    linha_de_registro,
+    registro_de_linha,
+    registro_texto,
+    tabela_texto,
+    tipar_tabela,
+    valor_texto
+)
+
+# Banco local padrão do motor SQLite
+CAMINHO_SQLITE_PADRAO = ".cache/funcionarios.sqlite3"
+
+
+class CPFDuplicado(ValueError):
+    """CPF já cadastrado no armazenamento"""
+
+    def __init__(self, cpf):
+        super().__init__(f"CPF já cadastrado: {cpf}")
+        self.cpf = cpf
+
+
+class ConflitoEdicao(ValueError):
+    """O registro mudou no armazenamento depois de lido (edição concorrente)"""
+
+    def __init__(self, colunas, cpfs=()):
+        super().__init__(f"Registro alterado por outra pessoa: {', '.join(colunas)}")
+        self.colunas = colunas
+        self.cpfs = list(cpfs)
+
+
+# Colunas que identificam a linha: conferidas antes de qualquer edição parcial
+# (uma exclusão concorrente desloca as linhas e o número lido passa a ser de outra pessoa)
+COLUNAS_IDENTIDADE = ['data_hora', 'nome', 'cpf']
+
+
+def celulas_alteradas(original, registro):
+    """Colunas cujo valor (texto) difere entre o registro lido e o editado → novo valor"""
+    alteradas = {}
+    for coluna in COLUNAS_PLANILHA:
+        valor = str(registro.get(coluna, ""))
+        if valor != str(original.get(coluna, "")):
+            alteradas[coluna] = valor
+    return alteradas
+
+
+def _colunas_conferidas(alteradas):
+    return list(dict.fromkeys(COLUNAS_IDENTIDADE + list(alteradas)))
+
+
+def _divergentes(atual, original, colunas):
+    return [c for c in colunas if atual[c] != str(original.get(c, ""))]
+
+
+def _conflito(divergentes_por_cpf):
+    """ConflitoEdicao com as colunas divergentes (na ordem da planilha) de todos os CPFs"""
+    colunas = {c for divergentes in divergentes_por_cpf.values() for c in divergentes}
+    return ConflitoEdicao([c for c in COLUNAS_PLANILHA if c in colunas], divergentes_por_cpf)
+
+
+class BackendArmazenamento:
+    """Operações comuns aos motores de armazenamento (registros indexados pelas colunas da planilha)"""
+
+    nome = ""
+    # Motores remotos se beneficiam da fila de gravação em segundo plano
+    remoto = False
+
+    def carregar(self, forcar=False):
+        """EntradaCache com a tabela completa (DataFrame) e a versão dos dados"""
+        raise NotImplementedError
+
+    def carregar_colunas(self, colunas, forcar=False):
+        """EntradaCache com pelo menos as colunas pedidas (listagem sem os campos de detalhe)
+
+        Por padrão é a tabela completa; motores remotos leem só as colunas pedidas.
+        """
+        return self.carregar(forcar=forcar)
+
+    def agregados(self):
+        """Contagens do painel de RH (AgregadosTabela), calculadas uma vez por versão dos dados"""
+        entrada = self.carregar_colunas(COLUNAS_AGREGADAS)
+        return entrada.derivado("agregados", lambda df: AgregadosTabela(df, entrada.versao))
+
+    def obter_registro(self, cpf, nome=None):
+        """Registro completo (dicionário) do CPF (e nome, se informado), lido sob demanda; None se não encontrado"""
+        df = self.carregar().df
+        mascara = df["cpf"] == cpf
+        if nome is not None:
+            mascara &= df["nome"] == nome
+        encontrados = df[mascara]
+        if len(encontrados) == 0:
+            return None
+        return registro_texto(encontrados.iloc[0])
+
+    def inserir_lote(self, registros):
+        """Insere vários registros de uma vez; retorna a quantidade inserida"""
+        raise NotImplementedError
+
+    def atualizar(self, cpf, registro, nome=None, original=None):
+        """Substitui o registro do CPF (e nome, se informado); False se não encontrado
+
+        Com original (o registro como foi lido), grava só as células alteradas, depois de
+        conferir que elas e as colunas de identidade ainda têm os valores lidos; se não
+        tiverem, nada é gravado e ConflitoEdicao é levantada.
+        """
+        raise NotImplementedError
+
+    def excluir(self, cpf, nome=None):
+        """Remove o registro do CPF (e nome, se informado); False se não encontrado"""
+        raise NotImplementedError
+
+    def atualizar_lote(self, edicoes):
+        """Aplica várias edições (pares original, editado) como em atualizar(original=...)
+
+        Registros que não existem mais são ignorados; retorna quantos foram gravados.
+        """
+        return sum(
+            bool(celulas_alteradas(original, registro))
+            and self.atualizar(original.get("cpf", ""), registro, nome=original.get("nome"), original=original)
+            for original, registro in edicoes
+        )
+
+    def excluir_lote(self, registros):
+        """Remove vários registros (como foram lidos); retorna quantos foram excluídos"""
+        return sum(self.excluir(r.get("cpf", ""), nome=r.get("nome")) for r in registros)
+
+    def inserir(self, registro):
+        """Insere um registro"""
+        return self.inserir_lote([registro])
+
+    def cpf_cadastrado(self, cpf):
+        """O CPF já está cadastrado? (checagem de duplicidade antes de inserir)"""
+        df = self.carregar().df
+        return "cpf" in df.columns and bool((df["cpf"] == cpf).any())
+
+    def obter_por_cpf(self, cpf):
+        """Registro (dicionário) do CPF ou None"""
+        df = self.carregar().df
+        encontrados = df[df["cpf"] == cpf]
+        if len(encontrados) == 0:
+            return None
+        return registro_texto(encontrados.iloc[0])
+
+    def consultar(self, **filtros):
+        """DataFrame (tipado) com os registros cujas colunas são iguais aos filtros informados (texto)"""
+        df = self.carregar().df
+        for coluna, valor in filtros.items():
+            df = df[coluna_texto(df[coluna], coluna) == valor]
+        return df
+
+    def exportar(self):
+        """Todos os registros, como lista de dicionários (para cópia entre motores)"""
+        return tabela_texto(self.carregar().df).to_dict("records")
+
+    def estatisticas(self):
+        """Contadores internos do motor"""
+        return {}
+
+    def descartar_conexao(self):
+        """Descarta conexões em cache após um erro (reabertas na próxima chamada)"""
+
+
+class BackendSheets(BackendArmazenamento):
+    """Motor Google Sheets: a planilha é a fonte da verdade e as leituras passam pelo cache"""
+
+    nome = "Google Sheets"
+    remoto = True
+
+    def __init__(self, pool, sheet_id, cache):
+        self.pool = pool
+        self.sheet_id = sheet_id
+        self.cache = cache
+
+    @property
+    def aba(self):
+        return self.pool.obter_aba(self.sheet_id)
+
+    def carregar(self, forcar=False):
+        return self.cache.obter(self.sheet_id, self.aba, forcar=forcar)
+
+    def carregar_colunas(self, colunas, forcar=False):
+        # Só as colunas pedidas vêm do Google (um batch_get), a menos que a tabela completa já esteja em cache
+        return self.cache.obter_colunas(self.sheet_id, self.aba, colunas, forcar=forcar)
+
+    def agregados(self):
+        # Mantidos pelo cache entre as escritas da própria aplicação, sem recontar a tabela
+        return self.cache.agregados(self.sheet_id, self.carregar_colunas(COLUNAS_AGREGADAS))
+
+    def obter_registro(self, cpf, nome=None):
+        # Os campos de detalhe não estão na listagem: lê só a linha do registro
+        for _ in range(2):
+            numero_linha = self._localizar_linha(cpf, nome)
+            if numero_linha is None:
+                return None
+            registro = ler_registro(self.aba, numero_linha)
+            if registro["cpf"] == cpf and (nome is None or registro["nome"] == nome):
+                return registro
+            # A linha mudou de lugar desde a versão em cache: recarrega e localiza de novo
+            self.cache.invalidar(self.sheet_id)
+        return None
+
+    def inserir_lote(self, registros):
+        linhas = [linha_de_registro(registro) for registro in registros]
+        if not linhas:
+            return 0
+        self.aba.append_rows(linhas)
+        self.cache.registrar_insercao(self.sheet_id, linhas)
+        return len(linhas)
+
+    def cpf_cadastrado(self, cpf):
+        # Conjunto de CPFs em memória: sem baixar a planilha e, dentro do TTL, sem chamadas à API
+        return cpf in self.cache.cpfs_cadastrados(self.sheet_id, self.aba)
+
+    def _localizar(self, cpf, nome=None):
+        """(número da linha na planilha (base 1), versão em cache) pelo índice de CPF; None se não encontrado
+
+        Dentro do TTL a versão em cache não é conferida com a planilha: linhas inseridas ou
+        excluídas por outra pessoa podem ter deslocado o número. Quem grava confere antes a
+        identidade da linha na planilha (_linha_conferida, _gravar_alteracoes, excluir_lote).
+        Se o registro não for encontrado, os dados são recarregados uma vez antes de desistir.
+        """
+        for recarregar in (False, True):
+            # Basta a identidade da linha: a tabela completa é usada se estiver em cache
+            entrada = self.cache.obter_colunas(self.sheet_id, self.aba, COLUNAS_IDENTIDADE, forcar=recarregar)
+            indice = self.cache.indice_cpf(self.sheet_id, entrada)
+            for numero_linha in indice.localizar(cpf):
+                if nome is None or entrada.df["nome"].iat[numero_linha - 2] == nome:
+                    return numero_linha, entrada
+        return None
+
+    def _localizar_linha(self, cpf, nome=None):
+        """Número da linha na planilha (base 1) pela versão em cache (ver _localizar: não conferido)"""
+        alvo = self._localizar(cpf, nome)
+        return alvo[0] if alvo else None
+
+    def _localizar_linhas(self, registros):
+        """Números das linhas de vários registros (como foram lidos), na ordem; None para os não encontrados
+
+        Uma só consulta à versão em cache para o lote (ver _localizar: não conferido); os não
+        encontrados são procurados de novo, uma única vez, depois de recarregar os dados.
+        """
+        numeros = [None] * len(registros)
+        for recarregar in (False, True):
+            if None not in numeros:
+                break
+            entrada = self.cache.obter_colunas(self.sheet_id, self.aba, COLUNAS_IDENTIDADE, forcar=recarregar)
+            indice = self.cache.indice_cpf(self.sheet_id, entrada)
+            nomes = entrada.df["nome"].to_numpy()
+            for posicao, registro in enumerate(registros):
+                if numeros[posicao] is not None:
+                    continue
+                nome = registro.get("nome")
+                numeros[posicao] = next(
+                    (n for n in indice.localizar(registro.get("cpf", "")) if nome is None or nomes[n - 2] == nome),
+                    None
+                )
+        return numeros
+
+    def _ler_identidades(self, numeros):
+        """Colunas de identidade (data_hora, nome, cpf) das linhas, lidas da planilha num batch_get"""
+        from gspread.utils import rowcol_to_a1  # gspread só é carregado com o motor Sheets
+
+        largura = max(COLUNAS_PLANILHA.index(c) for c in COLUNAS_IDENTIDADE) + 1
+        lidas = self.aba.batch_get([f"{rowcol_to_a1(n, 1)}:{rowcol_to_a1(n, largura)}" for n in numeros])
+        identidades = []
+        for valores in lidas:
+            # A API omite as células vazias do fim da linha (e a linha inteira, além do fim da planilha)
+            atual = dict.fromkeys(COLUNAS_PLANILHA, "")
+            atual.update(registro_de_linha(valores[0] if valores else []))
+            identidades.append(atual)
+        return identidades
+
+    def _linha_conferida(self, cpf, nome=None):
+        """Número da linha do CPF (e nome) com a identidade conferida na planilha; None se não encontrado
+
+        Se a linha lida não for a da versão em cache (linhas deslocadas por outra pessoa dentro
+        do TTL), os dados são recarregados e a linha localizada de novo; se ainda divergir,
+        ConflitoEdicao é levantada e nada é gravado.
+        """
+        divergentes = []
+        for _ in range(2):
+            alvo = self._localizar(cpf, nome)
+            if alvo is None:
+                return None
+            numero_linha, entrada = alvo
+            identidade = {c: valor_texto(entrada.df[c].iat[numero_linha - 2], c) for c in COLUNAS_IDENTIDADE}
+            divergentes = _divergentes(self._ler_identidades([numero_linha])[0], identidade, COLUNAS_IDENTIDADE)
+            if not divergentes:
+                return numero_linha
+            self.cache.invalidar(self.sheet_id)
+        raise _conflito({cpf: divergentes})
+
+    def atualizar(self, cpf, registro, nome=None, original=None):
+        from gspread.utils import rowcol_to_a1  # gspread só é carregado com o motor Sheets
+
+        if original is None:
+            # Substituição da linha inteira: só depois de conferir que a linha ainda é a do registro
+            linha_real = self._linha_conferida(cpf, nome)
+            if not linha_real:
+                return False
+            linha = linha_de_registro(registro)
+            intervalo = f"{rowcol_to_a1(linha_real, 1)}:{rowcol_to_a1(linha_real, len(linha))}"
+            self.aba.update(range_name=intervalo, values=[linha])
+            self.cache.registrar_atualizacao(self.sheet_id, linha_real, linha)
+            return True
+
+        alteradas = celulas_alteradas(original, registro)
+        if not alteradas:
+            return self._localizar_linha(cpf, nome) is not None
+        # _gravar_alteracoes localiza e relê a linha e confere identidade e células alteradas antes de gravar
+        return self._gravar_alteracoes([(original, alteradas)]) > 0
+
+    def atualizar_lote(self, edicoes):
+        alteracoes = [(original, celulas_alteradas(original, registro)) for original, registro in edicoes]
+        return self._gravar_alteracoes([(original, alteradas) for original, alteradas in alteracoes if alteradas])
+
+    def _gravar_alteracoes(self, alteracoes):
+        """Localiza, confere e grava as células alteradas de vários registros ([(original, alteradas)])
+
+        A API não tem escrita condicional: as linhas são relidas (um batch_get) e conferidas
+        antes do batch_update; a janela entre as duas chamadas é o único risco restante.
+        Linhas cuja identidade não é a do registro foram deslocadas por outra pessoa dentro do
+        TTL: os dados são recarregados e elas são localizadas de novo uma vez, como em
+        _linha_conferida. Registros que não existem mais são ignorados; retorna quantos foram gravados.
+        """
+        from gspread.utils import rowcol_to_a1  # gspread só é carregado com o motor Sheets
+
+        linhas_finais = {}
+        divergentes = {}
+        dados = []
+        pendentes = alteracoes
+        for tentativa in range(2):
+            if not pendentes:
+                break
+            alvos = {}
+            for numero_linha, alteracao in zip(self._localizar_linhas([o for o, _ in pendentes]), pendentes):
+                if numero_linha:
+                    alvos[numero_linha] = alteracao
+            numeros = sorted(alvos)
+            lidas = self.aba.batch_get([
+                f"{rowcol_to_a1(n, 1)}:{rowcol_to_a1(n, len(COLUNAS_PLANILHA))}" for n in numeros
+            ]) if numeros else []
+            deslocados = []
+            for numero_linha, valores in zip(numeros, lidas):
+                original, alteradas = alvos[numero_linha]
+                # A API omite as células vazias do fim da linha
+                atual = dict.fromkeys(COLUNAS_PLANILHA, "")
+                atual.update(registro_de_linha(valores[0] if valores else []))
+                identidade = _divergentes(atual, original, COLUNAS_IDENTIDADE)
+                if identidade:
+                    if tentativa == 0:
+                        deslocados.append((original, alteradas))
+                    else:
+                        divergentes[original.get("cpf", "")] = identidade
+                    continue
+                colunas = _divergentes(atual, original, list(alteradas))
+                if colunas:
+                    divergentes[original.get("cpf", "")] = colunas
+                    continue
+                # Células não editadas ficam como estão na planilha (edições concorrentes de outros campos são mantidas)
+                atual.update(alteradas)
+                linhas_finais[numero_linha] = linha_de_registro(atual)
+
+                # Uma faixa por sequência de colunas vizinhas alteradas
+                faixas = []
+                for posicao, coluna in enumerate(COLUNAS_PLANILHA, start=1):
+                    if coluna not in alteradas:
+                        continue
+                    if faixas and faixas[-1][1] == posicao - 1:
+                        faixas[-1][1] = posicao
+                        faixas[-1][2].append(alteradas[coluna])
+                    else:
+                        faixas.append([posicao, posicao, [alteradas[coluna]]])
+                dados.extend(
+                    {
+                        "range": f"{rowcol_to_a1(numero_linha, inicio)}:{rowcol_to_a1(numero_linha, fim)}",
+                        "values": [valores_faixa],
+                    }
+                    for inicio, fim, valores_faixa in faixas
+                )
+            if deslocados:
+                self.cache.invalidar(self.sheet_id)
+            pendentes = deslocados
+
+        if divergentes:
+            self.cache.invalidar(self.sheet_id)
+            raise _conflito(divergentes)
+        if dados:
+            self.aba.batch_update(dados)
+            self.cache.registrar_atualizacoes(self.sheet_id, linhas_finais)
+        return len(linhas_finais)
+
+    def excluir(self, cpf, nome=None):
+        # A identidade da linha é relida antes da exclusão: o número vem da versão em cache
+        linha_real = self._linha_conferida(cpf, nome)
+        if not linha_real:
+            return False
+        self.aba.delete_rows(linha_real)
+        self.cache.registrar_exclusao(self.sheet_id, linha_real)
+        return True
+
+    def excluir_lote(self, registros):
+        """Confere as colunas de identidade de todas as linhas (um batch_get) e as exclui numa
+        única chamada, de baixo para cima, para que os números das linhas seguintes continuem válidos"""
+        alvos = {}
+        for linha_real, registro in zip(self._localizar_linhas(registros), registros):
+            if linha_real:
+                alvos[linha_real] = registro
+        if not alvos:
+            return 0
+
+        numeros = sorted(alvos, reverse=True)
+        divergentes = {}
+        for numero_linha, atual in zip(numeros, self._ler_identidades(numeros)):
+            colunas = _divergentes(atual, alvos[numero_linha], COLUNAS_IDENTIDADE)
+            if colunas:
+                divergentes[alvos[numero_linha].get("cpf", "")] = colunas
+        if divergentes:
+            self.cache.invalidar(self.sheet_id)
+            raise _conflito(divergentes)
+
+        # Linhas vizinhas viram uma faixa; as requisições são aplicadas em ordem, de baixo para cima
+        faixas = []
+        for numero_linha in numeros:
+            if faixas and faixas[-1][0] == numero_linha + 1:
+                faixas[-1][0] = numero_linha
+            else:
+                faixas.append([numero_linha, numero_linha])
+        self.aba.spreadsheet.batch_update({"requests": [
+            {"deleteDimension": {"range": {
+                "sheetId": self.aba.id, "dimension": "ROWS", "startIndex": inicio - 1, "endIndex": fim
+            }}}
+            for inicio, fim in faixas
+        ]})
+        self.cache.registrar_exclusoes(self.sheet_id, numeros)
+        return len(numeros)
+
+    def estatisticas(self):
+        return {"pool": self.pool.estatisticas(), "cache": self.cache.estatisticas()}
+
+    def descartar_conexao(self):
+        self.pool.descartar_aba(self.sheet_id)
+
+
+class BackendSQLite(BackendArmazenamento):
+    """Motor SQLite local (modo WAL) com índice único no CPF"""
+
+    nome = "SQLite local"
+
+    def __init__(self, caminho=CAMINHO_SQLITE_PADRAO):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        colunas = ", ".join(f'"{c}" TEXT NOT NULL DEFAULT \'\'' for c in COLUNAS_PLANILHA)
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS funcionarios (id INTEGER PRIMARY KEY, {colunas});
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_funcionarios_cpf ON funcionarios(cpf);
+            CREATE INDEX IF NOT EXISTS idx_funcionarios_diretoria ON funcionarios("Diretoria");
+        """)
+        self._lista_colunas = ", ".join(f'"{c}"' for c in COLUNAS_PLANILHA)
+        self._entrada = None
+        self._versao_banco = None
+        self._proxima_versao = 1
+        self._estatisticas = {"leituras_completas": 0, "escritas": 0}
+
+    def _versao_atual(self):
+        # data_version muda quando outra conexão grava no banco; as escritas desta
+        # conexão descartam a entrada diretamente
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def carregar(self, forcar=False):
+        with self._lock:
+            versao_banco = self._versao_atual()
+            if self._entrada is not None and not forcar and versao_banco == self._versao_banco:
+                return self._entrada
+            linhas = self._conn.execute(
+                f"SELECT {self._lista_colunas} FROM funcionarios ORDER BY id"
+            ).fetchall()
+            df = pd.DataFrame(linhas, columns=COLUNAS_PLANILHA)
+            self._entrada = EntradaCache(df, self._proxima_versao, versao_banco)
+            self._proxima_versao += 1
+            self._versao_banco = versao_banco
+            self._estatisticas["leituras_completas"] += 1
+            return self._entrada
+
+    def _escrever(self, sql, parametros, varias=False, cpfs=()):
+        """Executa uma escrita numa transação; retorna o número de linhas afetadas
+
+        cpfs: CPFs que a escrita grava, informados por quem chama para a mensagem de
+        CPFDuplicado (os parâmetros do SQL não seguem a ordem das colunas da planilha).
+        """
+        with self._lock:
+            try:
+                with self._conn:
+                    if varias:
+                        cursor = self._conn.executemany(sql, parametros)
+                    else:
+                        cursor = self._conn.execute(sql, parametros)
+            except sqlite3.IntegrityError as e:
+                raise CPFDuplicado(", ".join(self._cpfs_duplicados(cpfs))) from e
+            self._entrada = None
+            self._estatisticas["escritas"] += 1
+            return cursor.rowcount
+
+    def _cpfs_duplicados(self, cpfs):
+        """CPFs gravados que violam o índice único (já existentes ou repetidos no lote)"""
+        vistos = {cpf for (cpf,) in self._conn.execute("SELECT cpf FROM funcionarios")}
+        duplicados = []
+        for cpf in cpfs:
+            if cpf in vistos:
+                duplicados.append(cpf)
+            vistos.add(cpf)
+        return duplicados
+
+    def inserir_lote(self, registros):
+        linhas = [[str(v) for v in linha_de_registro(registro)] for registro in registros]
+        if not linhas:
+            return 0
+        marcadores = ", ".join("?" * len(COLUNAS_PLANILHA))
+        self._escrever(
+            f"INSERT INTO funcionarios ({self._lista_colunas}) VALUES ({marcadores})",
+            linhas,
+            varias=True,
+            cpfs=[linha[COLUNAS_PLANILHA.index("cpf")] for linha in linhas]
+        )
+        return len(linhas)
+
+    def _condicao(self, cpf, nome):
+        if nome is None:
+            return "cpf = ?", [cpf]
+        return "cpf = ? AND nome = ?", [cpf, nome]
+
+    def atualizar(self, cpf, registro, nome=None, original=None):
+        condicao, parametros = self._condicao(cpf, nome)
+        if original is None:
+            linha = [str(v) for v in linha_de_registro(registro)]
+            atribuicoes = ", ".join(f'"{c}" = ?' for c in COLUNAS_PLANILHA)
+            return self._escrever(
+                f"UPDATE funcionarios SET {atribuicoes} WHERE {condicao}",
+                linha + parametros,
+                cpfs=[str(registro.get("cpf", ""))]
+            ) > 0
+
+        alteradas = celulas_alteradas(original, registro)
+        if alteradas:
+            # Escrita condicional: só grava se as colunas conferidas ainda têm os valores lidos
+            conferidas = _colunas_conferidas(alteradas)
+            atribuicoes = ", ".join(f'"{c}" = ?' for c in alteradas)
+            condicao_conferida = condicao + "".join(f' AND "{c}" = ?' for c in conferidas)
+            if self._escrever(
+                f"UPDATE funcionarios SET {atribuicoes} WHERE {condicao_conferida}",
+                list(alteradas.values()) + parametros + [str(original.get(c, "")) for c in conferidas],
+                cpfs=[alteradas.get("cpf", "")]
+            ) > 0:
+                return True
+
+        # Nada gravado: o registro não existe mais, mudou desde a leitura ou não houve alteração
+        with self._lock:
+            linha = self._conn.execute(
+                f"SELECT {self._lista_colunas} FROM funcionarios WHERE {condicao}", parametros
+            ).fetchone()
+        if linha is None:
+            return False
+        if not alteradas:
+            return True
+        raise ConflitoEdicao(_divergentes(registro_de_linha(linha), original, _colunas_conferidas(alteradas)), [cpf])
+
+    def atualizar_lote(self, edicoes):
+        # Uma transação: com qualquer conflito, nada é gravado
+        atualizados = 0
+        divergentes = {}
+        with self._lock:
+            try:
+                with self._conn:
+                    for original, registro in edicoes:
+                        alteradas = celulas_alteradas(original, registro)
+                        if not alteradas:
+                            continue
+                        condicao, parametros = self._condicao(original.get("cpf", ""), original.get("nome"))
+                        conferidas = _colunas_conferidas(alteradas)
+                        atribuicoes = ", ".join(f'"{c}" = ?' for c in alteradas)
+                        cursor = self._conn.execute(
+                            f"UPDATE funcionarios SET {atribuicoes} WHERE {condicao}"
+                            + "".join(f' AND "{c}" = ?' for c in conferidas),
+                            list(alteradas.values()) + parametros + [str(original.get(c, "")) for c in conferidas]
+                        )
+                        if cursor.rowcount:
+                            atualizados += 1
+                            continue
+                        linha = self._conn.execute(
+                            f"SELECT {self._lista_colunas} FROM funcionarios WHERE {condicao}", parametros
+                        ).fetchone()
+                        if linha is not None:
+                            divergentes[original.get("cpf", "")] = _divergentes(
+                                registro_de_linha(linha), original, conferidas
+                            )
+                    if divergentes:
+                        raise _conflito(divergentes)
+            except sqlite3.IntegrityError as e:
+                raise CPFDuplicado(", ".join(
+                    str(registro.get("cpf", "")) for original, registro in edicoes
+                    if registro.get("cpf", "") != original.get("cpf", "")
+                )) from e
+            self._entrada = None
+            self._estatisticas["escritas"] += 1
+        return atualizados
+
+    def excluir(self, cpf, nome=None):
+        condicao, parametros = self._condicao(cpf, nome)
+        return self._escrever(f"DELETE FROM funcionarios WHERE {condicao}", parametros) > 0
+
+    def excluir_lote(self, registros):
+        # As colunas de identidade entram na condição: um CPF recadastrado depois da leitura não é excluído
+        condicao = " AND ".join(f'"{c}" = ?' for c in COLUNAS_IDENTIDADE)
+        return self._escrever(
+            f"DELETE FROM funcionarios WHERE {condicao}",
+            [[str(r.get(c, "")) for c in COLUNAS_IDENTIDADE] for r in registros],
+            varias=True
+        )
+
+    def cpf_cadastrado(self, cpf):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM funcionarios WHERE cpf = ?", (cpf,)).fetchone() is not None
+
+    def obter_registro(self, cpf, nome=None):
+        condicao, parametros = self._condicao(cpf, nome)
+        with self._lock:
+            linha = self._conn.execute(
+                f"SELECT {self._lista_colunas} FROM funcionarios WHERE {condicao} ORDER BY id LIMIT 1", parametros
+            ).fetchone()
+        return dict(zip(COLUNAS_PLANILHA, linha)) if linha else None
+
+    def obter_por_cpf(self, cpf):
+        with self._lock:
+            linha = self._conn.execute(
+                f"SELECT {self._lista_colunas} FROM funcionarios WHERE cpf = ?", (cpf,)
+            ).fetchone()
+        return dict(zip(COLUNAS_PLANILHA, linha)) if linha else None
+
+    def consultar(self, **filtros):
+        if not filtros:
+            return self.carregar().df
+        condicao = " AND ".join(f'"{c}" = ?' for c in filtros)
+        with self._lock:
+            linhas = self._conn.execute(
+                f"SELECT {self._lista_colunas} FROM funcionarios WHERE {condicao} ORDER BY id",
+                list(filtros.values())
+            ).fetchall()
+        return tipar_tabela(pd.DataFrame(linhas, columns=COLUNAS_PLANILHA))
+
+    def estatisticas(self):
+        with self._lock:
+            dados = dict(self._estatisticas)
+            dados["registros"] = self._conn.execute("SELECT COUNT(*) FROM funcionarios").fetchone()[0]
+            return dados
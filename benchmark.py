@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Benchmarks das rotinas de dados do sistema de cadastro
+Execute com: python benchmark.py [nome] [--linhas N]
+"""
+
+import argparse
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+import warnings
+
+import pandas as pd
+
+from busca import IndiceBusca
+from cache_planilha import EntradaCache
+from esquema import COLUNAS_PLANILHA, NOMES_EXIBICAO, relatorio_memoria, tabela_texto, tipar_tabela
+from exportacao import FORMATOS_EXPORTACAO, escrever_exportacao
+from filtros import FACETA_IDADE, FAIXAS_IDADE, FACETAS, IndiceFacetas
+from validacao import (
+    formatar_cpf,
+    formatar_cpf_lote,
+    formatar_telefone,
+    formatar_telefone_lote,
+    validar_cpf,
+    validar_cpf_lote,
+    validar_e_normalizar,
+    validar_email,
+    validar_email_lote,
+    validar_telefone,
+    validar_telefone_lote
+)
+
+
+# ==================== DADOS SINTÉTICOS ====================
+
+def gerar_cpf(rnd, valido=True):
+    """CPF formatado; com dígitos verificadores corretos quando valido=True"""
+    digitos = [rnd.randint(0, 9) for _ in range(9)]
+    for pesos in (range(10, 1, -1), range(11, 1, -1)):
+        resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    if not valido:
+        digitos[10] = (digitos[10] + 1) % 10
+    cpf = "".join(map(str, digitos))
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+
+
+def gerar_telefone(rnd):
+    """Telefone em formatos variados (com máscara, com +55, fixo ou celular, às vezes inválido)"""
+    numero = f"{rnd.randint(11, 99)}9{rnd.randint(0, 99999999):08d}"
+    sorteio = rnd.random()
+    if sorteio < 0.3:
+        return f"({numero[:2]}) {numero[2:7]}-{numero[7:]}"
+    if sorteio < 0.5:
+        return f"+55 {numero}"
+    if sorteio < 0.7:
+        return numero[:2] + numero[3:]
+    if sorteio < 0.8:
+        return numero[:7]
+    return numero
+
+
+def gerar_email(rnd, indice):
+    return f"pessoa{indice}@empresa.com.br" if rnd.random() < 0.9 else f"pessoa{indice}@empresa"
+
+
+NOMES = ["Ana", "João", "Maria", "José", "Antônio", "Francisca", "Carlos", "Paulo", "Lúcia", "Luís"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Conceição", "Araújo", "Pereira", "Gonçalves"]
+DIRETORIAS = ["DAFIN", "DIPLAN", "DIJUR", "DITEC", "DIRAD", "DIGEP", "PRESIDÊNCIA"]
+
+
+def gerar_dataframe(linhas, semente=1):
+    """Tabela de funcionários sintética com as colunas da planilha (tudo texto, como no Sheets)"""
+    rnd = random.Random(semente)
+    registros = []
+    for i in range(linhas):
+        registro = dict.fromkeys(COLUNAS_PLANILHA, "")
+        registro.update({
+            'data_hora': f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/2025 10:00:00",
+            'nome': f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)} {i}",
+            'cpf': gerar_cpf(rnd),
+            'endereco': f"Rua {rnd.choice(SOBRENOMES)}, {rnd.randint(1, 999)}",
+            'email': gerar_email(rnd, i),
+            'telefone': gerar_telefone(rnd),
+            'idade': str(rnd.randint(18, 70)),
+            'Diretoria': rnd.choice(DIRETORIAS),
+            'tipo_sanguineo': rnd.choice(["A+", "A-", "B+", "O+", "O-", "AB+"]),
+            'estado_civil': rnd.choice(["Solteiro(a)", "Casado(a)", "Divorciado(a)"]),
+        })
+        registros.append(registro)
+    return pd.DataFrame(registros, columns=COLUNAS_PLANILHA)
+
+
+def cronometrar(funcao, *args, repeticoes=3):
+    """Menor tempo (segundos) entre as repetições e o resultado da última"""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+# ==================== VERSÕES ANTERIORES (REFERÊNCIA) ====================
+# Mesmo código das funções escalares antes da pré-compilação dos padrões e da soma
+# sobre códigos ASCII; servem só de linha de base para benchmark_validacao_registro
+
+def _validar_cpf_anterior(cpf):
+    cpf = cpf.replace('.', '').replace('-', '').replace(' ', '')
+    if len(cpf) != 11 or not cpf.isdigit():
+        return False
+    if cpf == cpf[0] * 11:
+        return False
+    soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
+    resto = soma % 11
+    digito1 = 0 if resto < 2 else 11 - resto
+    if int(cpf[9]) != digito1:
+        return False
+    soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
+    resto = soma % 11
+    digito2 = 0 if resto < 2 else 11 - resto
+    if int(cpf[10]) != digito2:
+        return False
+    return True
+
+
+def _validar_email_anterior(email):
+    padrao = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return bool(re.match(padrao, email))
+
+
+def _validar_telefone_anterior(telefone):
+    telefone = re.sub(r'[\s()\-\.+]', '', telefone)
+    if telefone.startswith('55') and len(telefone) > 11:
+        telefone = telefone[2:]
+    if not telefone.isdigit() or len(telefone) not in (10, 11):
+        return False
+    ddd = int(telefone[:2])
+    if ddd < 11 or ddd > 99:
+        return False
+    if len(telefone) == 11 and telefone[2] != '9':
+        return False
+    return True
+
+
+def _formatar_cpf_anterior(cpf):
+    cpf = cpf.replace('.', '').replace('-', '').replace(' ', '')
+    if len(cpf) == 11 and cpf.isdigit():
+        return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+    return cpf
+
+
+def _formatar_telefone_anterior(telefone):
+    tel = re.sub(r'[\s()\-\.+]', '', telefone)
+    if tel.startswith('55') and len(tel) > 11:
+        tel = tel[2:]
+    if tel.isdigit():
+        if len(tel) == 11:
+            return f"({tel[:2]}) {tel[2:7]}-{tel[7:]}"
+        elif len(tel) == 10:
+            return f"({tel[:2]}) {tel[2:6]}-{tel[6:]}"
+    return telefone
+
+
+# ==================== BENCHMARKS ====================
+
+def benchmark_validacao(linhas):
+    """Funções escalares (uma chamada por valor) x versões em lote (coluna inteira)"""
+    rnd = random.Random(42)
+    cpfs = pd.Series([gerar_cpf(rnd, valido=rnd.random() < 0.9) for _ in range(linhas)])
+    telefones = pd.Series([gerar_telefone(rnd) for _ in range(linhas)])
+    emails = pd.Series([gerar_email(rnd, i) for i in range(linhas)])
+
+    casos = [
+        ("validar_cpf", validar_cpf, validar_cpf_lote, cpfs),
+        ("formatar_cpf", formatar_cpf, formatar_cpf_lote, cpfs),
+        ("validar_telefone", validar_telefone, validar_telefone_lote, telefones),
+        ("formatar_telefone", formatar_telefone, formatar_telefone_lote, telefones),
+        ("validar_email", validar_email, validar_email_lote, emails),
+    ]
+    print(f"\n📊 Validação e formatação ({linhas:,} linhas)\n")
+    print(f"{'função':<20}{'escalar (s)':>14}{'lote (s)':>12}{'ganho':>9}  resultados")
+    for nome, escalar, lote, serie in casos:
+        tempo_escalar, esperado = cronometrar(lambda s: [escalar(v) for v in s], serie)
+        tempo_lote, obtido = cronometrar(lote, serie)
+        iguais = esperado == obtido.tolist()
+        print(f"{nome:<20}{tempo_escalar:>14.4f}{tempo_lote:>12.4f}{tempo_escalar / tempo_lote:>8.1f}x  "
+              f"{'✅ iguais' if iguais else '❌ DIFERENTES'}")
+
+
+def benchmark_validacao_registro(linhas):
+    """Custo por registro no cadastro: versões anteriores x atuais, chamadas separadas x validar_e_normalizar"""
+    rnd = random.Random(7)
+    amostra = min(linhas, 10_000)
+    registros = [{
+        'nome': f"Pessoa {i}",
+        'cpf': gerar_cpf(rnd, valido=rnd.random() < 0.9),
+        'email': gerar_email(rnd, i),
+        'telefone': gerar_telefone(rnd),
+        'emerg1_telefone': gerar_telefone(rnd),
+        'emerg2_telefone': gerar_telefone(rnd) if rnd.random() < 0.5 else "",
+    } for i in range(amostra)]
+
+    def cadastro(v_cpf, v_email, v_tel, f_cpf, f_tel):
+        """Validação e formatação do formulário com chamadas separadas, como no cadastro"""
+        def funcao():
+            for r in registros:
+                (bool(r['nome'].strip()), v_cpf(r['cpf']), v_email(r['email']),
+                 v_tel(r['telefone']), f_cpf(r['cpf']), f_tel(r['telefone']),
+                 f_tel(r['emerg1_telefone']), f_tel(r['emerg2_telefone']))
+        return funcao
+
+    def uma_passada():
+        for r in registros:
+            validar_e_normalizar(r)
+
+    def por_registro(funcao):
+        return min(timeit.repeat(funcao, number=1, repeat=5)) / amostra * 1e6
+
+    casos = [
+        ("validar_cpf", _validar_cpf_anterior, validar_cpf, 'cpf'),
+        ("validar_email", _validar_email_anterior, validar_email, 'email'),
+        ("validar_telefone", _validar_telefone_anterior, validar_telefone, 'telefone'),
+        ("formatar_cpf", _formatar_cpf_anterior, formatar_cpf, 'cpf'),
+        ("formatar_telefone", _formatar_telefone_anterior, formatar_telefone, 'telefone'),
+    ]
+    print(f"\n📊 Validação por registro ({amostra:,} registros, µs/registro, melhor de 5)\n")
+    print(f"{'caminho':<34}{'anterior':>10}{'atual':>10}{'ganho':>9}  resultados")
+    for nome, anterior, atual, campo in casos:
+        valores = [r[campo] for r in registros]
+        iguais = [anterior(v) for v in valores] == [atual(v) for v in valores]
+        tempo_anterior = por_registro(lambda: [anterior(v) for v in valores])
+        tempo_atual = por_registro(lambda: [atual(v) for v in valores])
+        print(f"{nome:<34}{tempo_anterior:>10.2f}{tempo_atual:>10.2f}{tempo_anterior / tempo_atual:>8.1f}x  "
+              f"{'✅ iguais' if iguais else '❌ DIFERENTES'}")
+
+    tempo_anterior = por_registro(cadastro(_validar_cpf_anterior, _validar_email_anterior, _validar_telefone_anterior,
+                                           _formatar_cpf_anterior, _formatar_telefone_anterior))
+    tempo_separado = por_registro(cadastro(validar_cpf, validar_email, validar_telefone, formatar_cpf, formatar_telefone))
+    tempo_passada = por_registro(uma_passada)
+    print(f"{'cadastro: chamadas separadas':<34}{tempo_anterior:>10.2f}{tempo_separado:>10.2f}"
+          f"{tempo_anterior / tempo_separado:>8.1f}x")
+    print(f"{'cadastro: validar_e_normalizar':<34}{tempo_anterior:>10.2f}{tempo_passada:>10.2f}"
+          f"{tempo_anterior / tempo_passada:>8.1f}x")
+
+
+def benchmark_busca(linhas):
+    """Caixa de busca da área administrativa: quatro str.contains por tecla x índice por versão"""
+    df = gerar_dataframe(linhas)
+    termos = ["m", "ma", "mar", "mari", "maria", "maria s", "conceição", "conceicao",
+              "@empresa.com", gerar_cpf(random.Random(1)), "119", "(11) 9"]
+
+    def busca_direta(termo):
+        termo = termo.lower()
+        # Mesmo código da versão anterior (regex), que avisa quando o termo tem parênteses
+        warnings.simplefilter("ignore", UserWarning)
+        return df[
+            df["nome"].str.lower().str.contains(termo, na=False) |
+            df["cpf"].str.lower().str.contains(termo, na=False) |
+            df["email"].str.lower().str.contains(termo, na=False) |
+            df["telefone"].str.lower().str.contains(termo, na=False)
+        ]
+
+    tempo_indice, indice = cronometrar(IndiceBusca, df, repeticoes=1)
+    print(f"\n📊 Busca ({linhas:,} linhas) — montagem do índice: {tempo_indice:.3f}s (uma vez por versão)\n")
+    print(f"{'termo':<20}{'direta (ms)':>13}{'índice (ms)':>13}{'linhas':>9}")
+    for termo in termos:
+        tempo_direto, encontrados = cronometrar(busca_direta, termo, repeticoes=1)
+        # Sem repetição: a segunda chamada do mesmo termo vem do cache de buscas recentes
+        tempo_busca, posicoes = cronometrar(indice.buscar, termo, repeticoes=1)
+        print(f"{termo:<20}{tempo_direto * 1000:>13.1f}{tempo_busca * 1000:>13.1f}{len(posicoes):>9}")
+    print(f"\n{'(termo repetido)':<20}{'':>13}{cronometrar(indice.buscar, termos[-1])[0] * 1000:>13.3f}")
+
+
+def benchmark_filtros(linhas):
+    """Filtros por faceta: comparação das colunas a cada rerun x mapas de bits por versão"""
+    rnd = random.Random(2)
+    df = gerar_dataframe(linhas)
+    df['comorbidade'] = [rnd.choice(["Sim", "Não", "Não", "Não"]) for _ in range(linhas)]
+    df['plano_saude'] = [rnd.choice(["Sim", "Sim", "Não"]) for _ in range(linhas)]
+    df = tipar_tabela(df)
+    combinacoes = [
+        {'Diretoria': ['DAFIN']},
+        {'Diretoria': ['DAFIN', 'DITEC'], 'tipo_sanguineo': ['O+', 'O-']},
+        {'Diretoria': ['DIJUR'], 'estado_civil': ['Casado(a)'], 'plano_saude': ['Sim']},
+        {'tipo_sanguineo': ['A+'], 'comorbidade': ['Sim'], FACETA_IDADE: ['40 a 49', '50 a 59']},
+        {'Diretoria': ['DAFIN', 'DIGEP', 'DITEC'], 'tipo_sanguineo': ['O-'], 'estado_civil': ['Solteiro(a)'],
+         'comorbidade': ['Não'], 'plano_saude': ['Sim'], FACETA_IDADE: ['Até 29', '30 a 39']},
+    ]
+
+    def mascara_direta(filtros):
+        mascara = pd.Series(True, index=df.index)
+        for faceta, valores in filtros.items():
+            if faceta == FACETA_IDADE:
+                idades = pd.to_numeric(df['idade'].astype(str), errors='coerce')
+                faixa = pd.Series(False, index=df.index)
+                for rotulo, minimo, maximo in FAIXAS_IDADE:
+                    if rotulo in valores:
+                        faixa |= idades.between(minimo if minimo is not None else -1, maximo if maximo is not None else 999)
+                mascara &= faixa
+            else:
+                mascara &= df[faceta].astype(str).isin(valores)
+        return mascara.to_numpy()
+
+    def contagens_diretas(filtros):
+        # Contagem ao vivo: para cada faceta, os filtros das outras facetas e um value_counts
+        contagens = {}
+        for faceta in FACETAS:
+            outras = {f: v for f, v in filtros.items() if f != faceta}
+            coluna = df['idade'] if faceta == FACETA_IDADE else df[faceta]
+            contagens[faceta] = coluna[mascara_direta(outras)].astype(str).value_counts()
+        return contagens
+
+    tempo_indice, indice = cronometrar(IndiceFacetas, df, repeticoes=1)
+    print(f"\n📊 Filtros por faceta ({linhas:,} linhas) — montagem dos mapas de bits: {tempo_indice:.3f}s (uma vez por versão)\n")
+    print(f"{'facetas':<9}{'direta (ms)':>13}{'bits (ms)':>11}{'contagens diretas':>19}{'contagens bits':>16}{'linhas':>9}")
+    for filtros in combinacoes:
+        tempo_direto, mascara = cronometrar(mascara_direta, filtros)
+        tempo_bits, mascara_bits = cronometrar(indice.mascara, filtros)
+        if not (mascara == mascara_bits).all():
+            raise RuntimeError(f"mapas de bits divergem da comparação direta: {filtros}")
+        tempo_contagens_diretas, _ = cronometrar(contagens_diretas, filtros, repeticoes=1)
+        tempo_contagens, _ = cronometrar(indice.contagens, filtros)
+        print(f"{len(filtros):<9}{tempo_direto * 1000:>13.1f}{tempo_bits * 1000:>11.2f}"
+              f"{tempo_contagens_diretas * 1000:>19.1f}{tempo_contagens * 1000:>16.2f}{int(mascara_bits.sum()):>9}")
+
+
+def benchmark_memoria(linhas):
+    """Memória da tabela: texto em objetos Python x tabela tipada (categorias, inteiros, datas)"""
+    texto = gerar_dataframe(linhas).astype(object)
+    tempo, tipada = cronometrar(tipar_tabela, texto, repeticoes=1)
+    antes, depois = relatorio_memoria(texto), relatorio_memoria(tipada)
+    print(f"\n📊 Memória ({linhas:,} linhas) — conversão: {tempo:.3f}s\n")
+    print(f"{'coluna':<20}{'tipo':<24}{'antes (B/linha)':>16}{'depois (B/linha)':>18}")
+    for coluna in COLUNAS_PLANILHA:
+        print(f"{coluna:<20}{depois['colunas'][coluna]['tipo'][:23]:<24}"
+              f"{antes['colunas'][coluna]['bytes'] / linhas:>16.1f}{depois['colunas'][coluna]['bytes'] / linhas:>18.1f}")
+    print(f"\n{'total':<44}{antes['bytes_por_linha']:>16.1f}{depois['bytes_por_linha']:>18.1f}")
+    print(f"{'':<44}{antes['total_mb']:>14.1f}MB{depois['total_mb']:>16.1f}MB")
+
+
+def benchmark_exportacao(linhas):
+    """Exportação: CSV inteiro em memória (to_csv) x arquivo gravado em blocos, por formato"""
+    df = tipar_tabela(gerar_dataframe(linhas))
+
+    def medir(funcao, *args):
+        tempo, _ = cronometrar(funcao, *args, repeticoes=1)
+        # Pico medido numa segunda execução: o tracemalloc deixa o código bem mais lento
+        tracemalloc.start()
+        funcao(*args)
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return tempo, pico
+
+    print(f"\n📊 Exportação ({linhas:,} linhas)\n")
+    print(f"{'caminho':<28}{'tempo (s)':>11}{'pico Python (MB)':>18}{'arquivo (MB)':>14}")
+    tempo, pico = medir(lambda: tabela_texto(df).rename(columns=NOMES_EXIBICAO).to_csv(index=False, encoding='utf-8-sig'))
+    print(f"{'to_csv em memória':<28}{tempo:>11.3f}{pico / 2**20:>18.1f}{'':>14}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for formato in FORMATOS_EXPORTACAO:
+            caminho = os.path.join(diretorio, "exportacao" + FORMATOS_EXPORTACAO[formato][1])
+            tempo, pico = medir(escrever_exportacao, df, formato, caminho)
+            print(f"{'em blocos: ' + formato:<28}{tempo:>11.3f}{pico / 2**20:>18.1f}"
+                  f"{os.path.getsize(caminho) / 2**20:>14.1f}")
+
+
+def benchmark_memoria_sessao(linhas):
+    """Memória por rerun da área administrativa: cópias do DataFrame x posições sobre a tabela compartilhada
+
+    O caminho com cópias é o da versão original (df.copy, máscaras, sort_values, rename e to_csv a
+    cada rerun). O atual guarda filtro e ordenação como posições e só converte a página exibida.
+    O pico é o do tracemalloc (memória do Python e do numpy; os buffers de texto do pyarrow
+    são compartilhados entre cópias e não entram na conta).
+    """
+    from consulta import filtrar_posicoes
+
+    entrada = EntradaCache(gerar_dataframe(linhas), 1, None)
+    df = entrada.df
+    colunas_pagina = [df.columns.get_loc(c) for c in ['data_hora', 'nome', 'cpf', 'email', 'telefone', 'Diretoria']]
+    cenarios = [
+        ("sem filtros", "", {}),
+        ("busca", "maria", {}),
+        ("busca + Diretoria", "maria", {'Diretoria': ['DAFIN']}),
+        ("Diretoria + idade", "", {'Diretoria': ['DAFIN'], FACETA_IDADE: ['30 a 39']}),
+    ]
+
+    def rerun_copias(termo, filtros):
+        df_filtrado = df.copy()
+        if termo:
+            mascara = (
+                df_filtrado["nome"].str.lower().str.contains(termo, na=False) |
+                df_filtrado["cpf"].str.lower().str.contains(termo, na=False) |
+                df_filtrado["email"].str.lower().str.contains(termo, na=False) |
+                df_filtrado["telefone"].str.lower().str.contains(termo, na=False)
+            )
+            df_filtrado = df_filtrado[mascara]
+        for diretoria in filtros.get('Diretoria', []):
+            df_filtrado = df_filtrado[df_filtrado["Diretoria"] == diretoria]
+        if FACETA_IDADE in filtros:
+            df_filtrado = df_filtrado[df_filtrado["idade"].between(30, 39)]
+        df_filtrado = df_filtrado.sort_values(by="nome", ascending=True, ignore_index=True)
+        df_filtrado_exibicao = df_filtrado.rename(columns=NOMES_EXIBICAO)
+        df_filtrado_exibicao.to_csv(index=False, encoding='utf-8-sig')
+        return len(df_filtrado)
+
+    def rerun_posicoes(termo, filtros):
+        posicoes = filtrar_posicoes(entrada, termo, filtros, "nome", True)
+        tabela_texto(df.iloc[posicoes[:50], colunas_pagina], NOMES_EXIBICAO)
+        return len(posicoes)
+
+    def pico(funcao, *args):
+        tracemalloc.start()
+        resultado = funcao(*args)
+        maximo = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return maximo, resultado
+
+    base = relatorio_memoria(df)["total_mb"]
+    # Índices de busca/facetas e permutação de ordenação: uma vez por versão, para todas as sessões
+    compartilhadas, _ = pico(lambda: [rerun_posicoes(termo, filtros) for _, termo, filtros in cenarios])
+    print(f"\n📊 Memória por rerun da área administrativa ({linhas:,} linhas) — tabela base: {base:.1f} MB, "
+          f"estruturas por versão (compartilhadas): {compartilhadas / 2**20:.1f} MB\n")
+    print(f"{'cenário':<22}{'cópias (MB)':>13}{'posições (MB)':>15}{'linhas':>9}")
+    for nome, termo, filtros in cenarios:
+        pico_copias, total_copias = pico(rerun_copias, termo, filtros)
+        pico_posicoes, total_posicoes = pico(rerun_posicoes, termo, filtros)
+        if total_copias != total_posicoes:
+            raise RuntimeError(f"{nome}: {total_copias} x {total_posicoes} linhas")
+        print(f"{nome:<22}{pico_copias / 2**20:>13.1f}{pico_posicoes / 2**20:>15.2f}{total_posicoes:>9}")
+
+
+# Executado num processo novo: a primeira execução do app.py, como no primeiro acesso ao contêiner
+_SCRIPT_INICIALIZACAO = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({app!r}, default_timeout=300)
+inicio = time.perf_counter()
+app.run()
+print(time.perf_counter() - inicio, *[m for m in {modulos!r} if m in sys.modules])
+"""
+
+MODULOS_PESADOS = ("numpy", "pandas", "pyarrow", "gspread", "google.oauth2")
+
+
+def benchmark_inicializacao(linhas):
+    """Início a frio: primeira execução do app.py (aba de cadastro) num processo novo"""
+    script = _SCRIPT_INICIALIZACAO.format(
+        app=os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), modulos=MODULOS_PESADOS
+    )
+    print("\n📊 Inicialização (processo novo, 3 execuções)\n")
+    for execucao in range(1, 4):
+        saida = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout.split()
+        print(f"execução {execucao}: primeira renderização em {float(saida[0]) * 1000:.0f} ms"
+              f" — módulos pesados carregados: {', '.join(saida[1:]) or 'nenhum'}")
+
+
+BENCHMARKS = {
+    "validacao": benchmark_validacao,
+    "validacao_registro": benchmark_validacao_registro,
+    "busca": benchmark_busca,
+    "filtros": benchmark_filtros,
+    "memoria": benchmark_memoria,
+    "memoria_sessao": benchmark_memoria_sessao,
+    "exportacao": benchmark_exportacao,
+    "inicializacao": benchmark_inicializacao,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do sistema de cadastro")
+    parser.add_argument("nome", nargs="?", choices=sorted(BENCHMARKS), help="benchmark a executar (padrão: todos)")
+    parser.add_argument("--linhas", type=int, default=100_000, help="quantidade de registros sintéticos")
+    args = parser.parse_args()
+
+    for nome in [args.nome] if args.nome else BENCHMARKS:
+        BENCHMARKS[nome](args.linhas)
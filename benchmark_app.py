@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Benchmarks da aplicação inteira: o app.py roda no AppTest do Streamlit contra a planilha
+simulada em memória (planilha_simulada.py), sem credenciais nem rede
+Mede abertura e rerun da área administrativa, busca, ordenação, edição, exclusão e exclusão em
+lote, com as chamadas à API e o pico de memória, e falha se piorar em relação à referência gravada
+Execute com: python benchmark_app.py [--linhas 1000 10000 100000] [--latencia 0.05] [--salvar-referencia]
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: sem getrusage, o pico de memória não é medido
+    resource = None
+
+from benchmark import NOMES, SOBRENOMES, gerar_cpf
+from esquema import COLUNAS_PLANILHA, linha_de_registro, registro_de_formulario
+from planilha_simulada import AbaSimulada, PoolSimulado
+
+ARQUIVO_APP = Path(__file__).with_name("app.py")
+ARQUIVO_REFERENCIA = Path(__file__).with_name("benchmark_referencia.json")
+
+TAMANHOS_PADRAO = [1_000, 10_000, 100_000]
+
+# Tempo e memória podem passar da referência em até 50% (mais a folga, para etapas muito rápidas);
+# chamadas à API não podem aumentar
+TOLERANCIA_PADRAO = 0.5
+FOLGA_MS = 50
+
+# Opções do formulário de cadastro (app.py)
+DIRETORIAS = ["GABINETE", "DAFIN", "DAPP", "DIPAS", "DIRES", "DIRSIN"]
+TIPOS_SANGUINEOS = ["O+", "O-", "A+", "A-", "B+", "B-", "AB+", "AB-"]
+ESTADOS_CIVIS = ["Solteiro(a)", "Casado(a)", "Divorciado(a)", "Viúvo(a)", "União Estável"]
+PARENTESCOS = ["Mãe", "Pai", "Irmão(ã)", "Cônjuge", "Filho(a)"]
+
+# Aba da área administrativa (app.ABA_CONSULTA)
+ABA_CONSULTA = "📊 Consultar Dados"
+
+
+# ==================== DADOS SINTÉTICOS ====================
+
+def gerar_telefone_valido(rnd):
+    return f"({rnd.randint(11, 99)}) 9{rnd.randint(0, 9999):04d}-{rnd.randint(0, 9999):04d}"
+
+
+def gerar_formulario(rnd, indice):
+    """form_data como o montado no envio do cadastro (mesmas chaves do form_data em app.py)"""
+    nascimento = date(1955, 1, 1) + timedelta(days=rnd.randint(0, 365 * 50))
+    casado = rnd.random() < 0.5
+    filhos = rnd.randint(0, 4)
+    return {
+        'data_hora': f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/2025 {rnd.randint(8, 18):02d}:00:00",
+        'nome': f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)} {indice}",
+        'cpf': gerar_cpf(rnd),
+        'endereco': f"Rua {rnd.choice(SOBRENOMES)}, {rnd.randint(1, 999)}",
+        'email': f"pessoa{indice}@empresa.com.br",
+        'telefone': gerar_telefone_valido(rnd),
+        'idade': 2025 - nascimento.year,
+        'data_nascimento': nascimento.strftime("%d/%m/%Y"),
+        'diretoria': rnd.choice(DIRETORIAS),
+        'comorbidade': "Não",
+        'desc_comorbidade': "",
+        'tipo_sanguineo': rnd.choice(TIPOS_SANGUINEOS),
+        'plano_saude': rnd.choice(["Não", "Sim"]),
+        'nome_plano': "",
+        'estado_civil': rnd.choice(ESTADOS_CIVIS[1:2] if casado else ESTADOS_CIVIS[:1] + ESTADOS_CIVIS[2:]),
+        'nome_conjuge': f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)}" if casado else "",
+        'idade_conjuge': rnd.randint(18, 80) if casado else 0,
+        'possui_filhos': "Sim" if filhos else "Não",
+        'qtd_filhos': filhos,
+        'emerg1_nome': f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)}",
+        'emerg1_telefone': gerar_telefone_valido(rnd),
+        'emerg1_parentesco': rnd.choice(PARENTESCOS),
+        'emerg2_nome': "",
+        'emerg2_telefone': "",
+        'emerg2_parentesco': "",
+    }
+
+
+def gerar_planilha(linhas, semente=1):
+    """Valores da planilha (cabeçalho + linhas) com cadastros sintéticos de CPFs válidos"""
+    rnd = random.Random(semente)
+    return [COLUNAS_PLANILHA] + [
+        linha_de_registro(registro_de_formulario(gerar_formulario(rnd, i))) for i in range(linhas)
+    ]
+
+
+# ==================== CENÁRIO ====================
+
+def pico_memoria_mb():
+    """Pico de memória residente do processo (MB), ou None se indisponível"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return round(pico / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def executar_cenario(linhas, latencia):
+    """Roda as interações da área administrativa com a planilha simulada; retorna as medidas"""
+    import recursos
+    from consulta import ALVO_FILTRADOS
+    from streamlit.testing.v1 import AppTest
+
+    aba = AbaSimulada(gerar_planilha(linhas), latencia=latencia)
+    # O motor Sheets recebe o pool simulado no lugar do autorizado pela conta de serviço
+    recursos._criar_pool_sheets = lambda: PoolSimulado(aba)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        app = AppTest.from_file(str(ARQUIVO_APP), default_timeout=900)
+        app.secrets["google_service_account"] = {"type": "service_account"}
+        app.secrets["google_sheet_id"] = "planilha_simulada"
+        app.secrets["admin_user"] = "admin"
+        app.secrets["admin_password"] = "admin"
+        app.secrets["diretorio_espelho"] = diretorio
+        app.secrets["fila_escrita"] = False
+        app.session_state["admin_autenticado"] = True
+        app.session_state["aba_ativa"] = ABA_CONSULTA
+
+        etapas = {}
+
+        def medir(etapa, executar):
+            aba.chamadas.clear()
+            inicio = time.perf_counter()
+            executar()
+            tempo = time.perf_counter() - inicio
+            falhas = [e.value for e in app.exception] + [e.value for e in app.error]
+            if falhas:
+                raise RuntimeError(f"{etapa}: {falhas}")
+            etapas[etapa] = {
+                "ms": round(tempo * 1000, 1),
+                "chamadas_api": sum(aba.chamadas.values()),
+                "chamadas": dict(aba.chamadas),
+            }
+
+        medir("abertura", app.run)
+        medir("rerun", app.run)
+        medir("busca", lambda: app.text_input(key="termo_busca").input("silva").run())
+        medir("ordenacao", lambda: app.selectbox(key="coluna_ordenar").set_value("idade").run())
+
+        def editar():
+            app.text_input(key="edit_email").input("editado@empresa.com.br")
+            next(b for b in app.button if b.label == "💾 Salvar Alterações").click().run()
+        medir("edicao", editar)
+        if not any(linha[COLUNAS_PLANILHA.index("email")] == "editado@empresa.com.br" for linha in aba.linhas):
+            raise RuntimeError("edição não chegou à planilha")
+
+        def excluir():
+            # O botão só é habilitado depois da confirmação (dois reruns, como no navegador)
+            app.checkbox(key="confirmar_exclusao").check().run()
+            app.button(key="btn_excluir").click().run()
+        medir("exclusao", excluir)
+
+        # Exclusão em lote de todos os registros da busca (um batchUpdate com as faixas de linhas)
+        app.radio(key="alvo_lote").set_value(ALVO_FILTRADOS).run()
+        selecionados = next(
+            int(c.value.split()[0]) for c in app.caption if c.value.endswith("registro(s) selecionado(s)")
+        )
+
+        def excluir_lote():
+            app.checkbox(key="confirmar_exclusao_lote").check().run()
+            app.button(key="btn_excluir_lote").click().run()
+        medir("exclusao_lote", excluir_lote)
+
+    if not selecionados or len(aba.linhas) != linhas - selecionados:
+        raise RuntimeError(f"exclusões não chegaram à planilha ({len(aba.linhas) - 1} linhas)")
+    return {"etapas": etapas, "pico_memoria_mb": pico_memoria_mb()}
+
+
+def medir_tamanho(linhas, latencia):
+    """Cenário num processo novo: caches, módulos e pico de memória só deste tamanho"""
+    saida = subprocess.run(
+        [sys.executable, __file__, "--cenario", str(linhas), "--latencia", str(latencia)],
+        capture_output=True, text=True
+    )
+    if saida.returncode != 0:
+        raise RuntimeError(f"cenário de {linhas} linhas falhou:\n{saida.stderr[-2000:]}")
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+# ==================== REFERÊNCIA ====================
+
+def comparar(resultados, referencia, tolerancia):
+    """Regressões em relação à referência (tempos só com a mesma latência simulada)"""
+    regressoes = []
+    mesma_latencia = referencia.get("latencia") == resultados["latencia"]
+    for tamanho, medidas in resultados["tamanhos"].items():
+        base = referencia.get("tamanhos", {}).get(tamanho)
+        if base is None:
+            continue
+        for etapa, medida in medidas["etapas"].items():
+            base_etapa = base["etapas"].get(etapa)
+            if base_etapa is None:
+                continue
+            if medida["chamadas_api"] > base_etapa["chamadas_api"]:
+                regressoes.append(f"{tamanho} linhas, {etapa}: {medida['chamadas_api']} chamadas à API "
+                                  f"(referência {base_etapa['chamadas_api']})")
+            if mesma_latencia and medida["ms"] > base_etapa["ms"] * (1 + tolerancia) + FOLGA_MS:
+                regressoes.append(f"{tamanho} linhas, {etapa}: {medida['ms']:.0f} ms "
+                                  f"(referência {base_etapa['ms']:.0f} ms)")
+        pico, pico_base = medidas["pico_memoria_mb"], base.get("pico_memoria_mb")
+        if pico is not None and pico_base is not None and pico > pico_base * (1 + tolerancia):
+            regressoes.append(f"{tamanho} linhas: pico de memória {pico:.0f} MB (referência {pico_base:.0f} MB)")
+    return regressoes
+
+
+def imprimir(resultados):
+    print(f"\n📊 Área administrativa no AppTest (latência simulada: {resultados['latencia'] * 1000:.0f} ms/chamada)\n")
+    print(f"{'linhas':>8}  {'etapa':<14}{'tempo (ms)':>12}{'chamadas API':>14}  detalhe")
+    for tamanho, medidas in resultados["tamanhos"].items():
+        for etapa, medida in medidas["etapas"].items():
+            detalhe = ", ".join(f"{nome}={n}" for nome, n in sorted(medida["chamadas"].items()))
+            print(f"{int(tamanho):>8,}  {etapa:<14}{medida['ms']:>12.1f}{medida['chamadas_api']:>14}  {detalhe}")
+        print(f"{'':>8}  {'pico de memória':<28}{medidas['pico_memoria_mb'] or 0:>12.0f} MB\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks da aplicação com a planilha simulada")
+    parser.add_argument("--linhas", type=int, nargs="+", default=TAMANHOS_PADRAO, help="tamanhos da planilha")
+    parser.add_argument("--latencia", type=float, default=0.0, help="latência simulada por chamada à API (s)")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO,
+                        help="aumento aceito de tempo e memória em relação à referência (0.5 = 50%%)")
+    parser.add_argument("--referencia", type=Path, default=ARQUIVO_REFERENCIA, help="arquivo da referência")
+    parser.add_argument("--salvar-referencia", action="store_true", help="grava os resultados como nova referência")
+    parser.add_argument("--cenario", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cenario is not None:
+        print(json.dumps(executar_cenario(args.cenario, args.latencia)))
+        sys.exit(0)
+
+    resultados = {
+        "latencia": args.latencia,
+        "tamanhos": {str(n): medir_tamanho(n, args.latencia) for n in args.linhas},
+    }
+    imprimir(resultados)
+
+    if args.salvar_referencia:
+        referencia = json.loads(args.referencia.read_text()) if args.referencia.exists() else {}
+        if referencia.get("latencia") != args.latencia:
+            referencia = {"latencia": args.latencia, "tamanhos": {}}
+        referencia["tamanhos"].update(resultados["tamanhos"])
+        args.referencia.write_text(json.dumps(referencia, indent=2, ensure_ascii=False) + "\n")
+        print(f"Referência gravada em {args.referencia}")
+    elif args.referencia.exists():
+        regressoes = comparar(resultados, json.loads(args.referencia.read_text()), args.tolerancia)
+        for regressao in regressoes:
+            print(f"❌ {regressao}")
+        if regressoes:
+            sys.exit(1)
+        print("✅ Sem regressões em relação à referência")
+    else:
+        print(f"Sem referência em {args.referencia}: use --salvar-referencia para criar")
@@ -0,0 +1,124 @@
+"""
+Índice de busca da área administrativa
+Cada linha ganha uma chave única (nome e e-mail em minúsculas e sem acentos, CPF e telefone
+só com dígitos), montada uma vez por versão dos dados; cada busca é uma varredura de
+substring sobre essa chave, e não quatro colunas convertidas a cada tecla
+"""
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Colunas de texto pesquisadas pela caixa de busca
+COLUNAS_BUSCA = ['nome', 'email']
+
+# Colunas indexadas só com dígitos: "12345678901" e "123.456.789" encontram "123.456.789-01"
+# (um trecho do CPF/telefone formatado, sem a pontuação, é um trecho dos dígitos)
+COLUNAS_DIGITOS = ['cpf', 'telefone']
+
+# Separa os campos dentro da chave (não aparece em termos digitados)
+SEPARADOR_CAMPOS = '\x1f'
+
+# Resultados de buscas recentes mantidos para refinar a próxima (digitação incremental)
+MAXIMO_RECENTES = 32
+
+# Termo formado só por dígitos e pontuação de CPF/telefone
+_RE_TERMO_NUMERICO = re.compile(r'[\d\s().\-+/]+')
+_RE_NAO_DIGITO = re.compile(r'\D')
+
+# Acentos separados da letra pela normalização NFKD (diacríticos combinantes)
+_ACENTOS = '[\u0300-\u036f]'
+_RE_ACENTOS = re.compile(_ACENTOS)
+
+
+def dobrar_texto(texto):
+    """Minúsculas e sem acentos ("João" → "joao")"""
+    return _RE_ACENTOS.sub('', unicodedata.normalize('NFKD', texto)).lower()
+
+
+def dobrar_coluna(serie):
+    """dobrar_texto para uma coluna inteira"""
+    return serie.str.normalize('NFKD').str.replace(_ACENTOS, '', regex=True).str.lower()
+
+
+def _coluna_texto(df, coluna):
+    if coluna not in df.columns:
+        return pd.Series('', index=df.index, dtype=str)
+    return df[coluna].fillna('').astype(str)
+
+
+class IndiceBusca:
+    """Chave de busca por linha da tabela, na mesma ordem do DataFrame"""
+
+    def __init__(self, df, colunas=COLUNAS_BUSCA, colunas_digitos=COLUNAS_DIGITOS):
+        partes = [dobrar_coluna(_coluna_texto(df, c)) for c in colunas]
+        partes += [_coluna_texto(df, c).str.replace(r'\D', '', regex=True) for c in colunas_digitos]
+        chave = partes[0]
+        for parte in partes[1:]:
+            chave = chave + SEPARADOR_CAMPOS + parte
+        self._chave = chave.reset_index(drop=True)
+        self._lock = threading.Lock()
+        self._recentes = OrderedDict()
+
+    def __len__(self):
+        return len(self._chave)
+
+    def _variantes(self, termo):
+        """Termo dobrado e, se for numérico (CPF/telefone), também só os dígitos"""
+        variantes = [dobrar_texto(termo)]
+        if _RE_TERMO_NUMERICO.fullmatch(termo):
+            digitos = _RE_NAO_DIGITO.sub('', termo)
+            if digitos and digitos != variantes[0]:
+                variantes.append(digitos)
+        return variantes
+
+    def _candidatos(self, termo):
+        """Resultado de uma busca recente cujo termo está contido no novo (superconjunto)"""
+        melhor = None
+        for anterior, posicoes in self._recentes.items():
+            if anterior in termo and (melhor is None or len(posicoes) < len(melhor)):
+                melhor = posicoes
+        # Refinar só compensa quando descarta boa parte das linhas
+        if melhor is not None and len(melhor) > len(self._chave) // 2:
+            return None
+        return melhor
+
+    def buscar(self, termo):
+        """Posições (0..n-1) das linhas que contêm o termo em algum dos campos, em ordem"""
+        termo = termo.strip()
+        if not termo:
+            return np.arange(len(self._chave))
+        chave_cache = dobrar_texto(termo)
+        with self._lock:
+            if chave_cache in self._recentes:
+                self._recentes.move_to_end(chave_cache)
+                return self._recentes[chave_cache]
+            candidatos = self._candidatos(chave_cache)
+
+        chave = self._chave if candidatos is None else self._chave.iloc[candidatos]
+        mascara = np.zeros(len(chave), dtype=bool)
+        for variante in self._variantes(termo):
+            mascara |= chave.str.contains(variante, regex=False).to_numpy(dtype=bool)
+        posicoes = np.flatnonzero(mascara) if candidatos is None else candidatos[mascara]
+        posicoes.flags.writeable = False
+
+        with self._lock:
+            self._recentes[chave_cache] = posicoes
+            while len(self._recentes) > MAXIMO_RECENTES:
+                self._recentes.popitem(last=False)
+        return posicoes
+
+    def mascara(self, termo):
+        """Máscara booleana (uma posição por linha) das linhas que contêm o termo"""
+        mascara = np.zeros(len(self._chave), dtype=bool)
+        mascara[self.buscar(termo)] = True
+        return mascara
+
+
+def indice_busca(entrada):
+    """IndiceBusca da versão em cache (construído na primeira busca e reaproveitado)"""
+    return entrada.derivado("indice_busca", IndiceBusca)
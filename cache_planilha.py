@@ -0,0 +1,426 @@
+"""
+Cache compartilhado da tabela de funcionários
+Evita baixar a planilha inteira a cada rerun do Streamlit: a tabela fica em memória
+por um TTL e, depois dele, só é baixada de novo se a planilha mudou no Drive
+A listagem pode pedir só algumas colunas (projeção), lidas sem baixar as demais
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from agregados import AgregadosTabela
+from desempenho import medir_etapa
+from esquema import COLUNAS_PLANILHA, registro_de_linha, tabela_texto, tipar_tabela
+from indice_cpf import ConjuntoCPF, IndiceCPF
+from projecao import colunas_projecao, ler_colunas
+from sincronizacao import SincronizadorPlanilha
+
+# Tempo (segundos) em que a tabela é servida sem consultar o Google
+TTL_PADRAO = 60
+
+# Onde ficam os espelhos locais (SQLite) das planilhas
+DIRETORIO_ESPELHO_PADRAO = ".cache"
+
+# Só a coluna de CPF (checagem de duplicidade sem baixar a planilha)
+FAIXA_CPF = "C2:C"
+POSICAO_CPF = COLUNAS_PLANILHA.index("cpf")
+
+
+def montar_dataframe(dados):
+    """Converte o retorno de get_all_values() em DataFrame (1ª linha = cabeçalho)"""
+    if not dados:
+        return pd.DataFrame()
+    return pd.DataFrame(dados[1:], columns=dados[0])
+
+
+def _linhas_projetadas(linhas, colunas):
+    """Linhas inteiras da planilha → DataFrame de texto só com as colunas da projeção"""
+    total = len(COLUNAS_PLANILHA)
+    completas = [[str(v) for v in linha[:total]] + [""] * (total - len(linha)) for linha in linhas]
+    return pd.DataFrame(completas, columns=COLUNAS_PLANILHA)[list(colunas)]
+
+
+def _linhas_existentes(df, numeros_linha):
+    """Todas as linhas (numeração da planilha) estão dentro da tabela?"""
+    return all(2 <= n < len(df) + 2 for n in numeros_linha)
+
+
+class EntradaCache:
+    """Tabela em cache de uma planilha, com a versão dos dados
+
+    df chega como texto (como vem da planilha) e é guardado tipado e compacto
+    (ver esquema.tipar_tabela); esquema.tabela_texto/registro_texto voltam ao texto.
+    """
+
+    def __init__(self, df, versao, modificado_remoto):
+        with medir_etapa("tipar_tabela"):
+            self.df = tipar_tabela(df)
+        self.versao = versao
+        self.modificado_remoto = modificado_remoto
+        self.verificado_em = time.monotonic()
+        self.invalida = False
+        self._derivados = {}
+
+    def derivado(self, nome, construir):
+        """Estrutura derivada da tabela (índices, ordenações...), calculada uma vez por versão"""
+        if nome not in self._derivados:
+            self._derivados[nome] = construir(self.df)
+        return self._derivados[nome]
+
+
+class CachePlanilha:
+    """Cache thread-safe de DataFrames por ID de planilha, com TTL e carimbo de versão
+
+    Com diretorio_espelho, os dados são mantidos num espelho local sincronizado de
+    forma incremental (ver sincronizacao.py) em vez de baixados por inteiro.
+    """
+
+    def __init__(self, ttl=TTL_PADRAO, diretorio_espelho=None):
+        self.ttl = ttl
+        self.diretorio_espelho = diretorio_espelho
+        self._lock = threading.Lock()
+        self._entradas = {}
+        self._sincronizadores = {}
+        self._indices = {}
+        self._conjuntos = {}
+        self._projecoes = {}
+        self._agregados = {}
+        self._proxima_versao = 1
+        self._estatisticas = {
+            "hits": 0,
+            "revalidacoes": 0,
+            "downloads": 0,
+            "sincronizacoes": 0,
+            "escritas_locais": 0,
+            "invalidacoes": 0,
+            "indices_construidos": 0,
+            "indices_ajustados": 0,
+            "agregados_construidos": 0,
+            "agregados_ajustados": 0,
+            "cpfs_consultas": 0,
+            "cpfs_leituras_coluna": 0,
+            "leituras_colunas": 0,
+            "projecoes_ajustadas": 0,
+        }
+
+    def obter(self, sheet_id, aba, forcar=False):
+        """Retorna a EntradaCache da planilha, baixando os dados só quando necessário"""
+        # O lock fica retido durante o download: sessões simultâneas esperam
+        # um único get_all_values() em vez de baixarem a planilha cada uma
+        with self._lock:
+            entrada = self._entradas.get(sheet_id)
+            valida = entrada is not None and not entrada.invalida and not forcar
+
+            if valida and time.monotonic() - entrada.verificado_em < self.ttl:
+                self._estatisticas["hits"] += 1
+                return entrada
+
+            # TTL expirado: consulta barata da data de modificação no Drive
+            with medir_etapa("verificacao_modificacao"):
+                modificado_remoto = aba.spreadsheet.get_lastUpdateTime()
+            if valida and modificado_remoto == entrada.modificado_remoto:
+                entrada.verificado_em = time.monotonic()
+                self._estatisticas["revalidacoes"] += 1
+                return entrada
+
+            return self._nova_entrada(sheet_id, self._carregar(sheet_id, aba, modificado_remoto), modificado_remoto)
+
+    def obter_colunas(self, sheet_id, aba, colunas, forcar=False):
+        """EntradaCache com pelo menos as colunas pedidas, lendo só essas colunas quando necessário
+
+        Se a tabela completa está em cache e atual, é ela que volta (sem leitura). Senão fica
+        em cache uma projeção, com as mesmas regras de TTL e data de modificação; pedir uma
+        coluna que ela não tem relê a projeção ampliada (num único batch_get).
+        """
+        colunas = colunas_projecao(colunas)
+        if len(colunas) == len(COLUNAS_PLANILHA):
+            return self.obter(sheet_id, aba, forcar=forcar)
+        with self._lock:
+            completa = self._entradas.get(sheet_id)
+            projecao = self._projecoes.get(sheet_id)
+            completa_valida = completa is not None and not completa.invalida and not forcar
+            cobre = (
+                projecao is not None and not projecao.invalida and not forcar
+                and set(colunas) <= set(projecao.df.columns)
+            )
+
+            agora = time.monotonic()
+            if completa_valida and agora - completa.verificado_em < self.ttl:
+                self._estatisticas["hits"] += 1
+                return completa
+            if cobre and agora - projecao.verificado_em < self.ttl:
+                self._estatisticas["hits"] += 1
+                return projecao
+
+            with medir_etapa("verificacao_modificacao"):
+                modificado_remoto = aba.spreadsheet.get_lastUpdateTime()
+            for entrada, valida in ((completa, completa_valida), (projecao, cobre)):
+                if valida and modificado_remoto == entrada.modificado_remoto:
+                    entrada.verificado_em = agora
+                    self._estatisticas["revalidacoes"] += 1
+                    return entrada
+
+            if projecao is not None:
+                # Mantém as colunas já usadas (a listagem não relê a cada coluna trocada)
+                colunas = colunas_projecao(set(colunas) | set(projecao.df.columns))
+            with medir_etapa("leitura_colunas"):
+                df = ler_colunas(aba, colunas)
+            if df is None:
+                return self._nova_entrada(sheet_id, self._carregar(sheet_id, aba, modificado_remoto), modificado_remoto)
+            self._estatisticas["leituras_colunas"] += 1
+            return self._nova_projecao(sheet_id, df, modificado_remoto)
+
+    def _nova_entrada(self, sheet_id, df, modificado_remoto):
+        entrada = EntradaCache(df, self._proxima_versao, modificado_remoto)
+        self._proxima_versao += 1
+        self._entradas[sheet_id] = entrada
+        return entrada
+
+    def _nova_projecao(self, sheet_id, df, modificado_remoto):
+        projecao = EntradaCache(df, self._proxima_versao, modificado_remoto)
+        self._proxima_versao += 1
+        self._projecoes[sheet_id] = projecao
+        return projecao
+
+    def _sincronizador(self, sheet_id):
+        if sheet_id not in self._sincronizadores:
+            caminho = Path(self.diretorio_espelho) / f"espelho_{sheet_id}.sqlite3"
+            self._sincronizadores[sheet_id] = SincronizadorPlanilha(caminho)
+        return self._sincronizadores[sheet_id]
+
+    def _carregar(self, sheet_id, aba, modificado_remoto):
+        """Baixa a planilha inteira ou sincroniza o espelho local"""
+        if self.diretorio_espelho is None:
+            self._estatisticas["downloads"] += 1
+            with medir_etapa("download_planilha"):
+                return montar_dataframe(aba.get_all_values())
+        self._estatisticas["sincronizacoes"] += 1
+        with medir_etapa("sincronizacao_espelho"):
+            return self._sincronizador(sheet_id).sincronizar(aba, modificado_remoto)
+
+    def _registrar_escrita(self, sheet_id, aplicar, ajustar_indice, ajustar_conjunto, ajustar_projecao, ajustar_agregados):
+        """Aplica uma escrita da própria aplicação no espelho, na projeção, no índice, nos agregados e no
+        conjunto de CPFs, sem ir ao Google"""
+        with self._lock:
+            anterior = self._entradas.get(sheet_id)
+            if anterior is not None and anterior.invalida:
+                anterior = None
+            projecao = self._projecoes.get(sheet_id)
+            if projecao is not None and projecao.invalida:
+                projecao = None
+
+            conjunto = self._conjuntos.get(sheet_id)
+            if conjunto is not None:
+                # Sem a tabela anterior não se sabe que CPFs saíram: o conjunto é relido na próxima consulta
+                referencia = anterior if anterior is not None else projecao
+                if not ajustar_conjunto(conjunto, referencia.df if referencia is not None else None):
+                    del self._conjuntos[sheet_id]
+            # Estruturas derivadas (índice de CPF, agregados) seguem a tabela da qual foram montadas
+            derivadas = []
+            for estruturas, ajustar, contador in (
+                (self._indices, ajustar_indice, "indices_ajustados"),
+                (self._agregados, ajustar_agregados, "agregados_ajustados"),
+            ):
+                estrutura = estruturas.pop(sheet_id, None)
+                base = next((
+                    e for e in (anterior, projecao)
+                    if estrutura is not None and e is not None and e.versao == estrutura.versao
+                ), None)
+                if base is not None:
+                    derivadas.append((estruturas, estrutura, base, ajustar, contador))
+
+            nova_projecao = None
+            if projecao is not None:
+                # A projeção (texto) recebe a mesma escrita; se não couber, é relida na próxima listagem
+                df_projecao = ajustar_projecao(tabela_texto(projecao.df))
+                if df_projecao is None:
+                    projecao.invalida = True
+                else:
+                    nova_projecao = self._nova_projecao(sheet_id, df_projecao, None)
+                    self._estatisticas["projecoes_ajustadas"] += 1
+
+            df = None
+            if self.diretorio_espelho is not None:
+                df = aplicar(self._sincronizador(sheet_id))
+            nova = None
+            if df is None:
+                if anterior is not None:
+                    anterior.invalida = True
+                self._estatisticas["invalidacoes"] += 1
+            else:
+                # modificado_remoto desconhecido: após o TTL o espelho confere as colunas-chave
+                nova = self._nova_entrada(sheet_id, df, None)
+                self._estatisticas["escritas_locais"] += 1
+
+            for estruturas, estrutura, base, ajustar, contador in derivadas:
+                substituta = nova if base is anterior else nova_projecao
+                # Ajustadas no lugar em vez de reconstruídas a partir da tabela
+                if substituta is None or ajustar(estrutura, base.df) is False:
+                    continue
+                estrutura.versao = substituta.versao
+                estruturas[sheet_id] = estrutura
+                self._estatisticas[contador] += 1
+
+    def registrar_insercao(self, sheet_id, linhas):
+        """Chamar após append_row/append_rows"""
+        def ajustar(indice, df):
+            pos_cpf = df.columns.get_loc("cpf")
+            indice.registrar_insercao([linha[pos_cpf] for linha in linhas])
+
+        def ajustar_conjunto(conjunto, df):
+            conjunto.adicionar(str(linha[POSICAO_CPF]) for linha in linhas)
+            return True
+
+        def ajustar_projecao(df):
+            return pd.concat([df, _linhas_projetadas(linhas, df.columns)], ignore_index=True)
+
+        def ajustar_agregados(agregados, df):
+            agregados.registrar(adicionados=[registro_de_linha(linha) for linha in linhas])
+        self._registrar_escrita(
+            sheet_id, lambda sinc: sinc.registrar_insercao(linhas),
+            ajustar, ajustar_conjunto, ajustar_projecao, ajustar_agregados
+        )
+
+    def registrar_atualizacao(self, sheet_id, numero_linha, valores):
+        """Chamar após atualizar uma linha inteira"""
+        self.registrar_atualizacoes(sheet_id, {numero_linha: valores})
+
+    def registrar_atualizacoes(self, sheet_id, valores_por_linha):
+        """Chamar após atualizar várias linhas ({número da linha: valores da linha inteira})"""
+        def ajustar(indice, df):
+            pos_cpf = df.columns.get_loc("cpf")
+            for numero_linha, valores in valores_por_linha.items():
+                indice.registrar_atualizacao(numero_linha, df["cpf"].iat[numero_linha - 2], valores[pos_cpf])
+
+        def ajustar_conjunto(conjunto, df):
+            if df is None:
+                return False
+            conjunto.remover(df["cpf"].iat[n - 2] for n in valores_por_linha)
+            conjunto.adicionar(str(valores[POSICAO_CPF]) for valores in valores_por_linha.values())
+            return True
+
+        def ajustar_projecao(df):
+            if not _linhas_existentes(df, valores_por_linha):
+                return None
+            novas = _linhas_projetadas(list(valores_por_linha.values()), df.columns)
+            df.iloc[[n - 2 for n in valores_por_linha]] = novas.to_numpy()
+            return df
+
+        def ajustar_agregados(agregados, df):
+            if not _linhas_existentes(df, valores_por_linha):
+                return False
+            agregados.registrar(
+                removidos=[agregados.valores_linha(df, n - 2) for n in valores_por_linha],
+                adicionados=[registro_de_linha(valores) for valores in valores_por_linha.values()]
+            )
+        self._registrar_escrita(
+            sheet_id, lambda sinc: sinc.registrar_atualizacoes(valores_por_linha),
+            ajustar, ajustar_conjunto, ajustar_projecao, ajustar_agregados
+        )
+
+    def registrar_exclusao(self, sheet_id, numero_linha):
+        """Chamar após delete_rows de uma linha"""
+        self.registrar_exclusoes(sheet_id, [numero_linha])
+
+    def registrar_exclusoes(self, sheet_id, numeros_linha):
+        """Chamar após excluir várias linhas (números anteriores às exclusões)"""
+        def ajustar(indice, df):
+            # De baixo para cima: as linhas acima da excluída mantêm o número
+            for numero_linha in sorted(numeros_linha, reverse=True):
+                indice.registrar_exclusao(numero_linha, df["cpf"].iat[numero_linha - 2])
+
+        def ajustar_conjunto(conjunto, df):
+            if df is None:
+                return False
+            conjunto.remover(df["cpf"].iat[n - 2] for n in numeros_linha)
+            return True
+
+        def ajustar_projecao(df):
+            if not _linhas_existentes(df, numeros_linha):
+                return None
+            return df.drop(index=df.index[[n - 2 for n in numeros_linha]]).reset_index(drop=True)
+
+        def ajustar_agregados(agregados, df):
+            if not _linhas_existentes(df, numeros_linha):
+                return False
+            agregados.registrar(removidos=[agregados.valores_linha(df, n - 2) for n in numeros_linha])
+        self._registrar_escrita(
+            sheet_id, lambda sinc: sinc.registrar_exclusoes(numeros_linha),
+            ajustar, ajustar_conjunto, ajustar_projecao, ajustar_agregados
+        )
+
+    def indice_cpf(self, sheet_id, entrada):
+        """Índice CPF → linha da versão em cache; só é reconstruído quando os dados vêm do Google"""
+        with self._lock:
+            indice = self._indices.get(sheet_id)
+            if indice is None or indice.versao != entrada.versao:
+                cpfs = entrada.df["cpf"].tolist() if "cpf" in entrada.df.columns else []
+                indice = IndiceCPF(cpfs, entrada.versao)
+                self._indices[sheet_id] = indice
+                self._estatisticas["indices_construidos"] += 1
+            return indice
+
+    def agregados(self, sheet_id, entrada):
+        """Agregados do painel de RH da versão em cache; só são recontados quando os dados vêm do Google"""
+        with self._lock:
+            agregados = self._agregados.get(sheet_id)
+            if agregados is None or agregados.versao != entrada.versao:
+                with medir_etapa("agregados"):
+                    agregados = AgregadosTabela(entrada.df, entrada.versao)
+                self._agregados[sheet_id] = agregados
+                self._estatisticas["agregados_construidos"] += 1
+            return agregados
+
+    def cpfs_cadastrados(self, sheet_id, aba):
+        """ConjuntoCPF da planilha, para checar duplicidade no cadastro
+
+        Dentro do TTL não há chamada à API; depois dele, confere a data de modificação e,
+        se mudou, monta o conjunto da tabela em cache (se estiver atual) ou lendo só a
+        coluna de CPF. Escritas da própria aplicação atualizam o conjunto no lugar.
+        """
+        with self._lock:
+            self._estatisticas["cpfs_consultas"] += 1
+            conjunto = self._conjuntos.get(sheet_id)
+            if conjunto is not None and time.monotonic() - conjunto.verificado_em < self.ttl:
+                return conjunto
+
+            with medir_etapa("verificacao_modificacao"):
+                modificado_remoto = aba.spreadsheet.get_lastUpdateTime()
+            if conjunto is not None and modificado_remoto == conjunto.modificado_remoto:
+                conjunto.verificado_em = time.monotonic()
+                return conjunto
+
+            atuais = [
+                e for e in (self._entradas.get(sheet_id), self._projecoes.get(sheet_id))
+                if e is not None and not e.invalida and e.modificado_remoto == modificado_remoto
+                and "cpf" in e.df.columns
+            ]
+            if atuais:
+                cpfs = atuais[0].df["cpf"].tolist()
+            else:
+                cpfs = [linha[0] for linha in aba.get(FAIXA_CPF) if linha]
+                self._estatisticas["cpfs_leituras_coluna"] += 1
+            conjunto = ConjuntoCPF(cpfs, modificado_remoto)
+            self._conjuntos[sheet_id] = conjunto
+            return conjunto
+
+    def invalidar(self, sheet_id):
+        """Marca a tabela como desatualizada (força novo carregamento na próxima leitura)"""
+        with self._lock:
+            for entrada in (self._entradas.get(sheet_id), self._projecoes.get(sheet_id)):
+                if entrada is not None:
+                    entrada.invalida = True
+            self._estatisticas["invalidacoes"] += 1
+
+    def estatisticas(self):
+        """Cópia dos contadores de uso do cache"""
+        with self._lock:
+            dados = dict(self._estatisticas)
+            dados["ttl_segundos"] = self.ttl
+            dados["versoes"] = {sid: e.versao for sid, e in self._entradas.items()}
+            dados["projecoes"] = {sid: list(e.df.columns) for sid, e in self._projecoes.items()}
+            dados["espelhos"] = {sid: s.estatisticas() for sid, s in self._sincronizadores.items()}
+            return dados
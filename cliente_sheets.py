@@ -0,0 +1,112 @@
+"""
+Cliente compartilhado do Google Sheets
+Mantém uma única sessão autorizada por processo e reaproveita as abas já abertas
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import gspread
+from google.auth.transport.requests import AuthorizedSession, Request
+from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
+
+from desempenho import medir_etapa, registrar_chamada_api
+
+ESCOPOS_GOOGLE = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+# Renova o token antes de expirar para não pagar a renovação no meio de uma requisição
+MARGEM_RENOVACAO_TOKEN = timedelta(minutes=5)
+
+# Conexões HTTP mantidas abertas (keep-alive) para reaproveitamento entre sessões
+TAMANHO_POOL_HTTP = 16
+
+
+def _contar_resposta(resposta, *args, **kwargs):
+    """Hook do requests: cada resposta conta como chamada à API (com os bytes trocados)"""
+    corpo = resposta.request.body
+    registrar_chamada_api(len(resposta.content), len(corpo) if corpo else 0)
+
+
+class PoolSheets:
+    """Sessão autorizada única, thread-safe, com cache de abas por ID de planilha"""
+
+    def __init__(self, credentials, margem_renovacao=MARGEM_RENOVACAO_TOKEN):
+        self.credentials = credentials
+        self.margem_renovacao = margem_renovacao
+        self._lock = threading.RLock()
+        self._sessao = None
+        self._cliente = None
+        self._abas = {}
+        self._estatisticas = {
+            "hits": 0,
+            "misses": 0,
+            "renovacoes_token": 0,
+            "autorizacoes": 0,
+        }
+
+    @classmethod
+    def de_conta_servico(cls, info_conta_servico, **kwargs):
+        """Cria o pool a partir do dicionário da conta de serviço (secrets.toml)"""
+        credentials = Credentials.from_service_account_info(
+            info_conta_servico,
+            scopes=ESCOPOS_GOOGLE
+        )
+        return cls(credentials, **kwargs)
+
+    def _token_expirando(self):
+        """Indica se o token está ausente ou dentro da margem de renovação"""
+        if not self.credentials.token or self.credentials.expiry is None:
+            return True
+        # google-auth guarda a expiração como datetime UTC sem fuso
+        agora = datetime.now(timezone.utc).replace(tzinfo=None)
+        return self.credentials.expiry - self.margem_renovacao <= agora
+
+    def _garantir_cliente(self):
+        """Cria a sessão autorizada na primeira chamada e renova o token se necessário"""
+        if self._cliente is None:
+            self._sessao = AuthorizedSession(self.credentials)
+            adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=TAMANHO_POOL_HTTP)
+            self._sessao.mount("https://", adaptador)
+            self._sessao.hooks["response"].append(_contar_resposta)
+            self._cliente = gspread.Client(auth=self.credentials, session=self._sessao)
+            self._estatisticas["autorizacoes"] += 1
+        if self._token_expirando():
+            self.credentials.refresh(Request(session=self._sessao))
+            self._estatisticas["renovacoes_token"] += 1
+
+    @property
+    def cliente(self):
+        """Cliente gspread autorizado, com token válido"""
+        with self._lock:
+            self._garantir_cliente()
+            return self._cliente
+
+    def obter_aba(self, sheet_id):
+        """Retorna a primeira aba da planilha, abrindo-a apenas na primeira vez"""
+        with self._lock:
+            self._garantir_cliente()
+            aba = self._abas.get(sheet_id)
+            if aba is not None:
+                self._estatisticas["hits"] += 1
+                return aba
+            self._estatisticas["misses"] += 1
+            with medir_etapa("abrir_planilha"):
+                aba = self._cliente.open_by_key(sheet_id).sheet1
+            self._abas[sheet_id] = aba
+            return aba
+
+    def descartar_aba(self, sheet_id):
+        """Remove a aba do cache (ex.: após erro de acesso) para reabrir na próxima chamada"""
+        with self._lock:
+            self._abas.pop(sheet_id, None)
+
+    def estatisticas(self):
+        """Cópia dos contadores de uso do pool"""
+        with self._lock:
+            dados = dict(self._estatisticas)
+            dados["abas_em_cache"] = len(self._abas)
+            return dados
@@ -0,0 +1,681 @@
+"""
+Área administrativa ("Consultar Dados"): tabela, pesquisa, exportação, importação e edição
+Carregada só quando um administrador autenticado abre a aba, junto com pandas/gspread
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from agregados import COLUNAS_AGREGADAS
+from armazenamento import ConflitoEdicao, CPFDuplicado
+from busca import indice_busca
+from desempenho import AMOSTRAS_POR_ETAPA, consumo_api, medir_etapa, resumo_etapas, sessao_atual
+from esquema import COLUNAS_PLANILHA, NOMES_EXIBICAO, registro_texto, relatorio_memoria, tabela_texto
+from exportacao import FORMATOS_EXPORTACAO
+from filtros import COLUNAS_FILTRO, FACETA_IDADE, FACETAS, chave_filtros, indice_facetas
+from importacao import importar_funcionarios
+from inicializacao import relatorio_inicializacao
+from ordenacao import ordenacoes_tabela
+from projecao import COLUNAS_LISTA
+from recursos import FUSO_BRASIL, obter_armazenamento, obter_cache_exportacoes, obter_fila_escrita
+from validacao import formatar_cpf, formatar_telefone, validar_cpf, validar_email
+
+# ==================== FUNÇÕES AUXILIARES ====================
+
+# Paginação da tabela da área administrativa
+TAMANHOS_PAGINA = [25, 50, 100, 250]
+
+# Sugestões exibidas no seletor de registro para editar/excluir
+MAXIMO_OPCOES_REGISTRO = 50
+
+# Diretorias oferecidas na edição (individual e em lote)
+DIRETORIAS = ["GABINETE", "DAFIN", "DAPP", "DIPAS", "DIRES", "DIRSIN"]
+
+# Coluna de marcação da tabela (seleção para as ações em lote)
+COLUNA_SELECAO = "✔"
+ALVO_MARCADOS = "Registros marcados na tabela"
+ALVO_FILTRADOS = "Todos os registros filtrados"
+
+
+def fatiar_pagina(total, pagina, tamanho_pagina):
+    """Limites [inicio, fim) da página (base 1) e o total de páginas"""
+    total_paginas = max(1, -(-total // tamanho_pagina))
+    pagina = min(max(1, pagina), total_paginas)
+    inicio = (pagina - 1) * tamanho_pagina
+    return inicio, min(inicio + tamanho_pagina, total), total_paginas
+
+
+def _mascara_busca(entrada, termo_busca):
+    """Máscara da busca textual (None sem termo)"""
+    if not termo_busca:
+        return None
+    # Índice montado uma vez por versão dos dados (sem acentos, CPF/telefone também só com dígitos)
+    return indice_busca(entrada).mascara(termo_busca)
+
+
+def filtrar_posicoes(entrada, termo_busca, filtros, coluna_ordenar, ascendente):
+    """Posições da tabela que passam pela busca e pelos filtros por faceta, na ordem pedida (somente leitura)"""
+    # Filtros como máscara sobre a tabela em cache (usa nomes originais da planilha)
+    with medir_etapa("busca"):
+        mascara = _mascara_busca(entrada, termo_busca)
+        if chave_filtros(filtros):
+            # Mapas de bits por valor, montados uma vez por versão: AND/OR em vez de comparar colunas
+            mascara = indice_facetas(entrada).mascara(filtros, mascara)
+    # Permutação por coluna/direção calculada uma vez por versão (idades como números, datas como datas)
+    with medir_etapa("ordenacao"):
+        return ordenacoes_tabela(entrada).ordenar(mascara, coluna_ordenar, ascendente)
+
+
+def _nome_faceta(faceta):
+    return "Faixa de Idade" if faceta == FACETA_IDADE else NOMES_EXIBICAO.get(faceta, faceta)
+
+
+def _limpar_filtros():
+    for faceta in FACETAS:
+        st.session_state.pop(f"filtro_{faceta}", None)
+
+
+def renderizar_filtros(entrada, termo_busca):
+    """Filtros por faceta (seleção múltipla) com a contagem ao vivo de cada valor; devolve faceta → valores"""
+    facetas = indice_facetas(entrada)
+    filtros = {}
+    for faceta in FACETAS:
+        chave = f"filtro_{faceta}"
+        # Reatribuído antes do widget a cada rerun: o rótulo leva a contagem, que muda com os filtros,
+        # e o valor guardado deve ser o valor, não o rótulo antigo. Valores que sumiram com uma nova
+        # versão dos dados deixam de ser opção
+        if st.session_state.get(chave):
+            st.session_state[chave] = [v for v in st.session_state[chave] if v in facetas.valores(faceta)]
+        filtros[faceta] = st.session_state.get(chave) or []
+
+    # Contagem de cada valor com a busca e os filtros das outras facetas já aplicados
+    with medir_etapa("facetas"):
+        contagens = facetas.contagens(filtros, _mascara_busca(entrada, termo_busca))
+
+    colunas_filtro = st.columns(3)
+    for posicao, faceta in enumerate(FACETAS):
+        with colunas_filtro[posicao % 3]:
+            filtros[faceta] = st.multiselect(
+                _nome_faceta(faceta),
+                facetas.valores(faceta),
+                format_func=lambda v, f=faceta: f"{v or '(não informado)'} ({contagens[f].get(v, 0)})",
+                placeholder="Todos",
+                key=f"filtro_{faceta}"
+            )
+    if chave_filtros(filtros):
+        st.button("✖️ Limpar filtros", on_click=_limpar_filtros, key="limpar_filtros")
+    return filtros
+
+
+def _tabela_contagem(agregados, coluna):
+    """Contagem por valor com a proporção (tamanho fixo: um item por valor distinto, não por registro)"""
+    contagem = agregados.contagem(coluna)
+    return pd.DataFrame({
+        "Valor": [valor or "(não informado)" for valor, _ in contagem],
+        "Funcionários": [quantidade for _, quantidade in contagem],
+        "Proporção": [100 * quantidade / agregados.total for _, quantidade in contagem],
+    })
+
+
+def renderizar_painel_rh(armazenamento):
+    """Painel de RH: totais por Diretoria, tipo sanguíneo, plano de saúde e comorbidade"""
+    with st.expander("📈 Painel de RH"):
+        agregados = armazenamento.agregados()
+        col_total, col_plano, col_comorbidade = st.columns(3)
+        col_total.metric("Funcionários", f"{agregados.total:,}".replace(",", "."))
+        col_plano.metric("Com plano de saúde", f"{agregados.proporcao('plano_saude', 'Sim'):.0%}")
+        col_comorbidade.metric("Com comorbidade", f"{agregados.proporcao('comorbidade', 'Sim'):.0%}")
+
+        # Tabelas com barra de proporção em vez de gráficos: não montam especificação de gráfico a cada rerun
+        for colunas_painel, titulos in (
+            (st.columns(2), [("Diretoria", "Por Diretoria"), ("tipo_sanguineo", "Por tipo sanguíneo (campanhas de doação)")]),
+            (st.columns(2), [("estado_civil", "Por estado civil"), ("possui_filhos", "Possui filhos")]),
+        ):
+            for coluna_painel, (coluna, titulo) in zip(colunas_painel, titulos):
+                with coluna_painel:
+                    st.markdown(f"**{titulo}**")
+                    st.dataframe(
+                        _tabela_contagem(agregados, coluna),
+                        hide_index=True,
+                        use_container_width=True,
+                        column_config={"Proporção": st.column_config.ProgressColumn(
+                            format="%.0f%%", min_value=0, max_value=100
+                        )}
+                    )
+
+
+def renderizar_desempenho():
+    """Painel "Desempenho": p50/p95 por etapa do rerun e chamadas à API (sessão e processo)"""
+    with st.expander("⏱️ Desempenho"):
+        st.caption(f"Últimas {AMOSTRAS_POR_ETAPA} medições de cada etapa, em todas as sessões deste processo")
+        st.dataframe(
+            [{"etapa": etapa, **medidas} for etapa, medidas in sorted(resumo_etapas().items())],
+            hide_index=True,
+            use_container_width=True
+        )
+        st.markdown("**Chamadas à API do Google**")
+        st.json({"esta sessão": consumo_api(sessao_atual()), "processo": consumo_api()}, expanded=False)
+
+def renderizar_falhas_fila(fila_escrita):
+    """Cadastros que a fila não conseguiu gravar na planilha: lista, exportação e reenvio"""
+    falhas = fila_escrita.falhas()
+    if not falhas:
+        return
+    with st.expander(f"⚠️ {len(falhas)} cadastro(s) não gravado(s) na planilha", expanded=True):
+        tabela = pd.DataFrame(
+            [dict(falha["registro"], erro=falha["erro"]) for falha in falhas]
+        ).reindex(columns=COLUNAS_PLANILHA + ["erro"], fill_value="")
+        st.dataframe(
+            tabela[["data_hora", "nome", "cpf", "erro"]].rename(columns={**NOMES_EXIBICAO, "erro": "Erro"}),
+            hide_index=True,
+            use_container_width=True
+        )
+        col_exportar, col_reenviar = st.columns(2)
+        with col_exportar:
+            st.download_button(
+                label="📥 Exportar (CSV)",
+                data=tabela.rename(columns=NOMES_EXIBICAO).to_csv(index=False, encoding="utf-8-sig"),
+                file_name="cadastros_nao_gravados.csv",
+                mime="text/csv",
+                key="baixar_falhas_fila"
+            )
+        with col_reenviar:
+            # CPFs que já estiverem na planilha saem da fila sem novo envio
+            if st.button("🔁 Reenviar à planilha", key="btn_reenviar_falhas"):
+                fila_escrita.reenviar_falhas()
+                st.rerun()
+
+# ==================== INTERFACE ====================
+
+def renderizar_consulta():
+    """Conteúdo da aba "Consultar Dados" para o administrador autenticado"""
+    armazenamento = obter_armazenamento()
+
+    if armazenamento:
+        try:
+            col_info, col_recarregar = st.columns([4, 1])
+            with col_recarregar:
+                recarregar = st.button("🔄 Recarregar dados")
+            with col_info:
+                painel_armazenamento = st.expander(f"⚙️ Armazenamento: {armazenamento.nome}")
+                with painel_armazenamento:
+                    st.json(armazenamento.estatisticas())
+                    fila_escrita = obter_fila_escrita(armazenamento)
+                    if fila_escrita:
+                        st.markdown("**Fila de gravação**")
+                        st.json(fila_escrita.estatisticas())
+            if fila_escrita:
+                renderizar_falhas_fila(fila_escrita)
+
+            # Tabela compartilhada entre sessões (não alterar in-place). Só as colunas da listagem,
+            # as exibidas e a de ordenação são lidas; os demais campos vêm sob demanda (edição, exportação)
+            colunas_leitura = (
+                COLUNAS_LISTA
+                + list(st.session_state.get("colunas_tabela") or [])
+                + [st.session_state.get("coluna_ordenar", "nome")]
+                # Colunas do painel de RH e dos filtros na mesma leitura
+                + COLUNAS_AGREGADAS + COLUNAS_FILTRO
+            )
+            entrada = armazenamento.carregar_colunas(colunas_leitura, forcar=recarregar)
+            df = entrada.df
+            with painel_armazenamento:
+                st.markdown("**Memória da tabela** (tipos compactos: categorias, inteiros, datas)")
+                st.json(entrada.derivado("relatorio_memoria", relatorio_memoria), expanded=False)
+                st.markdown("**Inicialização** (ms, primeira vez neste processo)")
+                st.json(relatorio_inicializacao(), expanded=False)
+
+            # ===== PAINEL DE RH (contagens mantidas por versão, sem recontar a tabela) =====
+            renderizar_painel_rh(armazenamento)
+
+            # ===== IMPORTAÇÃO EM LOTE =====
+            with st.expander("📤 Importar funcionários em lote (CSV ou XLSX)"):
+                st.caption(
+                    "Use os cabeçalhos da planilha ou os do CSV exportado. "
+                    "Linhas inválidas e CPFs já cadastrados são rejeitados e listados no relatório de erros."
+                )
+                arquivo_importacao = st.file_uploader("Arquivo", type=["csv", "xlsx"], key="arquivo_importacao")
+
+                if arquivo_importacao and st.button("📤 Importar", key="btn_importar"):
+                    cpfs_existentes = set(df["cpf"]) if "cpf" in df.columns else set()
+                    fila_escrita = obter_fila_escrita(armazenamento)
+                    if fila_escrita:
+                        cpfs_existentes.update(r.get("cpf", "") for r in fila_escrita.pendentes())
+
+                    andamento = st.empty()
+                    try:
+                        st.session_state.resultado_importacao = importar_funcionarios(
+                            arquivo_importacao,
+                            arquivo_importacao.name,
+                            armazenamento,
+                            cpfs_existentes,
+                            data_hora=datetime.now(FUSO_BRASIL).strftime("%d/%m/%Y %H:%M:%S"),
+                            progresso=lambda r: andamento.text(f"{r.total} linha(s) processada(s)...")
+                        )
+                    except Exception as e:
+                        st.error(f"❌ Erro ao importar: {str(e)}")
+                    andamento.empty()
+
+                resultado_importacao = st.session_state.get("resultado_importacao")
+                if resultado_importacao:
+                    st.success(
+                        f"✅ {resultado_importacao.importados} de {resultado_importacao.total} "
+                        f"registro(s) importado(s) em {resultado_importacao.chamadas_gravacao} gravação(ões)."
+                    )
+                    if resultado_importacao.erros:
+                        st.warning(f"⚠️ {len(resultado_importacao.erros)} linha(s) rejeitada(s).")
+                        st.download_button(
+                            label="📥 Baixar relatório de erros",
+                            data=resultado_importacao.relatorio_erros_csv(),
+                            file_name="erros_importacao.csv",
+                            mime="text/csv",
+                            key="baixar_erros_importacao"
+                        )
+
+            if len(df) > 0:
+                # ===== PESQUISA E FILTROS =====
+                st.markdown("### 🔍 Pesquisa e Filtros")
+                termo_busca = st.text_input(
+                    "Buscar por nome, CPF, e-mail ou telefone",
+                    key="termo_busca",
+                    placeholder="Digite para pesquisar..."
+                )
+                filtros = renderizar_filtros(entrada, termo_busca)
+
+                # ===== ORDENAÇÃO =====
+                col_ord_campo, col_ord_dir = st.columns([2, 1])
+                with col_ord_campo:
+                    # Mostrar nomes amigáveis no selectbox
+                    coluna_ordenar = st.selectbox(
+                        "Ordenar por",
+                        COLUNAS_PLANILHA,
+                        index=1,  # Nome por padrão
+                        format_func=lambda c: NOMES_EXIBICAO.get(c, c),
+                        key="coluna_ordenar"
+                    )
+                with col_ord_dir:
+                    direcao = st.radio(
+                        "Direção",
+                        ["Crescente (A→Z)", "Decrescente (Z→A)"],
+                        horizontal=True,
+                        key="direcao_ordenar"
+                    )
+
+                ascendente = direcao == "Crescente (A→Z)"
+                # Filtro e ordenação ficam como posições sobre a tabela compartilhada (sem copiar linhas);
+                # só a página, as sugestões do seletor e as linhas de uma ação em lote viram DataFrame
+                posicoes_filtradas = filtrar_posicoes(entrada, termo_busca, filtros, coluna_ordenar, ascendente)
+
+                st.markdown(f"**{len(posicoes_filtradas)}** registro(s) encontrado(s)")
+                st.markdown("---")
+
+                # ===== EXIBIÇÃO DA TABELA (só a página e as colunas escolhidas vão ao navegador) =====
+                col_colunas, col_tamanho, col_pagina = st.columns([4, 1, 1])
+                with col_colunas:
+                    colunas_visiveis = st.multiselect(
+                        "Colunas exibidas",
+                        COLUNAS_PLANILHA,
+                        default=COLUNAS_LISTA,
+                        format_func=lambda c: NOMES_EXIBICAO.get(c, c),
+                        key="colunas_tabela"
+                    ) or COLUNAS_LISTA
+                    # Coluna recém-escolhida é lida no próximo rerun (junto com a projeção)
+                    colunas_visiveis = [c for c in colunas_visiveis if c in df.columns]
+                with col_tamanho:
+                    tamanho_pagina = st.selectbox("Por página", TAMANHOS_PAGINA, index=1, key="tamanho_pagina")
+                total_registros = len(posicoes_filtradas)
+                _, _, total_paginas = fatiar_pagina(total_registros, 1, tamanho_pagina)
+                # Filtro ou tamanho de página novos podem deixar a página guardada fora do intervalo
+                if st.session_state.get("pagina_tabela", 1) > total_paginas:
+                    st.session_state.pagina_tabela = total_paginas
+                with col_pagina:
+                    pagina = st.number_input(
+                        "Página", min_value=1, max_value=total_paginas, step=1, key="pagina_tabela"
+                    )
+                inicio, fim, _ = fatiar_pagina(total_registros, pagina, tamanho_pagina)
+
+                posicoes_pagina = posicoes_filtradas[inicio:fim]
+                with medir_etapa("tabela"):
+                    # Só as linhas da página e as colunas exibidas são copiadas; os nomes de exibição
+                    # entram na própria conversão para texto
+                    df_pagina = df.iloc[posicoes_pagina, [df.columns.get_loc(c) for c in colunas_visiveis]]
+                    tabela_pagina = tabela_texto(df_pagina, NOMES_EXIBICAO)
+                    tabela_pagina.insert(0, COLUNA_SELECAO, False)
+                    # A chave muda com os dados, os filtros e a página: marcações não passam para outras linhas
+                    chave_grade = hash((entrada.versao, termo_busca, chave_filtros(filtros), coluna_ordenar, ascendente, pagina, tamanho_pagina))
+                    grade = st.data_editor(
+                        tabela_pagina,
+                        use_container_width=True,
+                        height=400,
+                        disabled=[c for c in tabela_pagina.columns if c != COLUNA_SELECAO],
+                        column_config={COLUNA_SELECAO: st.column_config.CheckboxColumn(help="Marque para as ações em lote")},
+                        key=f"grade_{chave_grade}"
+                    )
+                if total_registros:
+                    st.caption(f"Página {pagina} de {total_paginas} — registros {inicio + 1} a {fim} de {total_registros}")
+
+                # ===== AÇÕES EM LOTE (uma gravação para todos os registros e uma única atualização da tela) =====
+                resultado_lote = st.session_state.pop("resultado_lote", None)
+                if resultado_lote:
+                    st.success(resultado_lote)
+                with st.expander("🧰 Ações em lote"):
+                    alvo_lote = st.radio("Aplicar a", [ALVO_MARCADOS, ALVO_FILTRADOS], horizontal=True, key="alvo_lote")
+                    if alvo_lote == ALVO_FILTRADOS:
+                        posicoes_lote = posicoes_filtradas
+                    else:
+                        posicoes_lote = posicoes_pagina[np.flatnonzero(grade[COLUNA_SELECAO].to_numpy(dtype=bool))]
+                    st.caption(f"{len(posicoes_lote)} registro(s) selecionado(s)")
+
+                    col_mover, col_excluir_lote = st.columns(2)
+                    with col_mover:
+                        diretoria_lote = st.selectbox("Mover para a Diretoria", DIRETORIAS, key="diretoria_lote")
+                        mover_lote = st.button("🏢 Mover", disabled=len(posicoes_lote) == 0, key="btn_mover_lote")
+                    with col_excluir_lote:
+                        confirmar_lote = st.checkbox(
+                            f"Confirmo a exclusão de {len(posicoes_lote)} registro(s)", key="confirmar_exclusao_lote"
+                        )
+                        excluir_lote = st.button(
+                            "🗑️ Excluir selecionados", type="primary",
+                            disabled=len(posicoes_lote) == 0 or not confirmar_lote, key="btn_excluir_lote"
+                        )
+
+                    if mover_lote or excluir_lote:
+                        registros_lote = tabela_texto(df.iloc[posicoes_lote]).to_dict("records")
+                        try:
+                            with st.spinner("Gravando..."):
+                                if mover_lote:
+                                    quantidade = armazenamento.atualizar_lote(
+                                        [(r, dict(r, Diretoria=diretoria_lote)) for r in registros_lote]
+                                    )
+                                    st.session_state.resultado_lote = f"✅ {quantidade} registro(s) movido(s) para {diretoria_lote}."
+                                else:
+                                    quantidade = armazenamento.excluir_lote(registros_lote)
+                                    st.session_state.resultado_lote = f"✅ {quantidade} registro(s) excluído(s)."
+                                    del st.session_state["confirmar_exclusao_lote"]
+                            st.rerun()
+                        except ConflitoEdicao as e:
+                            st.error(
+                                f"❌ {len(e.cpfs)} registro(s) foram alterados por outra pessoa depois de carregados. "
+                                "Nada foi gravado: recarregue os dados e repita a operação."
+                            )
+                        except Exception as e:
+                            st.error(f"❌ Erro na operação em lote: {str(e)}")
+
+                # ===== EXPORTAÇÃO (gerada só quando pedida, em disco e por versão + filtros) =====
+                col_formato, col_exportar = st.columns([2, 1])
+                with col_formato:
+                    formato_exportacao = st.selectbox(
+                        "Formato da exportação",
+                        list(FORMATOS_EXPORTACAO),
+                        format_func=lambda f: FORMATOS_EXPORTACAO[f][0],
+                        key="formato_exportacao"
+                    )
+                rotulo_formato, extensao, tipo_mime = FORMATOS_EXPORTACAO[formato_exportacao]
+                chave_exportacao = (armazenamento.nome, entrada.versao, termo_busca, chave_filtros(filtros),
+                                    coluna_ordenar, ascendente, formato_exportacao)
+                exportacoes = obter_cache_exportacoes()
+                caminho_exportacao = exportacoes.obter(chave_exportacao)
+                with col_exportar:
+                    st.write("")
+                    if caminho_exportacao is None and st.button("📦 Preparar exportação", key="preparar_exportacao"):
+                        try:
+                            with st.spinner("Gerando arquivo..."), medir_etapa("exportacao"):
+                                # A exportação leva todas as colunas: a tabela completa só é carregada aqui
+                                entrada_completa = armazenamento.carregar()
+                                # Gravada em blocos direto das posições, sem montar a tabela filtrada inteira
+                                caminho_exportacao = exportacoes.gerar(
+                                    chave_exportacao, entrada_completa.df, formato_exportacao,
+                                    posicoes=filtrar_posicoes(entrada_completa, termo_busca, filtros, coluna_ordenar, ascendente)
+                                )
+                        except Exception as e:
+                            st.error(f"❌ Erro ao exportar: {str(e)}")
+                    if caminho_exportacao is not None:
+                        with open(caminho_exportacao, "rb") as arquivo_exportacao:
+                            st.download_button(
+                                label=f"📥 Baixar {rotulo_formato}",
+                                data=arquivo_exportacao,
+                                file_name=f"funcionarios_{datetime.now(FUSO_BRASIL).strftime('%Y%m%d_%H%M%S')}{extensao}",
+                                mime=tipo_mime,
+                                key="baixar_exportacao"
+                            )
+
+                st.markdown("---")
+
+                # ===== EDITAR / EXCLUIR REGISTROS =====
+                st.markdown("### ✏️ Editar ou Excluir Registro")
+
+                if len(posicoes_filtradas) == 0:
+                    st.info("Nenhum registro para editar ou excluir com os filtros atuais.")
+                else:
+                    # ===== SELETOR DE REGISTRO =====
+                    # Busca com sugestões limitadas; a chave da opção é a posição na tabela
+                    termo_registro = st.text_input(
+                        "Localizar registro",
+                        placeholder="Digite nome, CPF, e-mail ou telefone",
+                        key="termo_registro"
+                    )
+                    # Posições na tabela, na ordem da listagem (busca do seletor dentro dos filtrados)
+                    posicoes_candidatas = posicoes_filtradas
+                    if termo_registro:
+                        posicoes_candidatas = posicoes_filtradas[
+                            np.isin(posicoes_filtradas, indice_busca(entrada).buscar(termo_registro))
+                        ]
+
+                    # Chave da opção: a posição na tabela, para que cada linha de um CPF repetido
+                    # na planilha possa ser escolhida
+                    posicoes_opcoes = posicoes_candidatas[:MAXIMO_OPCOES_REGISTRO].tolist()
+                    df_opcoes = df.iloc[posicoes_opcoes]
+                    rotulo_por_posicao = dict(zip(
+                        posicoes_opcoes, (df_opcoes["cpf"] + " — " + df_opcoes["nome"]).tolist()
+                    ))
+
+                    if len(posicoes_candidatas) > MAXIMO_OPCOES_REGISTRO:
+                        st.caption(
+                            f"Mostrando {MAXIMO_OPCOES_REGISTRO} de {len(posicoes_candidatas)} registros. "
+                            "Refine a busca para encontrar outros."
+                        )
+
+                    posicao_selecionada = st.selectbox(
+                        "Selecione o registro",
+                        posicoes_opcoes,
+                        format_func=rotulo_por_posicao.get,
+                        key="registro_selecionado"
+                    )
+
+                    registro = None
+                    if posicao_selecionada is None:
+                        st.info("Nenhum registro encontrado para esta busca.")
+                    else:
+                        # Registro completo lido sob demanda (a listagem só tem algumas colunas), uma vez
+                        # por registro e versão dos dados
+                        selecionado = registro_texto(df.iloc[posicao_selecionada])
+                        cpf_selecionado, nome_selecionado = selecionado["cpf"], selecionado["nome"]
+                        chave_detalhe = (armazenamento.nome, entrada.versao, cpf_selecionado, nome_selecionado)
+                        detalhe = st.session_state.get("registro_detalhe")
+                        if detalhe is None or detalhe[0] != chave_detalhe:
+                            with medir_etapa("registro_detalhe"):
+                                detalhe = (chave_detalhe, armazenamento.obter_registro(cpf_selecionado, nome=nome_selecionado))
+                            st.session_state.registro_detalhe = detalhe
+                        registro = detalhe[1]
+                        if registro is None:
+                            st.warning("⚠️ O registro não foi encontrado na planilha. Recarregue os dados.")
+
+                    if registro is not None:
+                        # Outro registro selecionado: descarta os valores do formulário de edição anterior
+                        if st.session_state.get("registro_em_edicao") != (cpf_selecionado, nome_selecionado):
+                            for k in [k for k in st.session_state.keys() if k.startswith("edit_")]:
+                                del st.session_state[k]
+                            st.session_state.registro_em_edicao = (cpf_selecionado, nome_selecionado)
+
+                        tab_editar, tab_excluir = st.tabs(["✏️ Editar", "🗑️ Excluir"])
+
+                        # ===== ABA EDITAR =====
+                        with tab_editar:
+                            with st.form("form_editar"):
+                                st.markdown(f"**Editando:** {registro['nome']}")
+
+                                col1, col2 = st.columns(2)
+                                with col1:
+                                    edit_nome = st.text_input("Nome Completo", value=registro.get("nome", ""), key="edit_nome")
+                                    edit_cpf = st.text_input("CPF", value=registro.get("cpf", ""), key="edit_cpf")
+                                    edit_email = st.text_input("E-mail", value=registro.get("email", ""), key="edit_email")
+                                    edit_telefone = st.text_input("Telefone", value=registro.get("telefone", ""), key="edit_telefone")
+                                    edit_idade = st.text_input("Idade", value=str(registro.get("idade", "")), key="edit_idade")
+                                    edit_data_nasc = st.text_input("Data de Nascimento", value=registro.get("data_nascimento", ""), key="edit_data_nasc")
+                                    edit_endereco = st.text_area("Endereço", value=registro.get("endereco", ""), key="edit_endereco")
+
+                                with col2:
+                                    diretorias = DIRETORIAS
+                                    idx_dir = diretorias.index(registro.get("Diretoria", "GABINETE")) if registro.get("Diretoria", "") in diretorias else 0
+                                    edit_diretoria = st.selectbox("Diretoria", diretorias, index=idx_dir, key="edit_diretoria")
+
+                                    edit_comorbidade = st.radio("Possui Comorbidade?", ["Não", "Sim"], index=0 if registro.get("comorbidade", "Não") == "Não" else 1, key="edit_comorbidade")
+                                    edit_desc_comorbidade = st.text_area("Descrição Comorbidade", value=registro.get("desc_comorbidade", ""), key="edit_desc_comorbidade")
+
+                                    tipos_sang = ["O+", "O-", "A+", "A-", "B+", "B-", "AB+", "AB-"]
+                                    idx_ts = tipos_sang.index(registro.get("tipo_sanguineo", "O+")) if registro.get("tipo_sanguineo", "") in tipos_sang else 0
+                                    edit_tipo_sang = st.selectbox("Tipo Sanguíneo", tipos_sang, index=idx_ts, key="edit_tipo_sang")
+
+                                    edit_plano_saude = st.radio("Possui Plano de Saúde?", ["Não", "Sim"], index=0 if registro.get("plano_saude", "Não") == "Não" else 1, key="edit_plano_saude")
+                                    edit_nome_plano = st.text_input("Nome do Plano", value=registro.get("nome_plano", ""), key="edit_nome_plano")
+
+                                    estados_civis = ["Solteiro(a)", "Casado(a)", "Divorciado(a)", "Viúvo(a)", "União Estável"]
+                                    idx_ec = estados_civis.index(registro.get("estado_civil", "Solteiro(a)")) if registro.get("estado_civil", "") in estados_civis else 0
+                                    edit_estado_civil = st.selectbox("Estado Civil", estados_civis, index=idx_ec, key="edit_estado_civil")
+
+                                st.markdown("**Família**")
+                                col1, col2 = st.columns(2)
+                                with col1:
+                                    edit_nome_conjuge = st.text_input("Nome Cônjuge/Companheiro(a)", value=registro.get("nome_conjuge", ""), key="edit_nome_conjuge")
+                                    edit_idade_conjuge = st.text_input("Idade Cônjuge", value=str(registro.get("idade_conjuge", "")), key="edit_idade_conjuge")
+                                with col2:
+                                    edit_possui_filhos = st.radio("Possui Filhos?", ["Não", "Sim"], index=0 if registro.get("possui_filhos", "Não") == "Não" else 1, key="edit_possui_filhos")
+                                    edit_qtd_filhos = st.text_input("Quantidade de Filhos", value=str(registro.get("qtd_filhos", "0")), key="edit_qtd_filhos")
+
+                                st.markdown("**Contatos de Emergência**")
+                                col1, col2, col3 = st.columns(3)
+                                with col1:
+                                    edit_e1_nome = st.text_input("Emergência 1 - Nome", value=registro.get("emerg1_nome", ""), key="edit_e1_nome")
+                                with col2:
+                                    edit_e1_tel = st.text_input("Emergência 1 - Telefone", value=registro.get("emerg1_telefone", ""), key="edit_e1_tel")
+                                with col3:
+                                    edit_e1_par = st.text_input("Emergência 1 - Parentesco", value=registro.get("emerg1_parentesco", ""), key="edit_e1_par")
+
+                                col1, col2, col3 = st.columns(3)
+                                with col1:
+                                    edit_e2_nome = st.text_input("Emergência 2 - Nome", value=registro.get("emerg2_nome", ""), key="edit_e2_nome")
+                                with col2:
+                                    edit_e2_tel = st.text_input("Emergência 2 - Telefone", value=registro.get("emerg2_telefone", ""), key="edit_e2_tel")
+                                with col3:
+                                    edit_e2_par = st.text_input("Emergência 2 - Parentesco", value=registro.get("emerg2_parentesco", ""), key="edit_e2_par")
+
+                                salvar_btn = st.form_submit_button("💾 Salvar Alterações", use_container_width=True)
+
+                                if salvar_btn:
+                                    erros_edicao = []
+                                    if not edit_nome.strip():
+                                        erros_edicao.append("Nome é obrigatório")
+                                    if not validar_cpf(edit_cpf):
+                                        erros_edicao.append("CPF inválido")
+                                    if not validar_email(edit_email):
+                                        erros_edicao.append("E-mail inválido")
+
+                                    if erros_edicao:
+                                        st.error("❌ Erros encontrados:")
+                                        for e in erros_edicao:
+                                            st.write(f"• {e}")
+                                    else:
+                                        try:
+                                            registro_atualizado = {
+                                                'data_hora': registro.get("data_hora", ""),
+                                                'nome': edit_nome,
+                                                'cpf': formatar_cpf(edit_cpf),
+                                                'endereco': edit_endereco,
+                                                'email': edit_email,
+                                                'telefone': formatar_telefone(edit_telefone),
+                                                'idade': edit_idade,
+                                                'data_nascimento': edit_data_nasc,
+                                                'Diretoria': edit_diretoria,
+                                                'comorbidade': edit_comorbidade,
+                                                'desc_comorbidade': edit_desc_comorbidade,
+                                                'tipo_sanguineo': edit_tipo_sang,
+                                                'plano_saude': edit_plano_saude,
+                                                'nome_plano': edit_nome_plano,
+                                                'estado_civil': edit_estado_civil,
+                                                'nome_conjuge': edit_nome_conjuge,
+                                                'idade_conjuge': edit_idade_conjuge,
+                                                'possui_filhos': edit_possui_filhos,
+                                                'qtd_filhos': edit_qtd_filhos,
+                                                'emerg1_nome': edit_e1_nome,
+                                                'emerg1_telefone': formatar_telefone(edit_e1_tel),
+                                                'emerg1_parentesco': edit_e1_par,
+                                                'emerg2_nome': edit_e2_nome,
+                                                'emerg2_telefone': formatar_telefone(edit_e2_tel),
+                                                'emerg2_parentesco': edit_e2_par
+                                            }
+
+                                            # Localiza o registro original pelo CPF + Nome e grava só as
+                                            # células alteradas, se ainda estiverem como foram lidas
+                                            atualizado = armazenamento.atualizar(
+                                                registro.get("cpf", ""),
+                                                registro_atualizado,
+                                                nome=registro.get("nome", ""),
+                                                original=registro
+                                            )
+
+                                            if atualizado:
+                                                st.success("✅ Registro atualizado com sucesso!")
+                                                st.rerun()
+                                            else:
+                                                st.error("❌ Não foi possível localizar o registro na planilha.")
+
+                                        except CPFDuplicado:
+                                            st.error("❌ Já existe um cadastro com este CPF.")
+                                        except ConflitoEdicao as e:
+                                            campos = ", ".join(NOMES_EXIBICAO.get(c, c) for c in e.colunas)
+                                            st.error(
+                                                f"❌ Este registro foi alterado por outra pessoa depois de carregado ({campos}). "
+                                                "Recarregue os dados e refaça a edição."
+                                            )
+                                        except Exception as e:
+                                            st.error(f"❌ Erro ao atualizar: {str(e)}")
+
+                        # ===== ABA EXCLUIR =====
+                        with tab_excluir:
+                            st.markdown(f"**Registro selecionado:** {registro['nome']} — CPF: {registro['cpf']}")
+
+                            st.warning("⚠️ Esta ação é irreversível. O registro será permanentemente removido da planilha.")
+
+                            confirmar = st.checkbox("Confirmo que desejo excluir este registro", key="confirmar_exclusao")
+
+                            if st.button("🗑️ Excluir Registro", type="primary", disabled=not confirmar, key="btn_excluir"):
+                                try:
+                                    excluido = armazenamento.excluir(
+                                        registro.get("cpf", ""),
+                                        nome=registro.get("nome", "")
+                                    )
+
+                                    if excluido:
+                                        st.success("✅ Registro excluído com sucesso!")
+                                        st.rerun()
+                                    else:
+                                        st.error("❌ Não foi possível localizar o registro na planilha.")
+                                except ConflitoEdicao:
+                                    st.error(
+                                        "❌ A planilha mudou depois de carregada e a linha deste registro não confere. "
+                                        "Nada foi excluído: recarregue os dados e repita a operação."
+                                    )
+                                except Exception as e:
+                                    st.error(f"❌ Erro ao excluir: {str(e)}")
+
+            else:
+                st.info("Nenhum funcionário cadastrado ainda.")
+
+            renderizar_desempenho()
+        except Exception as e:
+            armazenamento.descartar_conexao()
+            st.error(f"Erro ao consultar dados: {str(e)}")
+    else:
+        st.warning("Credenciais não configuradas.")
@@ -0,0 +1,172 @@
+"""
+Medição das etapas de cada rerun (credenciais, abertura da planilha, leitura, tipagem, busca,
+ordenação, tabela, exportação) e contagem das chamadas à API do Google por sessão
+Cada execução do script pode gerar uma linha de log em JSON e as métricas acumuladas podem ser
+gravadas num arquivo de texto no formato do Prometheus; o painel "Desempenho" da área
+administrativa mostra p50/p95 por etapa
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+# Medições guardadas por etapa para os percentis (as mais antigas são descartadas)
+AMOSTRAS_POR_ETAPA = 500
+
+# Sessões com contagem de chamadas à API mantidas em memória
+MAXIMO_SESSOES = 1000
+
+# Intervalo mínimo (segundos) entre gravações do arquivo de métricas
+INTERVALO_METRICAS = 10
+
+_lock = threading.Lock()
+_local = threading.local()
+_amostras = {}
+_totais = {}
+_sessoes = OrderedDict()
+_api = {"chamadas": 0, "bytes_recebidos": 0, "bytes_enviados": 0}
+_metricas_gravadas_em = 0.0
+
+
+def _registrar_amostra(etapa, segundos):
+    with _lock:
+        if etapa not in _amostras:
+            _amostras[etapa] = deque(maxlen=AMOSTRAS_POR_ETAPA)
+            _totais[etapa] = [0, 0.0]
+        _amostras[etapa].append(segundos)
+        _totais[etapa][0] += 1
+        _totais[etapa][1] += segundos
+
+
+@contextmanager
+def medir_etapa(etapa):
+    """Mede o bloco como uma etapa do rerun atual (e dos percentis do processo)"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        _registrar_amostra(etapa, segundos)
+        execucao = getattr(_local, "execucao", None)
+        if execucao is not None:
+            execucao["etapas"].append((etapa, segundos))
+
+
+def registrar_chamada_api(bytes_recebidos=0, bytes_enviados=0):
+    """Conta uma requisição à API do Google para o processo e para a sessão da thread atual"""
+    with _lock:
+        _api["chamadas"] += 1
+        _api["bytes_recebidos"] += bytes_recebidos
+        _api["bytes_enviados"] += bytes_enviados
+        execucao = getattr(_local, "execucao", None)
+        if execucao is None:
+            return
+        for consumo in (execucao["api"], _sessoes.setdefault(execucao["sessao"], dict.fromkeys(_api, 0))):
+            consumo["chamadas"] += 1
+            consumo["bytes_recebidos"] += bytes_recebidos
+            consumo["bytes_enviados"] += bytes_enviados
+        _sessoes.move_to_end(execucao["sessao"])
+        while len(_sessoes) > MAXIMO_SESSOES:
+            _sessoes.popitem(last=False)
+
+
+@contextmanager
+def rastrear_execucao(sessao, log=False, arquivo_metricas=""):
+    """Uma execução do script (rerun) da sessão: etapa "rerun", log JSON e arquivo de métricas"""
+    _local.execucao = {"sessao": sessao, "etapas": [], "api": dict.fromkeys(_api, 0)}
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        _registrar_amostra("rerun", segundos)
+        execucao = _local.execucao
+        _local.execucao = None
+        if log:
+            print(json.dumps({
+                "sessao": sessao,
+                "rerun_ms": round(segundos * 1000, 1),
+                "etapas": [[etapa, round(s * 1000, 1)] for etapa, s in execucao["etapas"]],
+                "api": execucao["api"],
+            }), file=sys.stderr, flush=True)
+        if arquivo_metricas:
+            gravar_metricas(arquivo_metricas)
+
+
+def _percentil(ordenados, fracao):
+    return ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))]
+
+
+def resumo_etapas():
+    """p50/p95 (ms) das últimas medições de cada etapa, com o total de medições"""
+    with _lock:
+        copias = {etapa: (sorted(amostras), _totais[etapa][0]) for etapa, amostras in _amostras.items()}
+    return {
+        etapa: {
+            "medicoes": total,
+            "p50_ms": round(_percentil(ordenados, 0.5) * 1000, 1),
+            "p95_ms": round(_percentil(ordenados, 0.95) * 1000, 1),
+            "max_ms": round(ordenados[-1] * 1000, 1),
+        }
+        for etapa, (ordenados, total) in copias.items()
+    }
+
+
+def sessao_atual():
+    """Identificador da sessão do rerun em andamento nesta thread (None fora de um rerun)"""
+    execucao = getattr(_local, "execucao", None)
+    return execucao["sessao"] if execucao is not None else None
+
+
+def consumo_api(sessao=None):
+    """Chamadas e bytes da API do Google: da sessão informada ou do processo inteiro"""
+    with _lock:
+        if sessao is None:
+            return dict(_api)
+        return dict(_sessoes.get(sessao, dict.fromkeys(_api, 0)))
+
+
+def metricas_prometheus():
+    """Métricas acumuladas no formato de texto do Prometheus"""
+    with _lock:
+        copias = {etapa: (sorted(amostras), *_totais[etapa]) for etapa, amostras in _amostras.items()}
+        api = dict(_api)
+    linhas = [
+        "# HELP app_cad_rh_etapa_segundos Duração das etapas do rerun (quantis das últimas medições)",
+        "# TYPE app_cad_rh_etapa_segundos summary",
+    ]
+    for etapa, (ordenados, total, soma) in sorted(copias.items()):
+        for quantil in (0.5, 0.95):
+            linhas.append(f'app_cad_rh_etapa_segundos{{etapa="{etapa}",quantile="{quantil}"}} '
+                          f'{_percentil(ordenados, quantil):.6f}')
+        linhas.append(f'app_cad_rh_etapa_segundos_sum{{etapa="{etapa}"}} {soma:.6f}')
+        linhas.append(f'app_cad_rh_etapa_segundos_count{{etapa="{etapa}"}} {total}')
+    linhas += [
+        "# HELP app_cad_rh_api_chamadas_total Requisições à API do Google",
+        "# TYPE app_cad_rh_api_chamadas_total counter",
+        f"app_cad_rh_api_chamadas_total {api['chamadas']}",
+        "# HELP app_cad_rh_api_bytes_total Bytes trocados com a API do Google",
+        "# TYPE app_cad_rh_api_bytes_total counter",
+        f'app_cad_rh_api_bytes_total{{direcao="recebidos"}} {api["bytes_recebidos"]}',
+        f'app_cad_rh_api_bytes_total{{direcao="enviados"}} {api["bytes_enviados"]}',
+    ]
+    return "\n".join(linhas) + "\n"
+
+
+def gravar_metricas(caminho, forcar=False):
+    """Grava metricas_prometheus() no arquivo (no máximo a cada INTERVALO_METRICAS segundos)"""
+    global _metricas_gravadas_em
+    with _lock:
+        agora = time.monotonic()
+        if not forcar and agora - _metricas_gravadas_em < INTERVALO_METRICAS:
+            return
+        _metricas_gravadas_em = agora
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(metricas_prometheus())
+    # Substituição atômica: o coletor nunca lê um arquivo pela metade
+    os.replace(temporario, caminho)
@@ -0,0 +1,221 @@
+"""
+Esquema da planilha de funcionários
+Ordem das colunas, nomes de exibição e tipos em memória compartilhados pela interface e
+pelos motores de armazenamento
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Cabeçalhos reais da planilha, na ordem das colunas (A até Y)
+COLUNAS_PLANILHA = [
+    'data_hora',
+    'nome',
+    'cpf',
+    'endereco',
+    'email',
+    'telefone',
+    'idade',
+    'data_nascimento',
+    'Diretoria',
+    'comorbidade',
+    'desc_comorbidade',
+    'tipo_sanguineo',
+    'plano_saude',
+    'nome_plano',
+    'estado_civil',
+    'nome_conjuge',
+    'idade_conjuge',
+    'possui_filhos',
+    'qtd_filhos',
+    'emerg1_nome',
+    'emerg1_telefone',
+    'emerg1_parentesco',
+    'emerg2_nome',
+    'emerg2_telefone',
+    'emerg2_parentesco'
+]
+
+# Colunas numéricas e de data (o Sheets devolve tudo como texto)
+COLUNAS_NUMERICAS = ['idade', 'idade_conjuge', 'qtd_filhos']
+FORMATOS_DATA = {
+    'data_hora': '%d/%m/%Y %H:%M:%S',
+    'data_nascimento': '%d/%m/%Y'
+}
+
+# Colunas com poucos valores distintos, repetidos em todas as linhas (guardadas como categorias)
+COLUNAS_CATEGORICAS = [
+    'Diretoria',
+    'comorbidade',
+    'tipo_sanguineo',
+    'plano_saude',
+    'estado_civil',
+    'possui_filhos',
+    'emerg1_parentesco',
+    'emerg2_parentesco'
+]
+
+# Nomes amigáveis para exibição
+NOMES_EXIBICAO = {
+    'data_hora': 'Data/Hora Cadastro',
+    'nome': 'Nome Completo',
+    'cpf': 'CPF',
+    'endereco': 'Endereço',
+    'email': 'E-mail',
+    'telefone': 'Telefone',
+    'idade': 'Idade',
+    'data_nascimento': 'Data de Nascimento',
+    'Diretoria': 'Diretoria',
+    'comorbidade': 'Possui Comorbidade',
+    'desc_comorbidade': 'Descrição Comorbidade',
+    'tipo_sanguineo': 'Tipo Sanguíneo',
+    'plano_saude': 'Possui Plano de Saúde',
+    'nome_plano': 'Nome do Plano',
+    'estado_civil': 'Estado Civil',
+    'nome_conjuge': 'Nome Cônjuge/Companheiro(a)',
+    'idade_conjuge': 'Idade Cônjuge/Companheiro(a)',
+    'possui_filhos': 'Possui Filhos',
+    'qtd_filhos': 'Quantidade de Filhos',
+    'emerg1_nome': 'Emergência 1 - Nome',
+    'emerg1_telefone': 'Emergência 1 - Telefone',
+    'emerg1_parentesco': 'Emergência 1 - Parentesco',
+    'emerg2_nome': 'Emergência 2 - Nome',
+    'emerg2_telefone': 'Emergência 2 - Telefone',
+    'emerg2_parentesco': 'Emergência 2 - Parentesco'
+}
+
+
+def registro_de_formulario(form_data):
+    """Converte o form_data do cadastro em registro com as colunas da planilha"""
+    registro = dict(form_data)
+    registro['Diretoria'] = registro.pop('diretoria')
+    return registro
+
+
+def linha_de_registro(registro):
+    """Monta a linha da planilha (lista na ordem das colunas) a partir do registro"""
+    return [registro.get(coluna, "") for coluna in COLUNAS_PLANILHA]
+
+
+def registro_de_linha(linha):
+    """Monta o registro (dicionário) a partir de uma linha da planilha"""
+    return dict(zip(COLUNAS_PLANILHA, linha))
+
+
+# ==================== TIPOS EM MEMÓRIA ====================
+
+def _tipo_texto():
+    """Texto em buffers pyarrow quando disponível (bem menor que objetos str do Python)"""
+    for argumentos in ({"storage": "pyarrow", "na_value": np.nan}, {"storage": "pyarrow_numpy"}):
+        try:
+            return pd.StringDtype(**argumentos)
+        except (TypeError, ValueError, ImportError):
+            continue
+    return object
+
+
+TIPO_TEXTO = _tipo_texto()
+
+
+def tipo_coluna(coluna):
+    """'categoria', 'inteiro', 'data' ou 'texto'"""
+    if coluna in COLUNAS_CATEGORICAS:
+        return 'categoria'
+    if coluna in COLUNAS_NUMERICAS:
+        return 'inteiro'
+    if coluna in FORMATOS_DATA:
+        return 'data'
+    return 'texto'
+
+
+def _padrao_formato(formato):
+    """Regex equivalente a um formato strftime de campos numéricos (ex.: %d/%m/%Y)"""
+    larguras = {'%d': 2, '%m': 2, '%Y': 4, '%H': 2, '%M': 2, '%S': 2}
+    padrao = re.escape(formato)
+    for campo, largura in larguras.items():
+        padrao = padrao.replace(re.escape(campo), f'[0-9]{{{largura}}}')
+    return padrao
+
+
+def tipar_coluna(serie, coluna):
+    """Converte a coluna de texto para o tipo do esquema; valores vazios viram NA
+
+    Se algum valor não puder ser convertido sem perda (ex.: idade "25 anos" ou "07",
+    data "1/2/2020"), a coluna inteira continua como texto, para que o registro volte
+    igual à planilha.
+    """
+    texto = serie.fillna('').astype(str)
+    preenchido = texto != ''
+    tipo = tipo_coluna(coluna)
+    if tipo == 'categoria':
+        return texto.astype('category')
+    if tipo == 'inteiro':
+        if texto[preenchido].str.fullmatch(r'0|-?[1-9][0-9]{0,17}').all():
+            return pd.to_numeric(texto.where(preenchido)).astype('Int64')
+    elif tipo == 'data':
+        # Campos com zeros à esquerda e data válida: a conversão volta exatamente ao texto
+        formato = FORMATOS_DATA[coluna]
+        if texto[preenchido].str.fullmatch(_padrao_formato(formato)).all():
+            datas = pd.to_datetime(texto.where(preenchido), format=formato, errors='coerce')
+            if datas[preenchido].notna().all():
+                return datas
+    return texto.astype(TIPO_TEXTO)
+
+
+def tipar_tabela(df):
+    """Tabela de texto (como vem da planilha) → tabela tipada e compacta"""
+    return pd.DataFrame({coluna: tipar_coluna(df[coluna], coluna) for coluna in df.columns}, index=df.index)
+
+
+def coluna_texto(serie, coluna):
+    """Coluna da tabela tipada como texto da planilha"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.astype(str)
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return serie.dt.strftime(FORMATOS_DATA.get(coluna, '%d/%m/%Y')).fillna('')
+    if pd.api.types.is_integer_dtype(serie.dtype):
+        return serie.astype(str).where(serie.notna(), '')
+    return serie.fillna('').astype(str)
+
+
+def tabela_texto(df, nomes=None):
+    """Tabela tipada → texto exatamente como na planilha (exportação e gravação)
+
+    Com nomes (ex.: NOMES_EXIBICAO), as colunas já saem com os nomes de exibição, sem um
+    rename (cópia) depois da conversão.
+    """
+    nomes = nomes or {}
+    return pd.DataFrame(
+        {nomes.get(coluna, coluna): coluna_texto(df[coluna], coluna) for coluna in df.columns}, index=df.index
+    )
+
+
+def valor_texto(valor, coluna):
+    """Um valor da tabela tipada como texto da planilha"""
+    if valor is None or valor is pd.NA or valor is pd.NaT or (isinstance(valor, float) and np.isnan(valor)):
+        return ''
+    if isinstance(valor, pd.Timestamp):
+        return valor.strftime(FORMATOS_DATA.get(coluna, '%d/%m/%Y'))
+    return str(valor)
+
+
+def registro_texto(linha):
+    """Linha da tabela tipada (Series) → registro com os valores em texto"""
+    return {coluna: valor_texto(valor, coluna) for coluna, valor in linha.items()}
+
+
+def relatorio_memoria(df):
+    """Memória ocupada pela tabela: total, por linha e por coluna (com o tipo)"""
+    por_coluna = df.memory_usage(deep=True, index=False)
+    total = int(por_coluna.sum())
+    return {
+        "linhas": len(df),
+        "total_mb": round(total / 2**20, 2),
+        "bytes_por_linha": round(total / len(df), 1) if len(df) else 0,
+        "colunas": {
+            coluna: {"tipo": str(df[coluna].dtype), "bytes": int(por_coluna[coluna])}
+            for coluna in df.columns
+        },
+    }
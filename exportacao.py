@@ -0,0 +1,140 @@
+"""
+Exportação da tabela de funcionários (CSV, CSV compactado e Parquet)
+O arquivo só é gerado quando solicitado, gravado em disco em blocos e guardado por versão
+dos dados + filtros + formato, de modo que baixar de novo não refaz o trabalho
+"""
+
+import atexit
+import gzip
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from esquema import NOMES_EXIBICAO, tabela_texto
+
+# formato → (rótulo, extensão, tipo MIME)
+FORMATOS_EXPORTACAO = {
+    "csv": ("CSV (Excel)", ".csv", "text/csv"),
+    "csv.gz": ("CSV compactado (gzip)", ".csv.gz", "application/gzip"),
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+}
+
+# Linhas convertidas e gravadas por vez
+TAMANHO_BLOCO_EXPORTACAO = 10_000
+
+# Arquivos mantidos em disco (os mais antigos são apagados)
+MAXIMO_ARQUIVOS = 8
+
+
+def _blocos(df, posicoes, tamanho_bloco):
+    """Blocos da tabela nas posições pedidas: só um bloco de linhas é copiado por vez"""
+    total = len(df) if posicoes is None else len(posicoes)
+    for inicio in range(0, max(total, 1), tamanho_bloco):
+        if posicoes is None:
+            yield inicio, df.iloc[inicio:inicio + tamanho_bloco]
+        else:
+            yield inicio, df.iloc[posicoes[inicio:inicio + tamanho_bloco]]
+
+
+def _escrever_csv(df, posicoes, arquivo, tamanho_bloco):
+    for inicio, bloco in _blocos(df, posicoes, tamanho_bloco):
+        tabela_texto(bloco, NOMES_EXIBICAO).to_csv(arquivo, index=False, header=inicio == 0)
+
+
+def _escrever_parquet(df, posicoes, caminho, tamanho_bloco):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Instale o pyarrow para exportar em Parquet: pip install pyarrow") from e
+
+    escritor = None
+    try:
+        for _, bloco in _blocos(df, posicoes, tamanho_bloco):
+            # Parquet mantém os tipos (categorias, inteiros, datas); renomear a tabela Arrow não copia dados
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            tabela = tabela.rename_columns([NOMES_EXIBICAO.get(c, c) for c in tabela.column_names])
+            if escritor is None:
+                escritor = pq.ParquetWriter(str(caminho), tabela.schema)
+            escritor.write_table(tabela.cast(escritor.schema))
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def escrever_exportacao(df, formato, caminho, tamanho_bloco=TAMANHO_BLOCO_EXPORTACAO, posicoes=None):
+    """Grava a tabela (tipada) no arquivo, em blocos, com os nomes de exibição nas colunas
+
+    Com posicoes (filtro e ordenação já resolvidos), só essas linhas são gravadas, nessa ordem,
+    sem montar a tabela filtrada inteira antes.
+    """
+    if formato == "parquet":
+        _escrever_parquet(df, posicoes, caminho, tamanho_bloco)
+        return
+    abrir = gzip.open if formato == "csv.gz" else open
+    # UTF-8 com BOM: o Excel reconhece os acentos ao abrir o CSV
+    with abrir(caminho, "wt", encoding="utf-8-sig", newline="") as arquivo:
+        _escrever_csv(df, posicoes, arquivo, tamanho_bloco)
+
+
+class CacheExportacoes:
+    """Arquivos exportados em disco por chave (versão dos dados, filtros, formato), com LRU"""
+
+    def __init__(self, diretorio=None, maximo=MAXIMO_ARQUIVOS):
+        if diretorio is None:
+            # Diretório temporário próprio, apagado quando o processo termina
+            diretorio = tempfile.mkdtemp(prefix="exportacoes_")
+            atexit.register(shutil.rmtree, diretorio, True)
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        self._arquivos = OrderedDict()
+        self._proximo = 1
+        self._estatisticas = {"geradas": 0, "reaproveitadas": 0}
+
+    def obter(self, chave):
+        """Caminho do arquivo já gerado para a chave, ou None"""
+        with self._lock:
+            caminho = self._arquivos.get(chave)
+            if caminho is not None:
+                self._arquivos.move_to_end(chave)
+                self._estatisticas["reaproveitadas"] += 1
+            return caminho
+
+    def gerar(self, chave, df, formato, posicoes=None):
+        """Gera (uma vez por chave) o arquivo da tabela (ou das posições pedidas) no formato; retorna o caminho"""
+        with self._lock:
+            if chave in self._arquivos:
+                self._arquivos.move_to_end(chave)
+                self._estatisticas["reaproveitadas"] += 1
+                return self._arquivos[chave]
+            caminho = self.diretorio / f"exportacao_{self._proximo}{FORMATOS_EXPORTACAO[formato][1]}"
+            self._proximo += 1
+            temporario = caminho.with_name(caminho.name + ".parcial")
+            try:
+                escrever_exportacao(df, formato, temporario, posicoes=posicoes)
+                temporario.replace(caminho)
+            finally:
+                temporario.unlink(missing_ok=True)
+            self._arquivos[chave] = caminho
+            self._estatisticas["geradas"] += 1
+            while len(self._arquivos) > self.maximo:
+                _, antigo = self._arquivos.popitem(last=False)
+                antigo.unlink(missing_ok=True)
+            return caminho
+
+    def limpar(self):
+        """Apaga todos os arquivos gerados"""
+        with self._lock:
+            self._arquivos.clear()
+            shutil.rmtree(self.diretorio, ignore_errors=True)
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+
+    def estatisticas(self):
+        with self._lock:
+            dados = dict(self._estatisticas)
+            dados["arquivos"] = len(self._arquivos)
+            return dados
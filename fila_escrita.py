@@ -0,0 +1,239 @@
+"""
+Fila de gravação em segundo plano (write-behind) para novos cadastros
+O cadastro é gravado num diário local (SQLite) e confirmado na hora; uma thread envia
+os pendentes em lotes (append_rows) e repete com espera exponencial quando a API
+responde 429. Pendentes que sobraram de uma execução anterior são reenviados ao iniciar,
+sem os CPFs que já estão na planilha (queda entre o envio e a limpeza do diário).
+Lotes recusados de forma permanente ficam registrados para reenvio ou exportação.
+"""
+
+import json
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+# Registros por chamada de envio
+TAMANHO_LOTE = 500
+
+# Intervalo (segundos) entre verificações da thread quando não há novos cadastros
+INTERVALO_VERIFICACAO = 2.0
+
+# Espera exponencial após erro temporário: 1s, 2s, 4s... até o máximo
+ESPERA_INICIAL = 1.0
+ESPERA_MAXIMA = 64.0
+
+
+def erro_temporario(erro):
+    """Erros que valem nova tentativa: limite de requisições (429), erro do servidor ou de rede"""
+    resposta = getattr(erro, "response", None)
+    status = getattr(resposta, "status_code", None)
+    if status is None:
+        # Falhas de rede do requests herdam de OSError
+        return isinstance(erro, OSError)
+    return status == 429 or status >= 500
+
+
+class FilaEscrita:
+    """Diário durável de cadastros pendentes e thread que os envia em lotes"""
+
+    def __init__(self, caminho_diario, enviar_lote, cpf_cadastrado=None, tamanho_lote=TAMANHO_LOTE,
+                 intervalo=INTERVALO_VERIFICACAO):
+        self.caminho_diario = Path(caminho_diario)
+        self.caminho_diario.parent.mkdir(parents=True, exist_ok=True)
+        self.enviar_lote = enviar_lote
+        # Consulta se o CPF já está na planilha (None: envia tudo)
+        self.cpf_cadastrado = cpf_cadastrado
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._sinal = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+        self._conn = sqlite3.connect(str(self.caminho_diario), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pendentes (
+                id INTEGER PRIMARY KEY,
+                registro TEXT NOT NULL,
+                criado_em REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS falhas (
+                id INTEGER PRIMARY KEY,
+                registro TEXT NOT NULL,
+                criado_em REAL NOT NULL,
+                erro TEXT NOT NULL
+            );
+        """)
+        self._tentativas = 0
+        self._proxima_tentativa = 0.0
+        self._latencias_lote = deque(maxlen=100)
+        self._esperas_na_fila = deque(maxlen=1000)
+        self._estatisticas = {
+            "enfileirados": 0,
+            "enviados": 0,
+            "ja_cadastrados": 0,
+            "lotes": 0,
+            "erros_temporarios": 0,
+            "falhas": 0,
+            "ultimo_erro": "",
+        }
+
+    # ---------- produtor ----------
+
+    def enfileirar(self, registro):
+        """Grava o cadastro no diário e acorda a thread de envio"""
+        self.enfileirar_lote([registro])
+
+    def enfileirar_lote(self, registros):
+        """Grava vários cadastros no diário numa única transação"""
+        agora = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO pendentes (registro, criado_em) VALUES (?, ?)",
+                [(json.dumps(r, ensure_ascii=False, default=str), agora) for r in registros]
+            )
+            self._estatisticas["enfileirados"] += len(registros)
+        self._sinal.set()
+
+    # ---------- consumidor ----------
+
+    def iniciar(self):
+        """Inicia a thread de envio (reenvia o que ficou pendente de execuções anteriores)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name="fila-escrita", daemon=True)
+            self._thread.start()
+        self._sinal.set()
+
+    def parar(self, timeout=None):
+        """Encerra a thread de envio; o que estiver pendente continua no diário"""
+        self._parar.set()
+        self._sinal.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        while not self._parar.is_set():
+            self._sinal.wait(self.intervalo)
+            self._sinal.clear()
+            self.descarregar()
+
+    def _proximo_lote(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, registro, criado_em FROM pendentes ORDER BY id LIMIT ?",
+                (self.tamanho_lote,)
+            ).fetchall()
+
+    def descarregar(self):
+        """Envia os pendentes em lotes até esvaziar o diário ou receber erro temporário"""
+        while not self._parar.is_set():
+            if time.monotonic() < self._proxima_tentativa:
+                return
+            lote = self._proximo_lote()
+            if not lote:
+                return
+            ids = [(id_,) for id_, _, _ in lote]
+            registros = [json.loads(registro) for _, registro, _ in lote]
+            inicio = time.monotonic()
+            try:
+                # Se a aplicação caiu depois do envio e antes de limpar o diário, parte do lote
+                # já está na planilha: esses CPFs saem da fila sem serem enviados de novo
+                enviar = registros
+                if self.cpf_cadastrado is not None:
+                    enviar = [r for r in registros if not self.cpf_cadastrado(r.get("cpf", ""))]
+                if enviar:
+                    self.enviar_lote(enviar)
+            except Exception as e:
+                with self._lock:
+                    self._estatisticas["ultimo_erro"] = str(e)
+                    if erro_temporario(e):
+                        self._tentativas += 1
+                        espera = min(ESPERA_INICIAL * 2 ** (self._tentativas - 1), ESPERA_MAXIMA)
+                        # Jitter para sessões/processos não tentarem todos no mesmo instante
+                        self._proxima_tentativa = time.monotonic() + espera * random.uniform(0.5, 1.0)
+                        self._estatisticas["erros_temporarios"] += 1
+                        return
+                    # Erro permanente: o lote sai da fila e fica registrado para conferência
+                    with self._conn:
+                        self._conn.executemany(
+                            "INSERT INTO falhas (registro, criado_em, erro) VALUES (?, ?, ?)",
+                            [(registro, criado_em, str(e)) for _, registro, criado_em in lote]
+                        )
+                        self._conn.executemany("DELETE FROM pendentes WHERE id = ?", ids)
+                    self._estatisticas["falhas"] += len(lote)
+                continue
+
+            fim = time.monotonic()
+            agora = time.time()
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany("DELETE FROM pendentes WHERE id = ?", ids)
+                self._tentativas = 0
+                if enviar:
+                    self._latencias_lote.append(fim - inicio)
+                self._esperas_na_fila.extend(agora - criado_em for _, _, criado_em in lote)
+                self._estatisticas["enviados"] += len(enviar)
+                self._estatisticas["ja_cadastrados"] += len(registros) - len(enviar)
+                self._estatisticas["lotes"] += bool(enviar)
+
+    # ---------- falhas permanentes ----------
+
+    def falhas(self):
+        """Cadastros recusados de forma permanente: registro, erro e data (ordem de chegada)"""
+        with self._lock:
+            linhas = self._conn.execute("SELECT registro, erro, criado_em FROM falhas ORDER BY id").fetchall()
+        return [
+            {"registro": json.loads(registro), "erro": erro, "criado_em": criado_em}
+            for registro, erro, criado_em in linhas
+        ]
+
+    def reenviar_falhas(self):
+        """Devolve as falhas à fila (ex.: depois de corrigir a planilha); retorna quantas"""
+        with self._lock, self._conn:
+            quantidade = self._conn.execute("SELECT COUNT(*) FROM falhas").fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO pendentes (registro, criado_em) SELECT registro, criado_em FROM falhas ORDER BY id"
+            )
+            self._conn.execute("DELETE FROM falhas")
+            self._proxima_tentativa = 0.0
+        self._sinal.set()
+        return quantidade
+
+    # ---------- monitoramento ----------
+
+    def profundidade(self):
+        """Quantidade de cadastros aguardando envio"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pendentes").fetchone()[0]
+
+    def contem_cpf(self, cpf):
+        """Há cadastro com o CPF aguardando envio? (checagem de duplicidade)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM pendentes WHERE json_extract(registro, '$.cpf') = ? LIMIT 1", (cpf,)
+            ).fetchone() is not None
+
+    def pendentes(self):
+        """Registros ainda não enviados (ordem de chegada)"""
+        with self._lock:
+            linhas = self._conn.execute("SELECT registro FROM pendentes ORDER BY id").fetchall()
+        return [json.loads(registro) for (registro,) in linhas]
+
+    def estatisticas(self):
+        """Profundidade da fila, latências e contadores de envio"""
+        profundidade = self.profundidade()
+        with self._lock:
+            dados = dict(self._estatisticas)
+            latencias = sorted(self._latencias_lote)
+            esperas = sorted(self._esperas_na_fila)
+            falhas = self._conn.execute("SELECT COUNT(*) FROM falhas").fetchone()[0]
+        dados["profundidade"] = profundidade
+        dados["falhas_registradas"] = falhas
+        dados["tentativas_seguidas"] = self._tentativas
+        dados["latencia_lote_media_s"] = round(sum(latencias) / len(latencias), 3) if latencias else None
+        dados["espera_na_fila_p95_s"] = round(esperas[min(len(esperas) - 1, int(len(esperas) * 0.95))], 3) if esperas else None
+        return dados
@@ -0,0 +1,123 @@
+"""
+Filtros por faceta da área administrativa (Diretoria, tipo sanguíneo, estado civil,
+comorbidade, plano de saúde e faixa de idade)
+Cada valor de cada faceta ganha um mapa de bits (uma posição por linha, 8 linhas por byte),
+montado uma vez por versão dos dados; uma combinação de filtros é OR entre os valores marcados
+de uma faceta e AND entre as facetas, sem comparar as colunas da tabela a cada rerun
+"""
+
+import numpy as np
+import pandas as pd
+
+from esquema import coluna_texto
+from ordenacao import chave_ordenacao
+
+# Colunas categóricas filtráveis (poucos valores distintos)
+COLUNAS_FACETAS = ['Diretoria', 'tipo_sanguineo', 'estado_civil', 'comorbidade', 'plano_saude']
+
+# Faceta calculada a partir da coluna idade
+FACETA_IDADE = 'faixa_idade'
+FAIXAS_IDADE = [
+    ("Até 29", None, 29),
+    ("30 a 39", 30, 39),
+    ("40 a 49", 40, 49),
+    ("50 a 59", 50, 59),
+    ("60 ou mais", 60, None),
+]
+
+FACETAS = COLUNAS_FACETAS + [FACETA_IDADE]
+
+# Colunas da tabela necessárias para as facetas
+COLUNAS_FILTRO = COLUNAS_FACETAS + ['idade']
+
+# Bits ligados em cada byte (contagem sem desempacotar o mapa)
+_BITS_POR_BYTE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def contar_bits(bits):
+    """Quantidade de linhas marcadas no mapa de bits"""
+    return int(_BITS_POR_BYTE[bits].sum())
+
+
+def chave_filtros(filtros):
+    """Forma imutável dos filtros (faceta → valores marcados) para chaves de cache e de widgets"""
+    return tuple((faceta, tuple(filtros[faceta])) for faceta in FACETAS if filtros.get(faceta))
+
+
+def _faixas_idade(serie):
+    """Rótulo da faixa de idade de cada linha ("" sem idade válida)"""
+    idades = chave_ordenacao(serie, 'idade').astype('Float64').to_numpy(dtype=float, na_value=np.nan)
+    rotulos = np.full(len(idades), "", dtype=object)
+    for rotulo, minimo, maximo in FAIXAS_IDADE:
+        dentro = ~np.isnan(idades)
+        if minimo is not None:
+            dentro &= idades >= minimo
+        if maximo is not None:
+            dentro &= idades <= maximo
+        rotulos[dentro] = rotulo
+    return pd.Series(rotulos)
+
+
+class IndiceFacetas:
+    """Mapas de bits por valor de cada faceta, na mesma ordem do DataFrame"""
+
+    def __init__(self, df):
+        self.total = len(df)
+        self._bits = {}
+        colunas = {c: coluna_texto(df[c], c).reset_index(drop=True) for c in COLUNAS_FACETAS if c in df.columns}
+        if 'idade' in df.columns:
+            colunas[FACETA_IDADE] = _faixas_idade(df['idade'])
+        for faceta, valores in colunas.items():
+            codigos, distintos = pd.factorize(valores.str.strip(), sort=True)
+            self._bits[faceta] = {
+                valor: np.packbits(codigos == codigo) for codigo, valor in enumerate(distintos)
+            }
+
+    def valores(self, faceta):
+        """Valores da faceta ("" = não informado por último; faixas de idade na ordem das faixas)"""
+        valores = self._bits.get(faceta, {})
+        if faceta == FACETA_IDADE:
+            return [r for r, _, _ in FAIXAS_IDADE if r in valores] + ([""] if "" in valores else [])
+        return sorted(valores, key=lambda v: (v == "", v))
+
+    def _todas(self):
+        return np.packbits(np.ones(self.total, dtype=bool))
+
+    def _combinar(self, filtros, base, ignorar=None):
+        """AND entre as facetas filtradas (OR entre os valores de cada uma), partindo da base"""
+        bits = base
+        for faceta in FACETAS:
+            marcados = filtros.get(faceta)
+            if faceta == ignorar or not marcados or faceta not in self._bits:
+                continue
+            valores_faceta = self._bits[faceta]
+            uniao = np.zeros_like(bits)
+            for valor in marcados:
+                if valor in valores_faceta:
+                    uniao |= valores_faceta[valor]
+            bits = bits & uniao
+        return bits
+
+    def mascara(self, filtros, mascara_base=None):
+        """Máscara booleana das linhas que passam pelos filtros (e pela máscara base, ex.: busca)"""
+        base = self._todas() if mascara_base is None else np.packbits(mascara_base)
+        bits = self._combinar(filtros, base)
+        return np.unpackbits(bits, count=self.total).astype(bool)
+
+    def contagens(self, filtros, mascara_base=None):
+        """Linhas por valor de cada faceta, com os filtros das outras facetas aplicados
+
+        A contagem de um valor é quantas linhas restariam marcando só ele naquela faceta
+        (um AND e uma contagem de bits por valor, sem tocar na tabela).
+        """
+        base = self._todas() if mascara_base is None else np.packbits(mascara_base)
+        contagens = {}
+        for faceta, valores_faceta in self._bits.items():
+            restantes = self._combinar(filtros, base, ignorar=faceta)
+            contagens[faceta] = {valor: contar_bits(bits & restantes) for valor, bits in valores_faceta.items()}
+        return contagens
+
+
+def indice_facetas(entrada):
+    """IndiceFacetas da versão em cache (construído no primeiro filtro e reaproveitado)"""
+    return entrada.derivado("indice_facetas", IndiceFacetas)
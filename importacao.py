@@ -0,0 +1,196 @@
+"""
+Importação em lote de funcionários a partir de CSV ou XLSX
+O arquivo é lido em blocos, validado e normalizado coluna a coluna com as mesmas regras
+do formulário e as linhas válidas são gravadas em lotes grandes (append_rows)
+"""
+
+import io
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from esquema import COLUNAS_PLANILHA, NOMES_EXIBICAO
+from validacao import (
+    formatar_cpf_lote,
+    formatar_telefone_lote,
+    validar_cpf_lote,
+    validar_email_lote,
+    validar_telefone_lote
+)
+
+# Linhas lidas do arquivo por vez
+TAMANHO_BLOCO_LEITURA = 5000
+
+# Linhas por chamada de gravação (append_rows)
+TAMANHO_LOTE_GRAVACAO = 5000
+
+# Aceita tanto os cabeçalhos da planilha quanto os nomes de exibição (ex.: CSV exportado)
+_COLUNA_POR_CABECALHO = {c.lower(): c for c in COLUNAS_PLANILHA}
+_COLUNA_POR_CABECALHO.update({nome.lower(): c for c, nome in NOMES_EXIBICAO.items()})
+
+COLUNAS_TELEFONE = ['telefone', 'emerg1_telefone', 'emerg2_telefone']
+
+# Opções dos campos de seleção obrigatórios do formulário de cadastro
+DIRETORIAS = ["GABINETE", "DAFIN", "DAPP", "DIPAS", "DIRES", "DIRSIN"]
+TIPOS_SANGUINEOS = ["O+", "O-", "A+", "A-", "B+", "B-", "AB+", "AB-"]
+
+
+def _mapear_colunas(colunas):
+    """Renomeia os cabeçalhos do arquivo para as colunas da planilha"""
+    return {c: _COLUNA_POR_CABECALHO[str(c).strip().lower()]
+            for c in colunas if str(c).strip().lower() in _COLUNA_POR_CABECALHO}
+
+
+def ler_em_blocos(arquivo, nome_arquivo, tamanho_bloco=TAMANHO_BLOCO_LEITURA):
+    """Gera DataFrames (texto) com as colunas da planilha a partir de um CSV ou XLSX"""
+    if nome_arquivo.lower().endswith(".xlsx"):
+        blocos = _ler_xlsx_em_blocos(arquivo, tamanho_bloco)
+    else:
+        blocos = pd.read_csv(
+            arquivo,
+            dtype=str,
+            keep_default_na=False,
+            sep=_detectar_separador(arquivo),
+            encoding="utf-8-sig",
+            chunksize=tamanho_bloco
+        )
+    for bloco in blocos:
+        bloco = bloco.rename(columns=_mapear_colunas(bloco.columns))
+        yield bloco.reindex(columns=COLUNAS_PLANILHA, fill_value="").fillna("").astype(str)
+
+
+def _detectar_separador(arquivo):
+    """Vírgula ou ponto e vírgula (padrão do Excel em português), pela primeira linha"""
+    inicio = arquivo.read(4096)
+    arquivo.seek(0)
+    if isinstance(inicio, bytes):
+        inicio = inicio.decode("utf-8-sig", errors="ignore")
+    primeira_linha = inicio.splitlines()[0] if inicio else ""
+    return ";" if primeira_linha.count(";") > primeira_linha.count(",") else ","
+
+
+def _ler_xlsx_em_blocos(arquivo, tamanho_bloco):
+    """Lê a primeira aba do XLSX em modo streaming (openpyxl read_only)"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise RuntimeError("Instale o openpyxl para importar arquivos XLSX: pip install openpyxl") from e
+
+    if isinstance(arquivo, (bytes, bytearray)):
+        arquivo = io.BytesIO(arquivo)
+    livro = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = livro.worksheets[0].iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        cabecalho = ["" if c is None else str(c) for c in cabecalho]
+        bloco = []
+        for linha in linhas:
+            bloco.append(["" if v is None else str(v) for v in linha])
+            if len(bloco) >= tamanho_bloco:
+                yield pd.DataFrame(bloco, columns=cabecalho)
+                bloco = []
+        if bloco:
+            yield pd.DataFrame(bloco, columns=cabecalho)
+    finally:
+        livro.close()
+
+
+def validar_bloco(bloco):
+    """Valida e normaliza um bloco importado (colunas inteiras); retorna (bloco, motivos por linha)"""
+    bloco = bloco.apply(lambda coluna: coluna.str.strip())
+    verificacoes = [
+        (bloco['nome'] != "", "Nome completo é obrigatório"),
+        (validar_cpf_lote(bloco['cpf']), "CPF inválido"),
+        (validar_email_lote(bloco['email']), "E-mail inválido"),
+        (validar_telefone_lote(bloco['telefone']), "Telefone inválido"),
+        # Demais campos obrigatórios do formulário
+        (bloco['endereco'] != "", "Endereço é obrigatório"),
+        (bloco['Diretoria'] != "", "Diretoria é obrigatória"),
+        (bloco['Diretoria'].isin(DIRETORIAS) | (bloco['Diretoria'] == ""), "Diretoria inválida"),
+        (bloco['tipo_sanguineo'] != "", "Tipo sanguíneo é obrigatório"),
+        (bloco['tipo_sanguineo'].isin(TIPOS_SANGUINEOS) | (bloco['tipo_sanguineo'] == ""), "Tipo sanguíneo inválido"),
+        ((bloco['comorbidade'] != "Sim") | (bloco['desc_comorbidade'] != ""),
+         "Descreva a comorbidade se respondeu sim"),
+        ((bloco['plano_saude'] != "Sim") | (bloco['nome_plano'] != ""),
+         "Nome do plano é obrigatório se respondeu sim"),
+        ((bloco['emerg1_nome'] != "") & (bloco['emerg1_telefone'] != ""), "Contato de emergência 1 incompleto"),
+    ]
+    mascaras = [mascara.to_numpy(dtype=bool) for mascara, _ in verificacoes]
+    motivos = [[] for _ in range(len(bloco))]
+    for mascara, (_, mensagem) in zip(mascaras, verificacoes):
+        for posicao in np.flatnonzero(~mascara):
+            motivos[posicao].append(mensagem)
+
+    bloco['cpf'] = formatar_cpf_lote(bloco['cpf'])
+    for coluna in COLUNAS_TELEFONE:
+        bloco[coluna] = formatar_telefone_lote(bloco[coluna])
+    return bloco, motivos
+
+
+class ResultadoImportacao:
+    """Totais da importação e relatório de linhas rejeitadas"""
+
+    def __init__(self):
+        self.total = 0
+        self.importados = 0
+        self.chamadas_gravacao = 0
+        self.erros = []
+
+    def registrar_erro(self, linha_arquivo, registro, motivos):
+        self.erros.append({
+            'Linha do arquivo': linha_arquivo,
+            'Nome': registro.get('nome', ''),
+            'CPF': registro.get('cpf', ''),
+            'Motivo': "; ".join(motivos),
+        })
+
+    def relatorio_erros_csv(self):
+        """Relatório de erros em CSV (UTF-8 com BOM, abre direto no Excel)"""
+        return pd.DataFrame(
+            self.erros, columns=['Linha do arquivo', 'Nome', 'CPF', 'Motivo']
+        ).to_csv(index=False, encoding='utf-8-sig')
+
+
+def importar_funcionarios(arquivo, nome_arquivo, armazenamento, cpfs_existentes,
+                          data_hora=None, progresso=None):
+    """Valida o arquivo e grava as linhas válidas em lotes; retorna ResultadoImportacao
+
+    cpfs_existentes: CPFs (formatados) já cadastrados; CPFs repetidos no próprio
+    arquivo também são rejeitados a partir da segunda ocorrência.
+    """
+    resultado = ResultadoImportacao()
+    vistos = set(cpfs_existentes)
+    data_hora = data_hora or datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    pendentes = []
+
+    def gravar():
+        if pendentes:
+            resultado.importados += armazenamento.inserir_lote(pendentes)
+            resultado.chamadas_gravacao += 1
+            pendentes.clear()
+
+    linha_arquivo = 1  # linha 1 = cabeçalho
+    for bloco in ler_em_blocos(arquivo, nome_arquivo):
+        bloco, motivos = validar_bloco(bloco)
+        colunas = [bloco[c].tolist() for c in COLUNAS_PLANILHA]
+        for valores, erros in zip(zip(*colunas), motivos):
+            registro = dict(zip(COLUNAS_PLANILHA, valores))
+            linha_arquivo += 1
+            resultado.total += 1
+            if not erros and registro['cpf'] in vistos:
+                erros.append("CPF já cadastrado")
+            if erros:
+                resultado.registrar_erro(linha_arquivo, registro, erros)
+                continue
+            vistos.add(registro['cpf'])
+            registro['data_hora'] = registro['data_hora'] or data_hora
+            pendentes.append(registro)
+            if len(pendentes) >= TAMANHO_LOTE_GRAVACAO:
+                gravar()
+        if progresso:
+            progresso(resultado)
+    gravar()
+    return resultado
@@ -0,0 +1,101 @@
+"""
+Índice CPF → número da linha na planilha
+Evita baixar a planilha e percorrer todas as linhas para localizar o registro
+a ser editado ou excluído; ConjuntoCPF responde só se um CPF já está cadastrado
+"""
+
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+
+class IndiceCPF:
+    """Mapa CPF → linhas da planilha (base 1), ajustado no lugar a cada escrita
+
+    Cada linha recebe uma posição fixa (slot) na ordem em que entrou. Exclusões não
+    renumeram o mapa: a posição excluída vai para uma lista ordenada e o número real
+    da linha é o slot menos as exclusões anteriores a ele (busca binária).
+    """
+
+    def __init__(self, cpfs, versao=None):
+        self.versao = versao
+        self._slots = {}
+        for slot, cpf in enumerate(cpfs):
+            self._slots.setdefault(cpf, []).append(slot)
+        self._proximo_slot = len(cpfs)
+        self._removidos = []
+
+    def __len__(self):
+        return self._proximo_slot - len(self._removidos)
+
+    def __contains__(self, cpf):
+        return bool(self._slots.get(cpf))
+
+    def _numero_linha(self, slot):
+        return slot - bisect_left(self._removidos, slot) + 2  # +1 cabeçalho, +1 base 1
+
+    def _slot_da_linha(self, cpf, numero_linha):
+        for slot in self._slots.get(cpf, []):
+            if self._numero_linha(slot) == numero_linha:
+                return slot
+        return None
+
+    def localizar(self, cpf):
+        """Números das linhas (base 1) com o CPF, em ordem"""
+        return [self._numero_linha(slot) for slot in self._slots.get(cpf, [])]
+
+    def registrar_insercao(self, cpfs):
+        """Linhas acrescentadas ao fim da planilha"""
+        for cpf in cpfs:
+            self._slots.setdefault(cpf, []).append(self._proximo_slot)
+            self._proximo_slot += 1
+
+    def registrar_atualizacao(self, numero_linha, cpf_antigo, cpf_novo):
+        """Linha que pode ter tido o CPF alterado"""
+        if cpf_antigo == cpf_novo:
+            return
+        slot = self._slot_da_linha(cpf_antigo, numero_linha)
+        if slot is None:
+            return
+        self._remover_slot(cpf_antigo, slot)
+        insort(self._slots.setdefault(cpf_novo, []), slot)
+
+    def registrar_exclusao(self, numero_linha, cpf):
+        """Linha excluída: as linhas seguintes sobem uma posição"""
+        slot = self._slot_da_linha(cpf, numero_linha)
+        if slot is None:
+            return
+        self._remover_slot(cpf, slot)
+        insort(self._removidos, slot)
+
+    def _remover_slot(self, cpf, slot):
+        slots = self._slots[cpf]
+        slots.remove(slot)
+        if not slots:
+            del self._slots[cpf]
+
+
+class ConjuntoCPF:
+    """CPFs cadastrados (com contagem, para tolerar CPFs repetidos na planilha), usado para
+    recusar cadastros duplicados no envio do formulário sem baixar a planilha"""
+
+    def __init__(self, cpfs, modificado_remoto=None):
+        self._contagem = Counter(cpf for cpf in cpfs if cpf)
+        self.modificado_remoto = modificado_remoto
+        self.verificado_em = time.monotonic()
+
+    def __len__(self):
+        return len(self._contagem)
+
+    def __contains__(self, cpf):
+        return self._contagem[cpf] > 0
+
+    def adicionar(self, cpfs):
+        self._contagem.update(cpf for cpf in cpfs if cpf)
+
+    def remover(self, cpfs):
+        for cpf in cpfs:
+            if self._contagem[cpf] > 1:
+                self._contagem[cpf] -= 1
+            else:
+                self._contagem.pop(cpf, None)
@@ -0,0 +1,37 @@
+"""
+Tempos do início a frio da aplicação: importações do app.py, primeira renderização e módulos
+carregados sob demanda (cadastro, área administrativa)
+Cada etapa é medida uma vez por processo (a primeira, que é a que paga o custo) e registrada
+no log de erro padrão, onde a plataforma de contêineres coleta
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_tempos = {}
+
+
+def registrar_inicializacao(etapa, segundos):
+    """Guarda o tempo da etapa (só a primeira medição do processo) e registra no log"""
+    with _lock:
+        if etapa in _tempos:
+            return
+        _tempos[etapa] = segundos
+    print(f"⏱️ inicialização: {etapa} em {segundos * 1000:.0f} ms", file=sys.stderr, flush=True)
+
+
+@contextmanager
+def medir_inicializacao(etapa):
+    """Mede o bloco (tipicamente importações adiadas) como uma etapa da inicialização"""
+    inicio = time.perf_counter()
+    yield
+    registrar_inicializacao(etapa, time.perf_counter() - inicio)
+
+
+def relatorio_inicializacao():
+    """Etapas medidas até agora, em milissegundos"""
+    with _lock:
+        return {etapa: round(segundos * 1000, 1) for etapa, segundos in _tempos.items()}
@@ -0,0 +1,66 @@
+"""
+Ordenação da tabela da área administrativa
+As chaves de ordenação são tipadas (idades como números, datas dd/mm/aaaa como datas, textos
+em minúsculas e sem acentos) e cada permutação é calculada uma vez por versão dos dados;
+filtros só selecionam as posições dentro da permutação já pronta
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from busca import dobrar_coluna
+from esquema import COLUNAS_NUMERICAS, FORMATOS_DATA
+
+
+def chave_ordenacao(serie, coluna):
+    """Valores comparáveis da coluna (valores vazios ou inválidos viram NaN/NaT)"""
+    if pd.api.types.is_numeric_dtype(serie.dtype) or pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        # Já convertida no carregamento (esquema.tipar_tabela)
+        return serie
+    serie = serie.astype(str).str.strip()
+    if coluna in COLUNAS_NUMERICAS:
+        return pd.to_numeric(serie, errors='coerce')
+    if coluna in FORMATOS_DATA:
+        return pd.to_datetime(serie, format=FORMATOS_DATA[coluna], errors='coerce')
+    texto = dobrar_coluna(serie)
+    # Texto vazio também é valor ausente: vai para o fim nas duas direções
+    return texto.where(texto != "")
+
+
+class OrdenacoesTabela:
+    """Permutações (posições 0..n-1) da tabela por coluna e direção"""
+
+    def __init__(self, df):
+        self.df = df
+        self._lock = threading.Lock()
+        self._permutacoes = {}
+
+    def permutacao(self, coluna, ascendente=True):
+        """Posições da tabela na ordem pedida (estável; vazios e inválidos sempre no fim)"""
+        with self._lock:
+            if (coluna, ascendente) not in self._permutacoes:
+                chave = chave_ordenacao(self.df[coluna], coluna).reset_index(drop=True)
+                ordem = chave.sort_values(ascending=ascendente, kind='stable', na_position='last')
+                permutacao = ordem.index.to_numpy()
+                permutacao.flags.writeable = False
+                self._permutacoes[(coluna, ascendente)] = permutacao
+            return self._permutacoes[(coluna, ascendente)]
+
+    def ordenar(self, mascara, coluna, ascendente=True):
+        """Posições selecionadas pela máscara, na ordem pedida (sem reordenar do zero)
+
+        Sem máscara (nada filtrado), devolve a própria permutação compartilhada (somente leitura).
+        """
+        permutacao = self.permutacao(coluna, ascendente)
+        if mascara is None:
+            return permutacao
+        posicoes = permutacao[mascara[permutacao]]
+        posicoes.flags.writeable = False
+        return posicoes
+
+
+def ordenacoes_tabela(entrada):
+    """OrdenacoesTabela da versão em cache"""
+    return entrada.derivado("ordenacoes", OrdenacoesTabela)
@@ -0,0 +1,160 @@
+"""
+Planilha do Google Sheets simulada em memória (benchmarks sem conta de serviço nem rede)
+Implementa as chamadas do gspread usadas pela aplicação, conta cada chamada como uma
+requisição à API e pode esperar uma latência fixa por chamada, como a rede faria
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+
+from desempenho import registrar_chamada_api
+from esquema import COLUNAS_PLANILHA
+
+_REFERENCIA_A1 = re.compile(r"([A-Z]*)(\d*)")
+
+
+def _indice_coluna(letras):
+    """Letras da coluna → posição (base 1): A → 1, AA → 27"""
+    posicao = 0
+    for letra in letras:
+        posicao = posicao * 26 + ord(letra) - ord('A') + 1
+    return posicao
+
+
+def _limites(faixa, total_linhas):
+    """Faixa A1 ("A:C", "C2:C", "A5:Y5", "B1") → (linha inicial, linha final, coluna inicial, coluna final)"""
+    inicio, _, fim = faixa.partition(":")
+    letras_ini, linha_ini = _REFERENCIA_A1.fullmatch(inicio).groups()
+    letras_fim, linha_fim = _REFERENCIA_A1.fullmatch(fim or inicio).groups()
+    return (
+        int(linha_ini) if linha_ini else 1,
+        int(linha_fim) if linha_fim else total_linhas,
+        _indice_coluna(letras_ini) if letras_ini else 1,
+        _indice_coluna(letras_fim) if letras_fim else len(COLUNAS_PLANILHA),
+    )
+
+
+class PlanilhaSimulada:
+    """A planilha (arquivo): data de modificação e batchUpdate estrutural (exclusão de linhas)"""
+
+    def __init__(self, aba):
+        self._aba = aba
+
+    def get_lastUpdateTime(self):
+        self._aba._chamar("get_lastUpdateTime")
+        return f"2025-01-01T00:00:{self._aba.modificacoes:06d}Z"
+
+    def batch_update(self, corpo):
+        self._aba._chamar("spreadsheet.batch_update")
+        with self._aba._lock:
+            for requisicao in corpo["requests"]:
+                faixa = requisicao["deleteDimension"]["range"]
+                del self._aba.linhas[faixa["startIndex"]:faixa["endIndex"]]
+            self._aba.modificacoes += 1
+        return {}
+
+
+class AbaSimulada:
+    """Aba (Worksheet) em memória: linhas de texto, com o cabeçalho na primeira"""
+
+    # gid da aba (a primeira aba de uma planilha), usado nas requisições do batchUpdate
+    id = 0
+
+    def __init__(self, linhas, latencia=0.0):
+        self.linhas = [[str(v) for v in linha] for linha in linhas]
+        self.latencia = latencia
+        self.chamadas = Counter()
+        self.modificacoes = 0
+        self.spreadsheet = PlanilhaSimulada(self)
+        self._lock = threading.Lock()
+
+    def _chamar(self, nome, escrita=False):
+        self.chamadas[nome] += 1
+        registrar_chamada_api()
+        if self.latencia:
+            time.sleep(self.latencia)
+        if escrita:
+            self.modificacoes += 1
+
+    def _ler(self, faixa):
+        linha_ini, linha_fim, coluna_ini, coluna_fim = _limites(faixa, len(self.linhas))
+        valores = []
+        for linha in self.linhas[linha_ini - 1:linha_fim]:
+            celulas = linha[coluna_ini - 1:coluna_fim]
+            # Como a API: células vazias do fim da linha e linhas vazias do fim da faixa são omitidas
+            while celulas and celulas[-1] == "":
+                celulas.pop()
+            valores.append(celulas)
+        while valores and not valores[-1]:
+            valores.pop()
+        return valores
+
+    def _escrever(self, faixa, valores):
+        linha_ini, _, coluna_ini, _ = _limites(faixa, len(self.linhas))
+        for i, valores_linha in enumerate(valores):
+            while len(self.linhas) < linha_ini + i:
+                self.linhas.append([""] * len(COLUNAS_PLANILHA))
+            linha = self.linhas[linha_ini - 1 + i]
+            for j, valor in enumerate(valores_linha):
+                while len(linha) < coluna_ini + j:
+                    linha.append("")
+                linha[coluna_ini - 1 + j] = str(valor)
+
+    def get_all_values(self, **kwargs):
+        self._chamar("get_all_values")
+        with self._lock:
+            return [list(linha) for linha in self.linhas]
+
+    def get(self, faixa, **kwargs):
+        self._chamar("get")
+        with self._lock:
+            return self._ler(faixa)
+
+    def batch_get(self, faixas, **kwargs):
+        self._chamar("batch_get")
+        with self._lock:
+            return [self._ler(faixa) for faixa in faixas]
+
+    def append_row(self, valores, **kwargs):
+        self._chamar("append_row", escrita=True)
+        with self._lock:
+            self.linhas.append([str(v) for v in valores])
+
+    def append_rows(self, linhas, **kwargs):
+        self._chamar("append_rows", escrita=True)
+        with self._lock:
+            self.linhas.extend([str(v) for v in linha] for linha in linhas)
+
+    def update(self, range_name=None, values=None, **kwargs):
+        self._chamar("update", escrita=True)
+        with self._lock:
+            self._escrever(range_name, values)
+
+    def batch_update(self, dados, **kwargs):
+        self._chamar("batch_update", escrita=True)
+        with self._lock:
+            for item in dados:
+                self._escrever(item["range"], item["values"])
+
+    def delete_rows(self, inicio, fim=None):
+        self._chamar("delete_rows", escrita=True)
+        with self._lock:
+            del self.linhas[inicio - 1:(fim or inicio)]
+
+
+class PoolSimulado:
+    """Substitui o PoolSheets: toda planilha pedida é a mesma aba simulada"""
+
+    def __init__(self, aba):
+        self.aba = aba
+
+    def obter_aba(self, sheet_id):
+        return self.aba
+
+    def descartar_aba(self, sheet_id):
+        pass
+
+    def estatisticas(self):
+        return {"chamadas_api": dict(self.aba.chamadas)}
@@ -0,0 +1,68 @@
+"""
+Leitura de colunas da planilha (projeção)
+Mapeia os campos (chaves de NOMES_EXIBICAO / COLUNAS_PLANILHA) para faixas A1 e lê só as
+colunas pedidas num único batch_get, em vez de get_all_values() com as 25 colunas
+"""
+
+import pandas as pd
+
+from esquema import COLUNAS_PLANILHA
+
+# Colunas da listagem da área administrativa (busca, filtro, tabela padrão e identidade da linha)
+COLUNAS_LISTA = ['data_hora', 'nome', 'cpf', 'email', 'telefone', 'Diretoria']
+
+
+def letra_coluna(posicao):
+    """Letra da coluna (base 1): 1 → A, 26 → Z, 27 → AA"""
+    letras = ""
+    while posicao > 0:
+        posicao, resto = divmod(posicao - 1, 26)
+        letras = chr(ord('A') + resto) + letras
+    return letras
+
+
+def faixa_coluna(coluna):
+    """Faixa A1 da coluna inteira, com o cabeçalho ("nome" → "B1:B")"""
+    letra = letra_coluna(COLUNAS_PLANILHA.index(coluna) + 1)
+    return f"{letra}1:{letra}"
+
+
+def faixa_linha(numero_linha):
+    """Faixa A1 de uma linha com todas as colunas (numeração da planilha, base 1)"""
+    return f"A{numero_linha}:{letra_coluna(len(COLUNAS_PLANILHA))}{numero_linha}"
+
+
+def colunas_projecao(colunas):
+    """Colunas pedidas (conhecidas) na ordem da planilha"""
+    pedidas = set(colunas)
+    return [c for c in COLUNAS_PLANILHA if c in pedidas]
+
+
+def ler_colunas(aba, colunas):
+    """DataFrame (texto) só com as colunas pedidas, numa chamada; None se o cabeçalho não confere
+
+    A API omite as células vazias do fim de cada coluna: as colunas são completadas até a
+    maior delas (data_hora, sempre preenchida, define o número de linhas).
+    """
+    colunas = colunas_projecao(colunas)
+    valores = aba.batch_get([faixa_coluna(c) for c in colunas])
+    series = []
+    for coluna, linhas in zip(colunas, valores):
+        celulas = [linha[0] if linha else "" for linha in linhas]
+        if not celulas or celulas[0] != coluna:
+            # Colunas fora da posição esperada: só o download completo é confiável
+            return None
+        series.append(celulas[1:])
+    total = max((len(s) for s in series), default=0)
+    return pd.DataFrame(
+        {coluna: s + [""] * (total - len(s)) for coluna, s in zip(colunas, series)},
+        columns=colunas
+    )
+
+
+def ler_registro(aba, numero_linha):
+    """Registro (dicionário) completo de uma linha, lido sob demanda (um get)"""
+    valores = aba.get(faixa_linha(numero_linha))
+    registro = dict.fromkeys(COLUNAS_PLANILHA, "")
+    registro.update(zip(COLUNAS_PLANILHA, valores[0] if valores else []))
+    return registro
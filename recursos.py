@@ -0,0 +1,90 @@
+"""
+Recursos compartilhados por todas as sessões (pool do Google Sheets, cache da tabela, motor de
+armazenamento, fila de gravação, exportações), criados sob demanda a partir do secrets.toml
+"""
+
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import streamlit as st
+
+from armazenamento import CAMINHO_SQLITE_PADRAO, BackendSheets, BackendSQLite
+from cache_planilha import DIRETORIO_ESPELHO_PADRAO, TTL_PADRAO, CachePlanilha
+from desempenho import medir_etapa
+from exportacao import CacheExportacoes
+from fila_escrita import FilaEscrita
+
+FUSO_BRASIL = ZoneInfo("America/Sao_Paulo")
+
+# ==================== CONFIGURAÇÃO DO GOOGLE DRIVE E SHEETS ====================
+
+@st.cache_resource(show_spinner=False)
+def _criar_pool_sheets():
+    """Cria o pool do Google Sheets compartilhado por todas as sessões do processo"""
+    # gspread e google-auth só são carregados com o motor Sheets
+    from cliente_sheets import PoolSheets
+
+    return PoolSheets.de_conta_servico(st.secrets["google_service_account"])
+
+def init_google_credentials():
+    """Inicializa as credenciais do Google e retorna o pool compartilhado"""
+    try:
+        # Tenta carregar do secrets do Streamlit (autoriza uma única vez por processo)
+        with medir_etapa("credenciais"):
+            return _criar_pool_sheets()
+    except (KeyError, FileNotFoundError):
+        st.warning("⚠️ Credenciais do Google não configuradas. Configure em .streamlit/secrets.toml")
+        return None
+
+@st.cache_resource(show_spinner=False)
+def obter_cache_planilha():
+    """Cache da tabela de funcionários compartilhado por todas as sessões"""
+    return CachePlanilha(
+        ttl=float(st.secrets.get("cache_ttl_segundos", TTL_PADRAO)),
+        diretorio_espelho=st.secrets.get("diretorio_espelho", DIRETORIO_ESPELHO_PADRAO)
+    )
+
+@st.cache_resource(show_spinner=False)
+def obter_cache_exportacoes():
+    """Arquivos exportados (CSV/Parquet) compartilhados por todas as sessões"""
+    return CacheExportacoes()
+
+@st.cache_resource(show_spinner=False)
+def _criar_backend_sqlite(caminho):
+    """Motor SQLite local compartilhado por todas as sessões"""
+    return BackendSQLite(caminho)
+
+def obter_armazenamento():
+    """Retorna o motor de armazenamento configurado em secrets.toml (None se indisponível)"""
+    try:
+        motor = st.secrets.get("backend_armazenamento", "sheets")
+    except FileNotFoundError:
+        motor = "sheets"
+
+    if motor == "sqlite":
+        return _criar_backend_sqlite(st.secrets.get("caminho_sqlite", CAMINHO_SQLITE_PADRAO))
+
+    pool_sheets = init_google_credentials()
+    if pool_sheets is None:
+        return None
+    SHEET_ID = st.secrets.get("google_sheet_id", "")
+    if not SHEET_ID:
+        st.warning("Google Sheets não configurado. Configure SHEET_ID em .streamlit/secrets.toml")
+        return None
+    return BackendSheets(pool_sheets, SHEET_ID, obter_cache_planilha())
+
+@st.cache_resource(show_spinner=False)
+def _criar_fila_escrita(_armazenamento, sheet_id):
+    """Fila de gravação em segundo plano compartilhada (uma por planilha)"""
+    diretorio = st.secrets.get("diretorio_espelho", DIRETORIO_ESPELHO_PADRAO)
+    fila = FilaEscrita(
+        Path(diretorio) / f"fila_{sheet_id}.sqlite3", _armazenamento.inserir_lote, _armazenamento.cpf_cadastrado
+    )
+    fila.iniciar()
+    return fila
+
+def obter_fila_escrita(armazenamento):
+    """Fila de novos cadastros para motores remotos (None se desativada em secrets.toml)"""
+    if not armazenamento.remoto or not st.secrets.get("fila_escrita", True):
+        return None
+    return _criar_fila_escrita(armazenamento, armazenamento.sheet_id)
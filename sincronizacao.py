@@ -0,0 +1,340 @@
+"""
+Sincronização incremental da planilha com um espelho local (SQLite)
+Depois de uma mudança, baixa primeiro só as colunas-chave (data/hora, nome e CPF)
+para descobrir quais blocos de linhas mudaram e busca por completo apenas esses blocos
+e os escritos pela própria aplicação. O DataFrame em memória é remontado bloco a bloco.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Linhas por bloco (unidade de hash, gravação no espelho e reconstrução do DataFrame)
+TAMANHO_BLOCO = 500
+
+# Colunas A:C (data_hora, nome, cpf) identificam uma linha
+COLUNAS_CHAVE = 3
+FAIXA_CHAVES = "A:C"
+
+# Mudanças fora das colunas-chave em blocos que não mudaram de chave nem foram escritos pela
+# aplicação só aparecem num download completo: força uma verificação completa nesse intervalo
+VERIFICACAO_COMPLETA_SEGUNDOS = 30 * 60
+
+
+def _hash(linhas):
+    """Hash do conteúdo de um conjunto de linhas"""
+    return hashlib.sha1(json.dumps(linhas, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _completar(linha, largura):
+    """A API omite células vazias no fim da linha; completa até a largura do cabeçalho"""
+    linha = list(linha[:largura])
+    if len(linha) < largura:
+        linha.extend([""] * (largura - len(linha)))
+    return linha
+
+
+class SincronizadorPlanilha:
+    """Espelho local da planilha sincronizado por blocos de linhas"""
+
+    def __init__(self, caminho, tamanho_bloco=TAMANHO_BLOCO):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.tamanho_bloco = tamanho_bloco
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT);
+            CREATE TABLE IF NOT EXISTS blocos (
+                bloco INTEGER PRIMARY KEY,
+                hash_chave TEXT NOT NULL,
+                hash_completo TEXT NOT NULL,
+                linhas TEXT NOT NULL
+            );
+        """)
+        self.cabecalho = []
+        self.linhas = []
+        self.modificado_remoto = None
+        self._verificado_completo_em = 0.0
+        self._escritas_pendentes = False
+        # Blocos tocados pelas escritas próprias desde a última sincronização (relidos por completo)
+        self._blocos_escritos = set()
+        self._hashes_chave = []
+        self._hashes_completos = []
+        self._blocos_df = []
+        self._df = None
+        self._estatisticas = {
+            "sincronizacoes": 0,
+            "downloads_completos": 0,
+            "leituras_chave": 0,
+            "linhas_baixadas": 0,
+            "blocos_reconstruidos": 0,
+        }
+        self._carregar_espelho()
+
+    # ---------- espelho em disco ----------
+
+    def _carregar_espelho(self):
+        """Lê o espelho gravado em disco (reinícios não precisam baixar a planilha)"""
+        meta = dict(self._conn.execute("SELECT chave, valor FROM meta"))
+        if "cabecalho" not in meta:
+            return
+        self.cabecalho = json.loads(meta["cabecalho"])
+        self.modificado_remoto = meta.get("modificado_remoto") or None
+        self._verificado_completo_em = float(meta.get("verificado_completo_em", 0))
+        self._escritas_pendentes = meta.get("escritas_pendentes") == "1"
+        self._blocos_escritos = set(json.loads(meta.get("blocos_escritos") or "[]"))
+        for hash_chave, hash_completo, linhas in self._conn.execute(
+            "SELECT hash_chave, hash_completo, linhas FROM blocos ORDER BY bloco"
+        ):
+            self.linhas.extend(json.loads(linhas))
+            self._hashes_chave.append(hash_chave)
+            self._hashes_completos.append(hash_completo)
+
+    def _gravar_espelho(self, blocos_alterados):
+        """Grava só os blocos alterados e os metadados"""
+        total_blocos = len(self._hashes_completos)
+        with self._conn:
+            for b in blocos_alterados:
+                if b >= total_blocos:
+                    continue
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO blocos VALUES (?, ?, ?, ?)",
+                    (b, self._hashes_chave[b], self._hashes_completos[b],
+                     json.dumps(self._linhas_bloco(b), ensure_ascii=False))
+                )
+            self._conn.execute("DELETE FROM blocos WHERE bloco >= ?", (total_blocos,))
+            self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                ("cabecalho", json.dumps(self.cabecalho, ensure_ascii=False)),
+                ("modificado_remoto", self.modificado_remoto or ""),
+                ("verificado_completo_em", str(self._verificado_completo_em)),
+                ("escritas_pendentes", "1" if self._escritas_pendentes else "0"),
+                ("blocos_escritos", json.dumps(sorted(self._blocos_escritos))),
+            ])
+
+    # ---------- blocos ----------
+
+    def _linhas_bloco(self, b):
+        return self.linhas[b * self.tamanho_bloco:(b + 1) * self.tamanho_bloco]
+
+    def _total_blocos(self, n_linhas):
+        return (n_linhas + self.tamanho_bloco - 1) // self.tamanho_bloco
+
+    def _hashes_chave_de(self, chaves):
+        """Hash das colunas-chave de cada bloco"""
+        t = self.tamanho_bloco
+        return [_hash(chaves[b * t:(b + 1) * t]) for b in range(self._total_blocos(len(chaves)))]
+
+    def _substituir_linhas(self, novas_linhas, inicio_alteracao=0):
+        """Troca o conteúdo do espelho e devolve os blocos cujo hash mudou"""
+        self.linhas = novas_linhas
+        t = self.tamanho_bloco
+        total = self._total_blocos(len(novas_linhas))
+        primeiro = inicio_alteracao // t
+        hashes_chave = self._hashes_chave[:primeiro]
+        hashes_completos = self._hashes_completos[:primeiro]
+        for b in range(primeiro, total):
+            bloco = self._linhas_bloco(b)
+            hashes_chave.append(_hash([linha[:COLUNAS_CHAVE] for linha in bloco]))
+            hashes_completos.append(_hash(bloco))
+        alterados = [
+            b for b in range(primeiro, total)
+            if b >= len(self._hashes_completos) or hashes_completos[b] != self._hashes_completos[b]
+        ]
+        self._hashes_chave = hashes_chave
+        self._hashes_completos = hashes_completos
+        return alterados
+
+    def _montar_df(self, blocos_alterados):
+        """Reconstrói só os DataFrames dos blocos alterados e concatena"""
+        total = len(self._hashes_completos)
+        if self._df is None or len(self._blocos_df) == 0:
+            blocos_alterados = range(total)
+        blocos_df = self._blocos_df[:total]
+        blocos_df.extend([None] * (total - len(blocos_df)))
+        for b in blocos_alterados:
+            blocos_df[b] = pd.DataFrame(self._linhas_bloco(b), columns=self.cabecalho)
+            self._estatisticas["blocos_reconstruidos"] += 1
+        self._blocos_df = blocos_df
+        if blocos_df:
+            self._df = pd.concat(blocos_df, ignore_index=True)
+        else:
+            self._df = pd.DataFrame(columns=self.cabecalho)
+        return self._df
+
+    def _aplicar(self, novas_linhas, inicio_alteracao=0):
+        alterados = self._substituir_linhas(novas_linhas, inicio_alteracao)
+        self._montar_df(alterados)
+        self._gravar_espelho(alterados)
+
+    # ---------- sincronização ----------
+
+    def _download_completo(self, aba):
+        """get_all_values(); os blocos com o mesmo hash não são reconstruídos"""
+        dados = aba.get_all_values()
+        self._estatisticas["downloads_completos"] += 1
+        self._estatisticas["linhas_baixadas"] += max(len(dados) - 1, 0)
+        self._verificado_completo_em = time.time()
+        if not dados:
+            self.cabecalho = []
+            self._df = None
+            self._aplicar([])
+            return
+        if dados[0] != self.cabecalho:
+            # Cabeçalho mudou: descarta todos os blocos
+            self.cabecalho = dados[0]
+            self._hashes_chave, self._hashes_completos, self._blocos_df = [], [], []
+            self._df = None
+        self._aplicar(dados[1:])
+
+    def _baixar_linhas(self, aba, indices):
+        """Baixa as linhas completas indicadas, agrupadas em intervalos contíguos, numa única chamada"""
+        from gspread.utils import rowcol_to_a1  # gspread só é carregado com o motor Sheets
+
+        intervalos = []
+        for i in indices:
+            if intervalos and intervalos[-1][1] == i - 1:
+                intervalos[-1][1] = i
+            else:
+                intervalos.append([i, i])
+        largura = len(self.cabecalho)
+        faixas = [
+            f"{rowcol_to_a1(ini + 2, 1)}:{rowcol_to_a1(fim + 2, largura)}"
+            for ini, fim in intervalos
+        ]
+        resultado = {}
+        for (ini, fim), valores in zip(intervalos, aba.batch_get(faixas)):
+            valores = list(valores)
+            for deslocamento in range(fim - ini + 1):
+                linha = valores[deslocamento] if deslocamento < len(valores) else []
+                resultado[ini + deslocamento] = _completar(linha, largura)
+        self._estatisticas["linhas_baixadas"] += len(resultado)
+        return resultado
+
+    def _sincronizar_por_chaves(self, aba):
+        """Compara as colunas-chave por bloco e baixa por completo só os blocos alterados. False se exigir download completo
+
+        Blocos com as mesmas chaves na mesma posição são reaproveitados do espelho; os que mudaram
+        de chave (linhas novas, excluídas ou deslocadas) e os escritos pela própria aplicação são
+        relidos inteiros, para que edições de outras pessoas em colunas fora da chave, chegadas
+        na mesma modificação, não fiquem escondidas.
+        """
+        valores = list(aba.get(FAIXA_CHAVES))
+        self._estatisticas["leituras_chave"] += 1
+        if not valores or _completar(valores[0], COLUNAS_CHAVE) != self.cabecalho[:COLUNAS_CHAVE]:
+            return False
+        chaves = [_completar(linha, COLUNAS_CHAVE) for linha in valores[1:]]
+        hashes_chave = self._hashes_chave_de(chaves)
+
+        if hashes_chave == self._hashes_chave and not self._escritas_pendentes:
+            # Nenhuma linha entrou, saiu ou mudou de posição e não houve escrita própria:
+            # a mudança foi em outras colunas, em algum lugar da planilha
+            return False
+
+        t = self.tamanho_bloco
+        relidos = [
+            b for b, hash_chave in enumerate(hashes_chave)
+            if b in self._blocos_escritos or b >= len(self._hashes_chave) or hash_chave != self._hashes_chave[b]
+        ]
+        novas_linhas = [None] * len(chaves)
+        for b in range(len(hashes_chave)):
+            if b not in relidos:
+                novas_linhas[b * t:(b + 1) * t] = self._linhas_bloco(b)
+        if relidos:
+            indices = [i for b in relidos for i in range(b * t, min((b + 1) * t, len(chaves)))]
+            for i, linha in self._baixar_linhas(aba, indices).items():
+                novas_linhas[i] = linha
+        # Blocos relidos com o mesmo conteúdo não são reconstruídos (_substituir_linhas compara o hash completo)
+        self._aplicar(novas_linhas, relidos[0] * t if relidos else len(chaves))
+        return True
+
+    def sincronizar(self, aba, modificado_remoto):
+        """Atualiza o espelho para a versão remota e retorna o DataFrame completo"""
+        with self._lock:
+            self._estatisticas["sincronizacoes"] += 1
+            atualizado = (
+                modificado_remoto == self.modificado_remoto
+                and not self._escritas_pendentes
+                and self.cabecalho
+            )
+            if atualizado:
+                if self._df is None:
+                    self._montar_df([])
+                return self._df
+
+            verificacao_vencida = time.time() - self._verificado_completo_em > VERIFICACAO_COMPLETA_SEGUNDOS
+            if not self.cabecalho or verificacao_vencida or not self._sincronizar_por_chaves(aba):
+                self._download_completo(aba)
+
+            self.modificado_remoto = modificado_remoto
+            self._escritas_pendentes = False
+            self._blocos_escritos = set()
+            self._gravar_espelho([])
+            if self._df is None:
+                self._montar_df([])
+            return self._df
+
+    # ---------- escritas da própria aplicação ----------
+
+    def _normalizar(self, linha):
+        return _completar([str(v) for v in linha], len(self.cabecalho))
+
+    def _registrar(self, novas_linhas, inicio_alteracao, indices_escritos):
+        """Aplica uma escrita própria; os blocos das linhas escritas são relidos na próxima sincronização"""
+        self._escritas_pendentes = True
+        self._blocos_escritos.update(i // self.tamanho_bloco for i in indices_escritos)
+        self._aplicar(novas_linhas, inicio_alteracao)
+        return self._df
+
+    def registrar_insercao(self, linhas):
+        """Aplica no espelho linhas acrescentadas ao fim da planilha"""
+        with self._lock:
+            if not self.cabecalho:
+                # Espelho ainda vazio: a próxima sincronização baixa tudo
+                return None
+            novas = [self._normalizar(linha) for linha in linhas]
+            return self._registrar(
+                self.linhas + novas, len(self.linhas), range(len(self.linhas), len(self.linhas) + len(novas))
+            )
+
+    def registrar_atualizacao(self, numero_linha, valores):
+        """Aplica no espelho a atualização de uma linha (numeração da planilha, base 1)"""
+        return self.registrar_atualizacoes({numero_linha: valores})
+
+    def registrar_atualizacoes(self, valores_por_linha):
+        """Aplica no espelho a atualização de várias linhas ({número da linha: valores})"""
+        with self._lock:
+            indices = {numero_linha - 2: valores for numero_linha, valores in valores_por_linha.items()}
+            if not self.cabecalho or not indices or not all(0 <= i < len(self.linhas) for i in indices):
+                return None
+            novas_linhas = list(self.linhas)
+            for indice, valores in indices.items():
+                novas_linhas[indice] = self._normalizar(valores)
+            return self._registrar(novas_linhas, min(indices), indices)
+
+    def registrar_exclusao(self, numero_linha):
+        """Aplica no espelho a exclusão de uma linha (numeração da planilha, base 1)"""
+        return self.registrar_exclusoes([numero_linha])
+
+    def registrar_exclusoes(self, numeros_linha):
+        """Aplica no espelho a exclusão de várias linhas (numeração anterior às exclusões)"""
+        with self._lock:
+            indices = {numero_linha - 2 for numero_linha in numeros_linha}
+            if not self.cabecalho or not indices or not all(0 <= i < len(self.linhas) for i in indices):
+                return None
+            novas_linhas = [linha for i, linha in enumerate(self.linhas) if i not in indices]
+            # Posição de cada exclusão depois dela (as linhas seguintes sobem)
+            pontos = [i - anteriores for anteriores, i in enumerate(sorted(indices))]
+            return self._registrar(novas_linhas, min(indices), pontos)
+
+    def estatisticas(self):
+        """Cópia dos contadores de sincronização"""
+        with self._lock:
+            dados = dict(self._estatisticas)
+            dados["linhas_no_espelho"] = len(self.linhas)
+            return dados
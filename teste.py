@@ -0,0 +1,687 @@
+"""
+Testes do índice de CPF, da sincronização por blocos, da edição e exclusão na planilha e no
+SQLite, da validação, busca, filtros, agregados, importação e fila de gravação, contra a
+planilha simulada em memória (sem credenciais nem rede)
+Execute com: python -m pytest teste.py
+"""
+
+import io
+import random
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agregados import COLUNAS_AGREGADAS, AgregadosTabela
+from armazenamento import BackendSheets, BackendSQLite, ConflitoEdicao, CPFDuplicado
+from benchmark import gerar_cpf, gerar_email, gerar_telefone
+from benchmark_app import gerar_planilha
+from busca import IndiceBusca, dobrar_texto
+from cache_planilha import CachePlanilha, montar_dataframe
+from esquema import COLUNAS_PLANILHA, linha_de_registro, registro_de_linha, tipar_tabela
+import fila_escrita
+from filtros import FACETA_IDADE, FACETAS, FAIXAS_IDADE, IndiceFacetas
+from fila_escrita import FilaEscrita
+from importacao import importar_funcionarios, validar_bloco
+from indice_cpf import IndiceCPF
+from ordenacao import OrdenacoesTabela
+from planilha_simulada import AbaSimulada, PoolSimulado
+from projecao import COLUNAS_LISTA
+from sincronizacao import SincronizadorPlanilha
+from validacao import (
+    CAMPOS_TELEFONE,
+    formatar_cpf,
+    formatar_cpf_lote,
+    formatar_telefone,
+    formatar_telefone_lote,
+    validar_cpf,
+    validar_cpf_lote,
+    validar_e_normalizar,
+    validar_email,
+    validar_email_lote,
+    validar_telefone,
+    validar_telefone_lote
+)
+
+COLUNA_EMAIL = COLUNAS_PLANILHA.index("email")
+
+
+# ==================== ÍNDICE DE CPF ====================
+
+def _numeros_esperados(cpfs):
+    """CPF → números das linhas (base 1, com cabeçalho) numa lista simples de CPFs"""
+    esperado = {}
+    for posicao, cpf in enumerate(cpfs):
+        esperado.setdefault(cpf, []).append(posicao + 2)
+    return esperado
+
+
+def test_indice_localiza_linhas_com_cpfs_repetidos():
+    indice = IndiceCPF(["a", "b", "a", "c"])
+    assert indice.localizar("a") == [2, 4]
+    assert indice.localizar("c") == [5]
+    assert indice.localizar("x") == []
+    assert "b" in indice and "x" not in indice
+    assert len(indice) == 4
+
+
+def test_indice_exclusao_sobe_as_linhas_seguintes():
+    indice = IndiceCPF(["a", "b", "c", "d"])
+    indice.registrar_exclusao(3, "b")
+    assert indice.localizar("a") == [2]
+    assert indice.localizar("c") == [3]
+    assert indice.localizar("d") == [4]
+    assert "b" not in indice
+    assert len(indice) == 3
+
+
+def test_indice_removidos_ficam_ordenados_e_ignoram_linha_desatualizada():
+    indice = IndiceCPF(["a", "b", "c", "d", "e"])
+    indice.registrar_exclusao(5, "d")   # slot 3
+    indice.registrar_exclusao(2, "a")   # slot 0
+    assert indice._removidos == [0, 3]
+    # Número de linha que não corresponde mais ao CPF: nada muda
+    indice.registrar_exclusao(5, "c")
+    indice.registrar_exclusao(2, "x")
+    assert indice._removidos == [0, 3]
+    assert indice.localizar("b") == [2]
+    assert indice.localizar("c") == [3]
+    assert indice.localizar("e") == [4]
+
+
+def test_indice_insercao_depois_de_exclusao_e_troca_de_cpf():
+    indice = IndiceCPF(["a", "b", "c"])
+    indice.registrar_exclusao(2, "a")
+    indice.registrar_insercao(["d", "b"])
+    assert indice.localizar("b") == [2, 5]
+    assert indice.localizar("d") == [4]
+    indice.registrar_atualizacao(3, "c", "e")
+    assert "c" not in indice
+    assert indice.localizar("e") == [3]
+    assert len(indice) == 4
+
+
+def test_indice_confere_com_lista_em_sequencia_aleatoria():
+    rnd = random.Random(7)
+    cpfs = [f"{rnd.randrange(40):03d}" for _ in range(60)]
+    indice = IndiceCPF(cpfs)
+    for _ in range(300):
+        operacao = rnd.random()
+        if operacao < 0.4 and cpfs:
+            posicao = rnd.randrange(len(cpfs))
+            indice.registrar_exclusao(posicao + 2, cpfs.pop(posicao))
+        elif operacao < 0.7:
+            novos = [f"{rnd.randrange(40):03d}" for _ in range(rnd.randint(1, 3))]
+            indice.registrar_insercao(novos)
+            cpfs.extend(novos)
+        elif cpfs:
+            posicao = rnd.randrange(len(cpfs))
+            novo = f"{rnd.randrange(40):03d}"
+            indice.registrar_atualizacao(posicao + 2, cpfs[posicao], novo)
+            cpfs[posicao] = novo
+        assert len(indice) == len(cpfs)
+    assert indice._removidos == sorted(indice._removidos)
+    esperado = _numeros_esperados(cpfs)
+    assert {cpf: indice.localizar(cpf) for cpf in esperado} == esperado
+
+
+# ==================== SINCRONIZAÇÃO POR BLOCOS ====================
+
+@pytest.fixture
+def aba():
+    return AbaSimulada(gerar_planilha(45))
+
+
+@pytest.fixture
+def sincronizador(tmp_path):
+    return SincronizadorPlanilha(tmp_path / "espelho.sqlite3", tamanho_bloco=10)
+
+
+def _sincronizar(sincronizador, aba):
+    """Sincroniza e confere o espelho com a planilha; retorna as chamadas à API feitas"""
+    aba.chamadas.clear()
+    df = sincronizador.sincronizar(aba, str(aba.modificacoes))
+    assert df.equals(montar_dataframe(aba.linhas))
+    return dict(aba.chamadas)
+
+
+def _alteracao_externa(aba):
+    aba.modificacoes += 1
+
+
+def test_sincronizacao_inicial_e_sem_mudanca(sincronizador, aba):
+    assert _sincronizar(sincronizador, aba) == {"get_all_values": 1}
+    assert _sincronizar(sincronizador, aba) == {}
+
+
+def test_sincronizacao_baixa_so_os_blocos_alterados(sincronizador, aba):
+    _sincronizar(sincronizador, aba)
+    aba.linhas.append(list(aba.linhas[1]))
+    _alteracao_externa(aba)
+    assert _sincronizar(sincronizador, aba) == {"get": 1, "batch_get": 1}
+    # Só o último bloco (linhas 40 a 45) foi baixado por completo
+    assert sincronizador.estatisticas()["linhas_baixadas"] == 45 + 6
+
+
+def test_sincronizacao_edicao_externa_fora_da_chave_faz_download_completo(sincronizador, aba):
+    _sincronizar(sincronizador, aba)
+    aba.linhas[20][COLUNA_EMAIL] = "externo@empresa.com.br"
+    _alteracao_externa(aba)
+    assert _sincronizar(sincronizador, aba) == {"get": 1, "get_all_values": 1}
+
+
+def test_sincronizacao_rele_bloco_escrito_com_edicao_externa_na_mesma_modificacao(sincronizador, aba):
+    _sincronizar(sincronizador, aba)
+    # Outra pessoa edita o e-mail da linha 9 e a aplicação grava o da linha 7 (mesmo bloco)
+    aba.linhas[8][COLUNA_EMAIL] = "externo@empresa.com.br"
+    aba.update("E7", [["proprio@empresa.com.br"]])
+    sincronizador.registrar_atualizacao(7, aba.linhas[6])
+    assert _sincronizar(sincronizador, aba) == {"get": 1, "batch_get": 1}
+
+
+def test_sincronizacao_rele_blocos_deslocados(sincronizador, aba):
+    _sincronizar(sincronizador, aba)
+    # Linha inserida no topo desloca todos os blocos; a edição externa não pode vir do espelho
+    aba.linhas.insert(1, list(aba.linhas[30]))
+    aba.linhas[35][COLUNA_EMAIL] = "externo@empresa.com.br"
+    _alteracao_externa(aba)
+    assert _sincronizar(sincronizador, aba) == {"get": 1, "batch_get": 1}
+
+
+def test_sincronizacao_exclusao_propria(sincronizador, aba):
+    _sincronizar(sincronizador, aba)
+    aba.delete_rows(12)
+    sincronizador.registrar_exclusao(12)
+    assert _sincronizar(sincronizador, aba) == {"get": 1, "batch_get": 1}
+
+
+def test_espelho_reaberto_sem_chamadas(sincronizador, aba, tmp_path):
+    _sincronizar(sincronizador, aba)
+    reaberto = SincronizadorPlanilha(tmp_path / "espelho.sqlite3", tamanho_bloco=10)
+    assert _sincronizar(reaberto, aba) == {}
+
+
+# ==================== ORDENAÇÃO ====================
+
+@pytest.mark.parametrize("ascendente", [True, False], ids=["crescente", "decrescente"])
+def test_ordenacao_vazios_e_invalidos_no_fim(ascendente):
+    df = pd.DataFrame({"nome": ["b", "", "Á", "  ", "c"], "idade": ["3", "", "1", "x", "0"]})
+    ordenacoes = OrdenacoesTabela(df)
+    nomes = df["nome"].iloc[ordenacoes.permutacao("nome", ascendente)].tolist()
+    idades = df["idade"].iloc[ordenacoes.permutacao("idade", ascendente)].tolist()
+    assert nomes == (["Á", "b", "c"] if ascendente else ["c", "b", "Á"]) + ["", "  "]
+    assert idades == (["0", "1", "3"] if ascendente else ["3", "1", "0"]) + ["", "x"]
+
+
+# ==================== EXCLUSÃO EM LOTE ====================
+
+def test_exclusao_em_lote_na_planilha(aba):
+    armazenamento = BackendSheets(PoolSimulado(aba), "planilha_simulada", CachePlanilha())
+    registros = [registro_de_linha(aba.linhas[n - 1]) for n in (3, 4, 10)]
+    restantes = [linha for n, linha in enumerate(aba.linhas, start=1) if n not in (3, 4, 10)]
+    aba.chamadas.clear()
+    assert armazenamento.excluir_lote(registros) == 3
+    assert aba.linhas == restantes
+    assert aba.chamadas["spreadsheet.batch_update"] == 1
+
+
+# ==================== EDIÇÃO COM LINHAS DESLOCADAS ====================
+
+@pytest.fixture
+def planilha(aba):
+    armazenamento = BackendSheets(PoolSimulado(aba), "planilha_simulada", CachePlanilha())
+    # Tabela completa em cache (como na área administrativa): o índice de CPF vale durante o TTL
+    armazenamento.carregar()
+    return armazenamento
+
+
+def _linha_do_registro(aba, registro):
+    return next(linha for linha in aba.linhas if linha[1:3] == [registro["nome"], registro["cpf"]])
+
+
+@pytest.mark.parametrize("deslocar", [
+    lambda linhas: linhas.insert(2, list(linhas[30])),
+    lambda linhas: linhas.pop(3),
+], ids=["insercao_acima", "exclusao_acima"])
+def test_edicao_relocaliza_linha_deslocada_por_outra_pessoa(planilha, aba, deslocar):
+    original = registro_de_linha(aba.linhas[10])
+    # Outra pessoa insere ou exclui uma linha acima dentro do TTL: o número em cache ficou errado
+    deslocar(aba.linhas)
+    _alteracao_externa(aba)
+    editado = dict(original, email="novo@empresa.com.br")
+    assert planilha.atualizar(original["cpf"], editado, nome=original["nome"], original=original)
+    assert _linha_do_registro(aba, original)[COLUNA_EMAIL] == "novo@empresa.com.br"
+    assert sum(linha[COLUNA_EMAIL] == "novo@empresa.com.br" for linha in aba.linhas) == 1
+
+
+def test_edicao_em_lote_relocaliza_linhas_deslocadas(planilha, aba):
+    originais = [registro_de_linha(aba.linhas[n]) for n in (5, 20)]
+    aba.linhas.pop(2)
+    _alteracao_externa(aba)
+    editados = [(o, dict(o, email=f"novo{i}@empresa.com.br")) for i, o in enumerate(originais)]
+    assert planilha.atualizar_lote(editados) == 2
+    assert [_linha_do_registro(aba, o)[COLUNA_EMAIL] for o in originais] == [e["email"] for _, e in editados]
+
+
+def test_edicao_concorrente_do_mesmo_campo_e_conflito(planilha, aba):
+    original = registro_de_linha(aba.linhas[10])
+    aba.linhas[10][COLUNA_EMAIL] = "outro@empresa.com.br"
+    _alteracao_externa(aba)
+    with pytest.raises(ConflitoEdicao) as erro:
+        planilha.atualizar(original["cpf"], dict(original, email="novo@empresa.com.br"),
+                           nome=original["nome"], original=original)
+    assert erro.value.colunas == ["email"]
+    assert aba.linhas[10][COLUNA_EMAIL] == "outro@empresa.com.br"
+
+
+# ==================== MOTOR SQLITE ====================
+
+@pytest.fixture
+def banco(tmp_path, aba):
+    armazenamento = BackendSQLite(tmp_path / "funcionarios.sqlite3")
+    armazenamento.inserir_lote([registro_de_linha(linha) for linha in aba.linhas[1:]])
+    return armazenamento
+
+
+@pytest.mark.parametrize("parcial", [True, False], ids=["celulas_alteradas", "linha_inteira"])
+def test_sqlite_cpf_duplicado_na_edicao_informa_o_cpf(banco, aba, parcial):
+    original = registro_de_linha(aba.linhas[1])
+    cpf_existente = aba.linhas[2][2]
+    editado = dict(original, cpf=cpf_existente)
+    with pytest.raises(CPFDuplicado) as erro:
+        banco.atualizar(original["cpf"], editado, nome=original["nome"], original=original if parcial else None)
+    assert erro.value.cpf == cpf_existente
+    assert banco.obter_registro(original["cpf"])["cpf"] == original["cpf"]
+
+
+def test_sqlite_cpf_duplicado_na_insercao_em_lote(banco, aba):
+    novo = registro_de_linha(aba.linhas[3])
+    with pytest.raises(CPFDuplicado) as erro:
+        banco.inserir_lote([novo])
+    assert erro.value.cpf == novo["cpf"]
+
+
+def test_sqlite_edicao_condicional_so_conflita_na_coluna_alterada_por_outra_pessoa(banco, tmp_path, aba):
+    original = registro_de_linha(aba.linhas[1])
+    outra_sessao = BackendSQLite(tmp_path / "funcionarios.sqlite3")
+    assert outra_sessao.atualizar(original["cpf"], dict(original, email="outro@empresa.com.br"),
+                                  nome=original["nome"], original=original)
+    # Mesma coluna: conflito, nada gravado
+    with pytest.raises(ConflitoEdicao) as erro:
+        banco.atualizar(original["cpf"], dict(original, email="novo@empresa.com.br"),
+                        nome=original["nome"], original=original)
+    assert erro.value.colunas == ["email"]
+    # Outra coluna: grava sem desfazer a edição da outra sessão
+    assert banco.atualizar(original["cpf"], dict(original, endereco="Rua Nova, 1"),
+                           nome=original["nome"], original=original)
+    atual = banco.obter_registro(original["cpf"], original["nome"])
+    assert (atual["email"], atual["endereco"]) == ("outro@empresa.com.br", "Rua Nova, 1")
+
+
+def test_sqlite_edicao_em_lote_com_conflito_nao_grava_nada(banco, tmp_path, aba):
+    originais = [registro_de_linha(aba.linhas[n]) for n in (1, 2)]
+    BackendSQLite(tmp_path / "funcionarios.sqlite3").atualizar(
+        originais[1]["cpf"], dict(originais[1], email="outro@empresa.com.br"),
+        nome=originais[1]["nome"], original=originais[1]
+    )
+    with pytest.raises(ConflitoEdicao) as erro:
+        banco.atualizar_lote([(o, dict(o, email=f"novo{i}@empresa.com.br")) for i, o in enumerate(originais)])
+    assert erro.value.cpfs == [originais[1]["cpf"]]
+    assert banco.obter_registro(originais[0]["cpf"])["email"] == originais[0]["email"]
+
+
+# ==================== VALIDAÇÃO ====================
+
+CASOS_CPF = ["", "   ", "529.982.247-25", "52998224725", "529 982 247 25", "529.982.247-24",
+             "111.111.111-11", "529.982.247-2", "529.982.247-2²", "abc.def.ghi-jk", None]
+CASOS_TELEFONE = ["", "(11) 98765-4321", "+55 (11) 98765-4321", "5511987654321", "1187654321",
+                  "11 8765 4321", "(10) 98765-4321", "(11) 88765-4321", "98765-4321",
+                  "(11) 98765-4321", "(11) 9876５-4321", None]
+CASOS_EMAIL = ["", "pessoa@empresa.com.br", "pessoa@empresa", "pessoa.sobrenome+rh@empresa.gov.br",
+               "pessoa@empresa.com\n", "pessoa @empresa.com", "pessoa@empresa.c", "joão@empresa.com", None]
+
+
+def _valores_validacao(casos, gerar):
+    rnd = random.Random(3)
+    return casos + [gerar(rnd, i) for i in range(200)]
+
+
+@pytest.mark.parametrize("escalar, lote, valores", [
+    (validar_cpf, validar_cpf_lote, _valores_validacao(CASOS_CPF, lambda rnd, i: gerar_cpf(rnd, rnd.random() < 0.8))),
+    (formatar_cpf, formatar_cpf_lote, _valores_validacao(CASOS_CPF, lambda rnd, i: gerar_cpf(rnd).replace(".", ""))),
+    (validar_telefone, validar_telefone_lote, _valores_validacao(CASOS_TELEFONE, lambda rnd, i: gerar_telefone(rnd))),
+    (formatar_telefone, formatar_telefone_lote, _valores_validacao(CASOS_TELEFONE, lambda rnd, i: gerar_telefone(rnd))),
+    (validar_email, validar_email_lote, _valores_validacao(CASOS_EMAIL, gerar_email)),
+], ids=["validar_cpf", "formatar_cpf", "validar_telefone", "formatar_telefone", "validar_email"])
+def test_validacao_em_lote_igual_a_escalar(escalar, lote, valores):
+    serie = pd.Series(valores, index=range(10, 10 + len(valores)))
+    obtido = lote(serie)
+    assert obtido.index.equals(serie.index)
+    # Valores ausentes chegam às funções escalares como string vazia
+    assert obtido.tolist() == [escalar("" if v is None else v) for v in valores]
+
+
+def test_validar_e_normalizar_formata_e_aponta_os_campos_invalidos():
+    registro = {"nome": "Ana Silva", "cpf": "52998224725", "email": "ana@empresa.com.br",
+                "telefone": "+55 11 98765 4321", "emerg1_telefone": "1187654321", "emerg2_telefone": "",
+                "endereco": "Rua A, 1"}
+    normalizado, invalidos = validar_e_normalizar(registro)
+    assert invalidos == []
+    assert normalizado == dict(registro, cpf="529.982.247-25", telefone="(11) 98765-4321",
+                               emerg1_telefone="(11) 8765-4321")
+    assert registro["cpf"] == "52998224725"
+
+    invalido = {"nome": "  ", "cpf": "529.982.247-24", "email": "ana@empresa",
+                "telefone": "98765-4321", "emerg1_telefone": "123"}
+    normalizado, invalidos = validar_e_normalizar(invalido)
+    # Telefones de emergência só são formatados, nunca apontados
+    assert invalidos == ["nome", "cpf", "email", "telefone"]
+    assert normalizado["emerg1_telefone"] == "123"
+    assert normalizado["emerg2_telefone"] == ""
+
+
+def test_validar_e_normalizar_igual_as_chamadas_separadas():
+    rnd = random.Random(5)
+    for i in range(300):
+        registro = {"nome": rnd.choice(["", " ", f"Pessoa {i}"]), "cpf": gerar_cpf(rnd, rnd.random() < 0.8),
+                    "email": gerar_email(rnd, i), "telefone": gerar_telefone(rnd),
+                    "emerg1_telefone": gerar_telefone(rnd), "emerg2_telefone": rnd.choice(["", gerar_telefone(rnd)])}
+        normalizado, invalidos = validar_e_normalizar(registro)
+        validos = {"nome": bool(registro["nome"].strip()), "cpf": validar_cpf(registro["cpf"]),
+                   "email": validar_email(registro["email"]), "telefone": validar_telefone(registro["telefone"])}
+        assert invalidos == [campo for campo, valido in validos.items() if not valido]
+        assert normalizado["cpf"] == formatar_cpf(registro["cpf"])
+        assert all(normalizado[c] == formatar_telefone(registro[c]) for c in CAMPOS_TELEFONE)
+
+
+# ==================== BUSCA ====================
+
+@pytest.fixture
+def tabela():
+    """Tabela tipada como a da área administrativa"""
+    return tipar_tabela(montar_dataframe(gerar_planilha(200)))
+
+
+def _busca_esperada(df, termo):
+    """Busca de referência, linha a linha: nome/e-mail sem acentos ou CPF/telefone só com dígitos"""
+    termo_dobrado = dobrar_texto(termo.strip())
+    digitos = "".join(c for c in termo if c.isdigit())
+    encontrados = []
+    for posicao, (nome, email, cpf, telefone) in enumerate(zip(df["nome"], df["email"], df["cpf"], df["telefone"])):
+        textos = [dobrar_texto(str(nome)), dobrar_texto(str(email))]
+        numeros = ["".join(c for c in str(v) if c.isdigit()) for v in (cpf, telefone)]
+        # Termo numérico ("(11) 9"): também vale só com os dígitos
+        variantes = [termo_dobrado] + ([digitos] if digitos and not termo.strip("0123456789 ().-+/") else [])
+        if any(v in t for v in variantes for t in textos + numeros):
+            encontrados.append(posicao)
+    return encontrados
+
+
+def test_busca_ignora_acentos_e_maiusculas():
+    df = pd.DataFrame({"nome": ["João Conceição", "Joana Silva", "ANTÔNIO"], "email": ["jc@x.com", "js@x.com", "a@x.com"],
+                       "cpf": ["529.982.247-25", "111.444.777-35", ""], "telefone": ["(11) 98765-4321", "", ""]})
+    indice = IndiceBusca(df)
+    assert indice.buscar("joao").tolist() == [0]
+    assert indice.buscar("CONCEIÇÃO").tolist() == [0]
+    assert indice.buscar("antonio").tolist() == [2]
+    assert indice.buscar("jo").tolist() == [0, 1]
+    assert indice.buscar("  ").tolist() == [0, 1, 2]
+
+
+def test_busca_por_digitos_com_ou_sem_pontuacao():
+    df = pd.DataFrame({"nome": ["A", "B"], "email": ["a@x.com", "b@x.com"],
+                       "cpf": ["529.982.247-25", "111.444.777-35"], "telefone": ["(11) 98765-4321", "(21) 3456-7890"]})
+    indice = IndiceBusca(df)
+    assert indice.buscar("52998224725").tolist() == [0]
+    assert indice.buscar("982.247").tolist() == [0]
+    assert indice.buscar("(21) 3456").tolist() == [1]
+    assert indice.buscar("1198765").tolist() == [0]
+    # Separadores de campo não criam coincidências entre colunas vizinhas
+    assert indice.buscar("2511").tolist() == []
+
+
+def test_busca_incremental_igual_a_busca_do_zero(tabela):
+    indice = IndiceBusca(tabela)
+    for termo in ["m", "ma", "mar", "mari", "maria", "conceição", "conceicao", "@empresa", "pessoa1", "(1", "9"]:
+        assert indice.buscar(termo).tolist() == IndiceBusca(tabela).buscar(termo).tolist() == _busca_esperada(tabela, termo)
+
+
+# ==================== FILTROS POR FACETA ====================
+
+def _faixa_idade(idade):
+    if pd.isna(idade):
+        return ""
+    return next(rotulo for rotulo, minimo, maximo in FAIXAS_IDADE
+                if (minimo is None or idade >= minimo) and (maximo is None or idade <= maximo))
+
+
+def _colunas_facetas(df):
+    """Valores (texto) de cada faceta por linha, calculados direto no pandas"""
+    colunas = {faceta: df[faceta].astype(str).str.strip() for faceta in FACETAS if faceta in df.columns}
+    colunas[FACETA_IDADE] = pd.to_numeric(df["idade"].astype(str), errors="coerce").map(_faixa_idade)
+    return pd.DataFrame(colunas).reset_index(drop=True)
+
+
+def _mascara_esperada(colunas, filtros, ignorar=None):
+    mascara = pd.Series(True, index=colunas.index)
+    for faceta, valores in filtros.items():
+        if valores and faceta != ignorar:
+            mascara &= colunas[faceta].isin(valores)
+    return mascara.to_numpy()
+
+
+@pytest.mark.parametrize("filtros", [
+    {},
+    {"Diretoria": ["DIRES"]},
+    {"Diretoria": ["DIRES", "DAFIN"], "tipo_sanguineo": ["O+", "A-"]},
+    {"plano_saude": ["Sim"], FACETA_IDADE: ["30 a 39", "60 ou mais"]},
+    {"Diretoria": ["INEXISTENTE"]},
+], ids=["sem_filtro", "um_valor", "duas_facetas", "idade", "valor_inexistente"])
+def test_facetas_mascara_e_contagens_iguais_ao_pandas(tabela, filtros):
+    tabela = tabela.copy()
+    tabela.loc[tabela.index[::7], "idade"] = None
+    indice = IndiceFacetas(tabela)
+    colunas = _colunas_facetas(tabela)
+    busca = np.arange(len(tabela)) % 3 != 0
+
+    assert (indice.mascara(filtros) == _mascara_esperada(colunas, filtros)).all()
+    assert (indice.mascara(filtros, busca) == (_mascara_esperada(colunas, filtros) & busca)).all()
+    contagens = indice.contagens(filtros, busca)
+    assert set(contagens) == set(FACETAS)
+    for faceta, por_valor in contagens.items():
+        restantes = _mascara_esperada(colunas, filtros, ignorar=faceta) & busca
+        esperado = colunas[faceta][restantes].value_counts()
+        assert {v: n for v, n in por_valor.items() if n} == esperado.to_dict()
+        assert set(por_valor) == set(colunas[faceta])
+
+
+def test_facetas_valores_com_nao_informado_por_ultimo(tabela):
+    tabela = tabela.copy()
+    tabela.loc[tabela.index[:3], "idade"] = None
+    indice = IndiceFacetas(tabela)
+    assert indice.valores(FACETA_IDADE)[-1] == ""
+    assert indice.valores(FACETA_IDADE)[:-1] == [r for r, _, _ in FAIXAS_IDADE if r in indice.valores(FACETA_IDADE)]
+    assert indice.valores("Diretoria") == sorted(tabela["Diretoria"].astype(str).unique())
+
+
+# ==================== AGREGADOS DO PAINEL ====================
+
+def _contagens(agregados):
+    return agregados.total, {coluna: dict(agregados.contagem(coluna)) for coluna in agregados.colunas}
+
+
+def _recontagem(linhas):
+    return _contagens(AgregadosTabela(tipar_tabela(montar_dataframe(linhas)), 0))
+
+
+def test_agregados_registrar_igual_a_recontagem(aba):
+    agregados = AgregadosTabela(tipar_tabela(montar_dataframe(aba.linhas)), 0)
+    removidos = [registro_de_linha(aba.linhas[n]) for n in (1, 5, 9)]
+    adicionados = [dict(registro_de_linha(aba.linhas[2]), Diretoria="DIPAS", tipo_sanguineo="AB-", possui_filhos="Sim")]
+    agregados.registrar(removidos=removidos, adicionados=adicionados)
+    linhas = [linha for n, linha in enumerate(aba.linhas) if n not in (1, 5, 9)] + [linha_de_registro(adicionados[0])]
+    assert _contagens(agregados) == _recontagem(linhas)
+    # Valor que some da tabela some da contagem (sem quantidade zero)
+    unico = AgregadosTabela(tipar_tabela(montar_dataframe(aba.linhas[:2])), 0)
+    unico.registrar(removidos=[registro_de_linha(aba.linhas[1])])
+    assert _contagens(unico) == (0, {coluna: {} for coluna in unico.colunas})
+
+
+def test_agregados_ajustados_pelas_escritas_sem_recontar(aba):
+    planilha = BackendSheets(PoolSimulado(aba), "planilha_simulada", CachePlanilha())
+    # Listagem da área administrativa: identificação e colunas do painel
+    planilha.carregar_colunas(COLUNAS_LISTA + COLUNAS_AGREGADAS)
+    agregados = planilha.agregados()
+    novo = dict(registro_de_linha(aba.linhas[5]), cpf="111.444.777-35", nome="Novo", Diretoria="DIRSIN")
+    planilha.inserir(novo)
+    original = registro_de_linha(aba.linhas[2])
+    planilha.atualizar(original["cpf"], dict(original, Diretoria="DIPAS", tipo_sanguineo="AB-"),
+                       nome=original["nome"], original=original)
+    planilha.excluir_lote([registro_de_linha(aba.linhas[n]) for n in (7, 8, 20)])
+    aba.chamadas.clear()
+    assert planilha.agregados() is agregados
+    assert not aba.chamadas
+    assert _contagens(agregados) == _recontagem(aba.linhas)
+
+
+# ==================== IMPORTAÇÃO ====================
+
+def _arquivo_csv(linhas):
+    return io.BytesIO(pd.DataFrame(linhas[1:], columns=linhas[0]).to_csv(index=False, sep=";").encode("utf-8-sig"))
+
+
+def test_importacao_rejeita_linhas_invalidas_e_gera_relatorio(aba, banco):
+    linhas = gerar_planilha(8, semente=2)
+    cabecalho = linhas[0]
+
+    def alterar(numero, **valores):
+        for coluna, valor in valores.items():
+            linhas[numero][cabecalho.index(coluna)] = valor
+
+    for numero in range(1, len(linhas)):
+        alterar(numero, plano_saude="Não")
+    alterar(2, cpf="529.982.247-24")
+    alterar(3, endereco="", Diretoria="DIRETORIA X")
+    alterar(4, comorbidade="Sim", desc_comorbidade="")
+    alterar(5, cpf=linhas[1][cabecalho.index("cpf")])   # repetido no próprio arquivo
+    alterar(6, cpf=aba.linhas[1][2].replace(".", "").replace("-", ""))   # já cadastrado, sem máscara
+    alterar(7, telefone="11987654321", data_hora="")
+
+    resultado = importar_funcionarios(_arquivo_csv(linhas), "funcionarios.csv", banco,
+                                      set(banco.carregar().df["cpf"]), data_hora="01/01/2026 08:00:00")
+    assert (resultado.total, resultado.importados, resultado.chamadas_gravacao) == (8, 3, 1)
+    relatorio = pd.read_csv(io.BytesIO(resultado.relatorio_erros_csv().encode("utf-8")), dtype=str, encoding="utf-8-sig")
+    assert relatorio["Linha do arquivo"].tolist() == ["3", "4", "5", "6", "7"]
+    assert relatorio["Motivo"].tolist() == [
+        "CPF inválido",
+        "Endereço é obrigatório; Diretoria inválida",
+        "Descreva a comorbidade se respondeu sim",
+        "CPF já cadastrado",
+        "CPF já cadastrado",
+    ]
+    assert relatorio["CPF"].iloc[4] == aba.linhas[1][2]
+    # Importados normalizados, com a data da importação quando o arquivo não traz
+    importado = banco.obter_registro(linhas[7][cabecalho.index("cpf")])
+    assert (importado["telefone"], importado["data_hora"]) == ("(11) 98765-4321", "01/01/2026 08:00:00")
+
+
+def test_validar_bloco_aponta_todos_os_motivos_da_linha():
+    bloco = pd.DataFrame([[""] * len(COLUNAS_PLANILHA)], columns=COLUNAS_PLANILHA)
+    _, motivos = validar_bloco(bloco)
+    assert motivos == [[
+        "Nome completo é obrigatório", "CPF inválido", "E-mail inválido", "Telefone inválido",
+        "Endereço é obrigatório", "Diretoria é obrigatória", "Tipo sanguíneo é obrigatório",
+        "Contato de emergência 1 incompleto",
+    ]]
+
+
+# ==================== FILA DE GRAVAÇÃO ====================
+
+class ErroAPI(Exception):
+    """Erro no formato do gspread (APIError), com o status HTTP da resposta"""
+
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.response = type("Resposta", (), {"status_code": status})()
+
+
+class PlanilhaFila:
+    """Destino dos envios da fila: CPFs gravados e o erro a devolver na próxima chamada"""
+
+    def __init__(self):
+        self.cpfs = set()
+        self.envios = []
+        self.erro = None
+
+    def enviar_lote(self, registros):
+        if self.erro is not None:
+            raise self.erro
+        self.envios.append([r["cpf"] for r in registros])
+        self.cpfs.update(r["cpf"] for r in registros)
+
+
+@pytest.fixture
+def destino():
+    return PlanilhaFila()
+
+
+@pytest.fixture
+def fila(tmp_path, destino):
+    return FilaEscrita(tmp_path / "fila.sqlite3", destino.enviar_lote, destino.cpfs.__contains__, tamanho_lote=3)
+
+
+def _cadastros(*cpfs):
+    return [{"cpf": cpf, "nome": f"Pessoa {cpf}"} for cpf in cpfs]
+
+
+def test_fila_reenvio_nao_duplica_cpfs_ja_gravados(tmp_path, fila, destino):
+    fila.enfileirar_lote(_cadastros("1", "2", "3", "4", "5"))
+    # Queda entre o envio e a limpeza do diário: parte dos pendentes já está na planilha
+    destino.cpfs.update({"2", "4"})
+    reaberta = FilaEscrita(tmp_path / "fila.sqlite3", destino.enviar_lote, destino.cpfs.__contains__, tamanho_lote=3)
+    assert reaberta.profundidade() == 5
+    reaberta.descarregar()
+    assert destino.envios == [["1", "3"], ["5"]]
+    estatisticas = reaberta.estatisticas()
+    assert (estatisticas["enviados"], estatisticas["ja_cadastrados"], estatisticas["profundidade"]) == (3, 2, 0)
+
+
+def test_fila_espera_exponencial_em_erro_temporario(monkeypatch, fila, destino):
+    monkeypatch.setattr(fila_escrita.random, "uniform", lambda inicio, fim: 1.0)
+    fila.enfileirar_lote(_cadastros("1", "2"))
+    destino.erro = ErroAPI(429)
+    esperas = []
+    for _ in range(3):
+        fila._proxima_tentativa = 0.0   # espera anterior cumprida
+        fila.descarregar()
+        esperas.append(round(fila._proxima_tentativa - time.monotonic()))
+    assert esperas == [1, 2, 4]
+    assert (fila.profundidade(), fila.estatisticas()["tentativas_seguidas"], fila.falhas()) == (2, 3, [])
+
+    # Dentro da espera nada é enviado; depois dela o lote sai e as tentativas zeram
+    destino.erro = None
+    fila.descarregar()
+    assert destino.envios == []
+    fila._proxima_tentativa = 0.0
+    fila.descarregar()
+    assert destino.envios == [["1", "2"]]
+    assert fila.estatisticas()["tentativas_seguidas"] == 0
+
+
+def test_fila_erro_permanente_vai_para_falhas_e_pode_ser_reenviado(fila, destino):
+    fila.enfileirar_lote(_cadastros("1", "2"))
+    destino.erro = ErroAPI(400)
+    fila.descarregar()
+    assert fila.profundidade() == 0
+    assert [f["registro"]["cpf"] for f in fila.falhas()] == ["1", "2"]
+    assert {f["erro"] for f in fila.falhas()} == {"HTTP 400"}
+    assert fila.estatisticas()["falhas_registradas"] == 2
+    # Depois de corrigir a planilha: as falhas voltam à fila, sem reenviar o CPF que já entrou
+    destino.erro = None
+    destino.cpfs.add("2")
+    assert fila.reenviar_falhas() == 2
+    fila.descarregar()
+    assert destino.envios == [["1"]]
+    assert fila.falhas() == []
+    assert fila.estatisticas()["falhas_registradas"] == 0
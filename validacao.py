@@ -0,0 +1,244 @@
+"""
+Validação e formatação de CPF, e-mail e telefone
+"""
+
+import re
+from operator import mul
+
+import numpy as np
+import pandas as pd
+
+_RE_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_RE_SEPARADORES_TELEFONE = re.compile(r'[\s()\-\.+]')
+
+# Pesos dos dígitos verificadores; a soma é feita sobre os códigos ASCII ('0' = 48),
+# então o excesso 48 * soma dos pesos é descontado uma única vez
+_PESOS_CPF_DV1 = bytes(range(10, 1, -1))
+_PESOS_CPF_DV2 = bytes(range(11, 1, -1))
+_EXCESSO_DV1 = ord('0') * sum(_PESOS_CPF_DV1)
+_EXCESSO_DV2 = ord('0') * sum(_PESOS_CPF_DV2)
+# Dígito verificador (código ASCII) para cada resto da divisão por 11
+_DIGITO_POR_RESTO = bytes(ord('0') + (0 if resto < 2 else 11 - resto) for resto in range(11))
+
+# Campos de telefone normalizados no cadastro
+CAMPOS_TELEFONE = ('telefone', 'emerg1_telefone', 'emerg2_telefone')
+
+
+def _somente_digitos(texto):
+    """Apenas dígitos 0-9 (dígitos Unicode, como '²', não são aceitos)"""
+    return texto.isascii() and texto.isdigit()
+
+
+def _limpar_cpf(cpf):
+    # str.replace encadeado é mais rápido que str.translate ou regex para textos curtos
+    return cpf.replace('.', '').replace('-', '').replace(' ', '')
+
+
+def _limpar_telefone(telefone):
+    """Remove separadores e o código do país (55)"""
+    tel = _RE_SEPARADORES_TELEFONE.sub('', telefone)
+    if tel.startswith('55') and len(tel) > 11:
+        tel = tel[2:]
+    return tel
+
+
+def _cpf_limpo_valido(cpf):
+    if len(cpf) != 11 or not _somente_digitos(cpf):
+        return False
+    # Rejeita sequências com todos os dígitos iguais (ex: 111.111.111-11)
+    if cpf == cpf[0] * 11:
+        return False
+    codigos = cpf.encode('ascii')
+    # map(mul, ...) para no menor iterável: os pesos limitam a 9 e 10 dígitos
+    digito1 = _DIGITO_POR_RESTO[(sum(map(mul, codigos, _PESOS_CPF_DV1)) - _EXCESSO_DV1) % 11]
+    digito2 = _DIGITO_POR_RESTO[(sum(map(mul, codigos, _PESOS_CPF_DV2)) - _EXCESSO_DV2) % 11]
+    return codigos[9] == digito1 and codigos[10] == digito2
+
+
+def _telefone_limpo_valido(tel):
+    # DDD (2 dígitos) + número (8 ou 9 dígitos) = 10 ou 11 dígitos
+    if len(tel) not in (10, 11) or not _somente_digitos(tel):
+        return False
+    # DDD entre 11 e 99 (comparação de texto entre dois dígitos)
+    if tel[:2] < '11':
+        return False
+    # Celular (9 dígitos) deve começar com 9
+    return len(tel) == 10 or tel[2] == '9'
+
+
+def _formatar_cpf_limpo(cpf):
+    if len(cpf) == 11 and _somente_digitos(cpf):
+        return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+    return cpf
+
+
+def _formatar_telefone_limpo(tel, original):
+    if _somente_digitos(tel):
+        if len(tel) == 11:
+            return f"({tel[:2]}) {tel[2:7]}-{tel[7:]}"
+        elif len(tel) == 10:
+            return f"({tel[:2]}) {tel[2:6]}-{tel[6:]}"
+    return original
+
+
+def validar_cpf(cpf):
+    """Valida CPF com cálculo dos dígitos verificadores"""
+    return _cpf_limpo_valido(_limpar_cpf(cpf))
+
+
+def validar_email(email):
+    """Valida formato de e-mail com regex"""
+    return _RE_EMAIL.match(email) is not None
+
+
+def validar_telefone(telefone):
+    """Valida telefone no formato brasileiro (DDD + 8 ou 9 dígitos, com ou sem 55)"""
+    return _telefone_limpo_valido(_limpar_telefone(telefone))
+
+
+def formatar_cpf(cpf):
+    """Formata CPF como XXX.XXX.XXX-XX"""
+    # Limpeza em linha: a chamada extra a _limpar_cpf pesa numa função tão curta
+    cpf = cpf.replace('.', '').replace('-', '').replace(' ', '')
+    if len(cpf) == 11 and cpf.isascii() and cpf.isdigit():
+        return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+    return cpf
+
+
+def formatar_telefone(telefone):
+    """Formata telefone como (XX) XXXXX-XXXX ou (XX) XXXX-XXXX"""
+    return _formatar_telefone_limpo(_limpar_telefone(telefone), telefone)
+
+
+def validar_e_normalizar(registro):
+    """Valida e formata o registro numa só passada; retorna (registro, campos inválidos)
+
+    Cada campo é limpo uma única vez e o mesmo texto limpo serve para validar e formatar.
+    Campos verificados: nome (obrigatório), cpf, email e telefone; os telefones de
+    emergência são apenas formatados.
+    """
+    normalizado = dict(registro)
+    invalidos = []
+
+    if not registro.get('nome', '').strip():
+        invalidos.append('nome')
+
+    cpf = _limpar_cpf(registro.get('cpf', ''))
+    if not _cpf_limpo_valido(cpf):
+        invalidos.append('cpf')
+    normalizado['cpf'] = _formatar_cpf_limpo(cpf)
+
+    if _RE_EMAIL.match(registro.get('email', '')) is None:
+        invalidos.append('email')
+
+    for campo in CAMPOS_TELEFONE:
+        original = registro.get(campo, '')
+        tel = _limpar_telefone(original)
+        if campo == 'telefone' and not _telefone_limpo_valido(tel):
+            invalidos.append(campo)
+        normalizado[campo] = _formatar_telefone_limpo(tel, original)
+
+    return normalizado, invalidos
+
+
+# ==================== VERSÕES EM LOTE ====================
+# Recebem uma Series do pandas (ou array/lista) e retornam uma Series com o mesmo índice.
+# Os resultados são idênticos aos das funções acima; os poucos casos em que o motor
+# vetorizado difere do re do Python (espaços Unicode, quebra de linha final no e-mail)
+# passam pela função escalar.
+
+# Pesos dos dígitos verificadores do CPF (produto matriz x vetor)
+_PESOS_MATRIZ_DV1 = np.arange(10, 1, -1)
+_PESOS_MATRIZ_DV2 = np.arange(11, 1, -1)
+
+# Padrões em texto: o pandas (pyarrow) compila e reaproveita cada padrão no motor
+# vetorizado; um objeto re.compile no replace faria o pandas voltar ao laço em Python
+_PADRAO_EMAIL = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+# Mesmo conjunto de \s do re do Python, restrito ao ASCII
+_PADRAO_SEPARADORES_TELEFONE = r'[\t\n\x0b\x0c\r\x1c-\x1f ()\-.+]'
+# DDD de 11 a 99 + fixo (8 dígitos) ou celular (9 dígitos começando com 9)
+_PADRAO_TELEFONE = r'(?:1[1-9]|[2-9][0-9])(?:[0-9]{8}|9[0-9]{8})'
+
+
+def _como_texto(valores):
+    """Series de texto (valores ausentes viram string vazia)"""
+    if not isinstance(valores, pd.Series):
+        valores = pd.Series(valores)
+    return valores.fillna("").astype(str)
+
+
+def _aplicar_escalar(resultado, serie, linhas, funcao):
+    """Refaz com a função escalar as linhas marcadas (casos raros, fora do caminho vetorizado)"""
+    if linhas.any():
+        resultado[linhas] = serie[linhas].map(funcao)
+    return resultado
+
+
+def _limpar_cpf_lote(serie):
+    return serie.str.replace('.', '', regex=False).str.replace('-', '', regex=False).str.replace(' ', '', regex=False)
+
+
+def _limpar_telefone_lote(serie):
+    tel = serie.str.replace(_PADRAO_SEPARADORES_TELEFONE, '', regex=True)
+    com_pais = tel.str.startswith('55') & (tel.str.len() > 11)
+    return tel.where(~com_pais, tel.str.slice(2))
+
+
+def validar_cpf_lote(cpfs):
+    """validar_cpf para uma coluna inteira: dígitos verificadores calculados numa matriz de dígitos"""
+    serie = _como_texto(cpfs)
+    limpos = _limpar_cpf_lote(serie)
+    resultado = pd.Series(False, index=serie.index)
+    candidatos = limpos.str.fullmatch('[0-9]{11}').to_numpy(dtype=bool)
+    if candidatos.any():
+        texto = "".join(limpos[candidatos].tolist()).encode('ascii')
+        digitos = (np.frombuffer(texto, dtype=np.uint8) - ord('0')).reshape(-1, 11).astype(np.int64)
+        resto1 = (digitos[:, :9] @ _PESOS_MATRIZ_DV1) % 11
+        resto2 = (digitos[:, :10] @ _PESOS_MATRIZ_DV2) % 11
+        digito1 = np.where(resto1 < 2, 0, 11 - resto1)
+        digito2 = np.where(resto2 < 2, 0, 11 - resto2)
+        repetidos = (digitos == digitos[:, :1]).all(axis=1)
+        resultado[candidatos] = (digitos[:, 9] == digito1) & (digitos[:, 10] == digito2) & ~repetidos
+    return resultado
+
+
+def validar_email_lote(emails):
+    """validar_email para uma coluna inteira"""
+    serie = _como_texto(emails)
+    resultado = serie.str.match(_PADRAO_EMAIL).astype(bool)
+    # O $ do re do Python aceita uma quebra de linha final; o motor vetorizado, não
+    return _aplicar_escalar(resultado, serie, serie.str.contains('\n', regex=False), validar_email)
+
+
+def validar_telefone_lote(telefones):
+    """validar_telefone para uma coluna inteira"""
+    serie = _como_texto(telefones)
+    resultado = _limpar_telefone_lote(serie).str.fullmatch(_PADRAO_TELEFONE).astype(bool)
+    return _aplicar_escalar(resultado, serie, ~serie.str.isascii(), validar_telefone)
+
+
+def _fatiar(serie, *cortes):
+    """Partes da string entre as posições de corte (concatenação vetorizada é mais rápida que regex com grupos)"""
+    return [serie.str.slice(inicio, fim) for inicio, fim in zip(cortes, cortes[1:] + (None,))]
+
+
+def formatar_cpf_lote(cpfs):
+    """formatar_cpf para uma coluna inteira"""
+    serie = _como_texto(cpfs)
+    limpos = _limpar_cpf_lote(serie)
+    p1, p2, p3, p4 = _fatiar(limpos, 0, 3, 6, 9)
+    formatados = p1 + '.' + p2 + '.' + p3 + '-' + p4
+    return formatados.where(limpos.str.fullmatch('[0-9]{11}'), limpos)
+
+
+def formatar_telefone_lote(telefones):
+    """formatar_telefone para uma coluna inteira"""
+    serie = _como_texto(telefones)
+    tel = _limpar_telefone_lote(serie)
+    ddd, meio, fim = _fatiar(tel, 0, 2, 7)
+    celular = '(' + ddd + ') ' + meio + '-' + fim
+    ddd, meio, fim = _fatiar(tel, 0, 2, 6)
+    fixo = '(' + ddd + ') ' + meio + '-' + fim
+    resultado = serie.where(~tel.str.fullmatch('[0-9]{10}'), fixo)
+    resultado = resultado.where(~tel.str.fullmatch('[0-9]{11}'), celular)
+    return _aplicar_escalar(resultado, serie, ~serie.str.isascii(), formatar_telefone)